@@ -1,27 +1,54 @@
 from typing import List, Optional, Dict, Any
+import logging
 from langchain.agents import AgentExecutor
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import MessagesPlaceholder
-from langchain.schema import SystemMessage
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain_core.language_models import BaseLanguageModel
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 
+logger = logging.getLogger(__name__)
+
 class BaseAgent(BaseModel):
     """Base agent class with common functionality for all CRE agents."""
     
     tools: List[BaseTool] = Field(default_factory=list)
-    memory: Optional[ConversationBufferMemory] = Field(default=None)
+    memory: Optional[BaseChatMemory] = Field(default=None)
+    summarizer_llm: Optional[BaseLanguageModel] = Field(default=None)
+    memory_max_token_limit: int = Field(default=1500)
     system_message: str = Field(default="You are a helpful AI assistant for commercial real estate.")
     agent_executor: Optional[AgentExecutor] = Field(default=None)
     
     def setup_memory(self) -> None:
-        """Initialize conversation memory with system message."""
-        self.memory = ConversationBufferMemory(
-            return_messages=True,
-            memory_key="chat_history",
-            output_key="output",
-            input_key="input"
-        )
+        """
+        Initialize conversation memory with system message.
+
+        When a summarizer LLM is configured, older turns are condensed into a running
+        summary once the history exceeds memory_max_token_limit, keeping recent turns verbatim.
+        """
+        from langchain.memory import ConversationBufferMemory, ConversationSummaryBufferMemory
+
+        if self.summarizer_llm is not None:
+            self.memory = ConversationSummaryBufferMemory(
+                llm=self.summarizer_llm,
+                max_token_limit=self.memory_max_token_limit,
+                return_messages=True,
+                memory_key="chat_history",
+                output_key="output",
+                input_key="input"
+            )
+        else:
+            self.memory = ConversationBufferMemory(
+                return_messages=True,
+                memory_key="chat_history",
+                output_key="output",
+                input_key="input"
+            )
+
+    def get_chat_history(self) -> List[Any]:
+        """Return the chat history to send with the next request, including any running summary."""
+        if not self.memory:
+            return []
+        return self.memory.load_memory_variables({})["chat_history"]
     
     def get_agent_kwargs(self) -> Dict[str, Any]:
         """Get kwargs for agent initialization."""
@@ -32,7 +59,7 @@ class BaseAgent(BaseModel):
             "max_iterations": 10,  # Increased from 3
             "max_execution_time": 30,  # 30 seconds timeout
             "early_stopping_method": "force",
-            "verbose": True
+            "verbose": False
         }
     
     def initialize_agent(self) -> AgentExecutor:
@@ -52,14 +79,12 @@ class BaseAgent(BaseModel):
             response = await self.agent_executor.ainvoke(
                 {
                     "input": input_text,
-                    "chat_history": self.memory.chat_memory.messages if self.memory else []
+                    "chat_history": self.get_chat_history()
                 }
             )
             return response["output"]
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error in async execution: {str(e)}")
+            logger.error("Error in async execution: %s", e)
             raise
     
     def run(self, input_text: str) -> str:
@@ -1,53 +1,83 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, ClassVar, Tuple, AsyncIterator
+from functools import lru_cache
+import asyncio
+import importlib
+from itertools import chain
+import re
+import threading
+import time
+import httpx
+import orjson
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentExecutor
-from langchain.agents import create_openai_functions_agent
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder, HumanMessagePromptTemplate
-from langchain.tools import Tool
-from langchain.schema import SystemMessage, HumanMessage
-from pydantic import Field
+from langchain.tools import Tool, BaseTool
+from langchain.schema import HumanMessage
+from pydantic import Field, PrivateAttr
 
 from .base_agent import BaseAgent
+from cache import LLMCache
 from config.settings import settings
 from logger import setup_logger
-from tools.property_analysis import PropertyAnalysisTool, PropertyMetricsCalculator
-from tools.market_analysis import MarketAnalysisTool, MarketMetricsCalculator
-from tools.value_proposition import ValuePropositionTool, FinancialCalculatorTool
-from tools.document_search import DocumentSearchTool
-from tools.tavily_search import TavilySearchTool
-from tools.fred_economic import FREDEconomicTool
-from tools.cold_call import ColdCallScriptTool
-from tools.object_handler import ObjectionHandlerTool
-from tools.sales_strategy_advisor import SalesStrategyAdvisorTool
-from tools.comparable_analysis import ComparableAnalysisTool
-from config.supabase import get_supabase
 
 logger = setup_logger(__name__)
 
-class RealEstateAgent(BaseAgent):
-    """
-    Specialized agent for commercial real estate interactions.
-    Handles property analysis, market research, and value propositions.
-    """
-    
-    llm: ChatOpenAI = Field(default_factory=lambda: ChatOpenAI(
-        model_name=settings.MODEL_NAME,
-        temperature=settings.TEMPERATURE,
-        api_key=settings.OPENAI_API_KEY,
-        streaming=True  # Enable streaming for better UX
-    ))
-    
-    def _get_system_message(self) -> str:
-        """Fetch the active system message from Supabase."""
-        try:
-            supabase = get_supabase(auth=False)  # Use admin client
-            result = supabase.table('system_messages').select('*').eq('is_active', True).limit(1).execute()
-            
-            if result.data and len(result.data) > 0:
-                return result.data[0]['message']
-            
-            # Return default message if no active message found
-            return """You are an expert commercial real estate AI assistant. 
+# Tool classes and the Supabase client pull in heavy dependencies, so they are imported
+# where they are used; this map keeps them reachable as module attributes (PEP 562).
+_LAZY_IMPORTS = {
+    "PropertyAnalysisTool": "tools.property_analysis",
+    "PropertyMetricsCalculator": "tools.property_analysis",
+    "MarketAnalysisTool": "tools.market_analysis",
+    "MarketMetricsCalculator": "tools.market_analysis",
+    "ValuePropositionTool": "tools.value_proposition",
+    "FinancialCalculatorTool": "tools.value_proposition",
+    "DocumentSearchTool": "tools.document_search",
+    "TavilySearchTool": "tools.tavily_search",
+    "FREDEconomicTool": "tools.fred_economic",
+    "ColdCallScriptTool": "tools.cold_call",
+    "ObjectionHandlerTool": "tools.object_handler",
+    "SalesStrategyAdvisorTool": "tools.sales_strategy_advisor",
+    "ComparableAnalysisTool": "tools.comparable_analysis",
+    "get_supabase": "config.supabase",
+}
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
+# Word tokens used to match user input against tool names
+_TOKEN_RE = re.compile(r'[a-z0-9_]+')
+# Numeric literals used by the parameter fast path
+_NUMBER_RE = re.compile(r'[-+]?\d*\.?\d+')
+
+# Streamed tokens are flushed once 8KB accumulate or 25ms pass, whichever comes first
+STREAM_BUFFER_BYTES = 8192
+STREAM_BUFFER_DELAY = 0.025
+
+# Yielded by _generate_combined_response when the LLM call fails
+_COMBINED_RESPONSE_ERROR = (
+    "I apologize, but I encountered an error while processing the results. "
+    "Please try again or contact support."
+)
+
+# Tools whose results change from minute to minute; answers that used them are never cached
+LIVE_DATA_TOOLS = frozenset({"tavily_search", "fred_economic_data"})
+
+# Maximum number of compiled agents kept for reinitialisation
+AGENT_CACHE_SIZE = 16
+
+# Seconds an active system message fetched from Supabase is reused before refetching
+SYSTEM_MESSAGE_TTL = 60
+
+# Final chat responses kept for RESPONSE_CACHE_TTL seconds; short because tools return live data
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_CACHE_TTL = 300
+
+# Longest tool result value passed to the synthesis prompt
+MAX_RESULT_VALUE_CHARS = 500
+
+DEFAULT_SYSTEM_MESSAGE = """You are an expert commercial real estate AI assistant. 
             You help analyze properties, market conditions, and create compelling value propositions.
             You have access to internal documents and can search through them for relevant information.
             You can perform real-time web searches for current market trends and news.
@@ -80,11 +110,210 @@ class RealEstateAgent(BaseAgent):
             
             Make sure to use the correct calculator for each metric.
             Always show your calculations and explain the results in a clear, professional manner."""
+
+# Static tool guidance kept ahead of the (possibly admin-edited) system message
+_CALC_GUIDANCE = """You have access to powerful calculation tools for:
+
+Financial Metrics (use financial_calculator):
+- ROI (Return on Investment)
+- Cap Rate (Capitalization Rate)
+- NOI (Net Operating Income)
+
+Market Metrics (use market_metrics_calculator):
+- Vacancy Rate
+- Absorption Rate
+- Rent Growth Rate
+
+Property Metrics (use property_metrics_calculator):
+- Price per Square Foot
+- Operating Expense Ratio
+- DSCR (Debt Service Coverage Ratio)
+
+Make sure to use the correct calculator for each metric.
+Always show your calculations and explain the results in a clear, professional manner."""
+
+@lru_cache(maxsize=None)
+def _get_http_async_client() -> httpx.AsyncClient:
+    """Shared keep-alive HTTP client so every ChatOpenAI instance pools its connections."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+
+_PARAM_EXTRACTION_PROMPT = """
+            Based on the user input: "{input_text}"
+            Extract parameters for the tool: {tool_name}
+            Tool description: {tool_description}
+            
+            Required parameters: {required_params}
+            Parameter descriptions:
+            {param_descriptions}
+            
+            Return only the parameter values in valid JSON format.
+            If a required parameter cannot be extracted from the input, use a reasonable default value.
+            """
+
+@lru_cache(maxsize=None)
+def _tool_schema(tool_cls: type, args_schema: Optional[type]) -> Tuple[List[str], Dict[str, Any], str]:
+    """Return the required params, property schemas and description lines for a tool's args schema."""
+    schema = args_schema.model_json_schema() if args_schema else {}
+    required_params = schema.get('required', [])
+    properties = schema.get('properties', {})
+    param_descriptions = "\n".join(
+        f'- {param}: {properties.get(param, {}).get("description", "No description")}'
+        for param in required_params
+    )
+    return required_params, properties, param_descriptions
+
+async def _buffer_chunks(
+    chunks: AsyncIterator[str],
+    max_bytes: int = STREAM_BUFFER_BYTES,
+    max_delay: float = STREAM_BUFFER_DELAY
+) -> AsyncIterator[str]:
+    """
+    Coalesce small streamed tokens, flushing at max_bytes or once max_delay has passed.
+
+    The delay runs on a timer rather than being checked when the next token arrives,
+    so a pause in the model's output doesn't hold back what is already buffered.
+    """
+    iterator = chunks.__aiter__()
+    buffer: List[str] = []
+    size = 0
+    deadline = 0.0
+    # The pending read is kept across timeouts: cancelling it would close the source
+    next_chunk = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            timeout = max(deadline - time.monotonic(), 0) if buffer else None
+            done, _ = await asyncio.wait((next_chunk,), timeout=timeout)
+            if not done:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+                continue
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            next_chunk = asyncio.ensure_future(iterator.__anext__())
+            if not buffer:
+                deadline = time.monotonic() + max_delay
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+    finally:
+        next_chunk.cancel()
+    if buffer:
+        yield "".join(buffer)
+
+@lru_cache(maxsize=None)
+def _tool_enum_patterns(tool_cls: type, args_schema: Optional[type]) -> Dict[str, "re.Pattern[str]"]:
+    """Compile one regex per required enum param, matching any allowed value (underscores may be spaces)."""
+    required_params, properties, _ = _tool_schema(tool_cls, args_schema)
+    patterns = {}
+    for param in required_params:
+        options = properties.get(param, {}).get('enum')
+        if options:
+            alternatives = "|".join(re.escape(str(option).lower()).replace('_', '[_ ]') for option in options)
+            patterns[param] = re.compile(rf'\b({alternatives})\b')
+    return patterns
+
+@lru_cache(maxsize=None)
+def _tool_number_patterns(tool_cls: type, args_schema: Optional[type]) -> Dict[str, "re.Pattern[str]"]:
+    """Compile one regex per required numeric param, matching a number just before or after its name."""
+    required_params, properties, _ = _tool_schema(tool_cls, args_schema)
+    patterns = {}
+    for param in required_params:
+        if properties.get(param, {}).get('type') not in ('number', 'integer'):
+            continue
+        name = re.escape(param.lower()).replace('_', '[_ ]')
+        patterns[param] = re.compile(
+            rf'\b{name}\b\s*(?:[:=]|is|of)?\s*\$?({_NUMBER_RE.pattern})'
+            rf'|\$?({_NUMBER_RE.pattern})%?\s*(?:of\s+)?\b{name}\b'
+        )
+    return patterns
+
+class RealEstateAgent(BaseAgent):
+    """
+    Specialized agent for commercial real estate interactions.
+    Handles property analysis, market research, and value propositions.
+    """
+    
+    llm: ChatOpenAI = Field(default_factory=lambda: ChatOpenAI(
+        model_name=settings.MODEL_NAME,
+        temperature=settings.TEMPERATURE,
+        api_key=settings.OPENAI_API_KEY,
+        streaming=True,  # Enable streaming for better UX
+        http_async_client=_get_http_async_client()
+    ))
+    summarizer_llm: ChatOpenAI = Field(default_factory=lambda: ChatOpenAI(
+        model_name=settings.SUMMARY_MODEL_NAME,
+        temperature=0,
+        api_key=settings.OPENAI_API_KEY
+    ))
+    
+    # Cached (timestamp, message) pair shared by all agent instances
+    _system_message_cache: ClassVar[Dict[str, Tuple[float, str]]] = {}
+    # Full responses keyed by model settings, system message, history, input and tool names
+    response_cache: ClassVar[LLMCache] = LLMCache(max_size=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+    # Set once response_cache is cleared on corpus changes, so the hook is registered only once
+    _response_cache_hooked: ClassVar[bool] = False
+    # Compiled prompt templates keyed by (llm type, system message)
+    _prompt_cache: ClassVar[Dict[Tuple[str, str], "ChatPromptTemplate"]] = {}
+    # Compiled OpenAI-functions agents keyed by (llm id, tool ids, prompt id)
+    _agent_cache: ClassVar[Dict[Tuple[int, Tuple[int, ...], int], Any]] = {}
+    # Tools keyed by name, rebuilt whenever setup_tools runs
+    tools_by_name: Dict[str, BaseTool] = Field(default_factory=dict)
+    _tool_keyword_index: Dict[str, BaseTool] = PrivateAttr(default_factory=dict)
+    _refresh_task: Optional[asyncio.Task] = PrivateAttr(default=None)
+    # Event loop kept alive in a daemon thread so run() doesn't create one per call
+    _loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    _loop_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def invalidate_system_message(cls) -> None:
+        """Drop the cached system message so the next fetch hits Supabase."""
+        cls._system_message_cache.clear()
+
+    async def _get_system_message_async(self, force_refresh: bool = False) -> str:
+        """Fetch the active system message from Supabase, cached for SYSTEM_MESSAGE_TTL seconds."""
+        cached = self._system_message_cache.get("active")
+        if not force_refresh and cached and time.monotonic() - cached[0] < SYSTEM_MESSAGE_TTL:
+            return cached[1]
+
+        try:
+            from config.supabase import get_async_supabase
+
+            supabase = await get_async_supabase(auth=False)  # Use admin client
+            result = await supabase.table('system_messages').select('*').eq('is_active', True).limit(1).execute()
+            
+            if result.data and len(result.data) > 0:
+                message = result.data[0]['message']
+            else:
+                # Use default message if no active message found
+                message = DEFAULT_SYSTEM_MESSAGE
+
+            self._system_message_cache["active"] = (time.monotonic(), message)
+            return message
             
         except Exception as e:
-            logger.error(f"Error fetching system message: {str(e)}")
+            logger.error("Error fetching system message: %s", e)
             return self.system_message
 
+    async def _refresh_system_message_loop(self) -> None:
+        """Keep the system message cache warm, rebuilding the executor when the message changes."""
+        while True:
+            await asyncio.sleep(SYSTEM_MESSAGE_TTL)
+            try:
+                system_message = await self._get_system_message_async(force_refresh=True)
+                if system_message != self.system_message:
+                    self.system_message = system_message
+                    self.agent_executor = self.initialize_agent()
+            except Exception as e:
+                logger.error("Error refreshing system message: %s", e)
+
     def __init__(
         self,
         model_name: Optional[str] = None,
@@ -110,7 +339,8 @@ class RealEstateAgent(BaseAgent):
                 model_name=model_name or settings.MODEL_NAME,
                 temperature=temperature or settings.TEMPERATURE,
                 api_key=settings.OPENAI_API_KEY,
-                streaming=True
+                streaming=True,
+                http_async_client=_get_http_async_client()
             )
         
         self.setup_tools()
@@ -119,14 +349,34 @@ class RealEstateAgent(BaseAgent):
     async def initialize(self):
         """Async initialization method to be called after construction."""
         try:
-            system_message = self._get_system_message()  # Now calling sync method
+            system_message = await self._get_system_message_async()
             self.system_message = system_message
             self.agent_executor = self.initialize_agent()
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh_system_message_loop())
         except Exception as e:
-            logger.error(f"Error in async initialization: {str(e)}")
+            logger.error("Error in async initialization: %s", e)
 
     def setup_tools(self) -> List[Tool]:
         """Initialize and return the list of tools available to the agent"""
+        from tools.property_analysis import PropertyAnalysisTool, PropertyMetricsCalculator
+        from tools.market_analysis import MarketAnalysisTool, MarketMetricsCalculator
+        from tools.value_proposition import ValuePropositionTool, FinancialCalculatorTool
+        from tools.document_search import DocumentSearchTool
+        from tools.tavily_search import TavilySearchTool
+        from tools.fred_economic import FREDEconomicTool
+        from tools.cold_call import ColdCallScriptTool
+        from tools.object_handler import ObjectionHandlerTool
+        from tools.sales_strategy_advisor import SalesStrategyAdvisorTool
+        from tools.comparable_analysis import ComparableAnalysisTool
+        from vectorstore.supabase_store import on_corpus_change
+
+        # Answers may rest on document_search results, so they go stale with the corpus
+        with RealEstateAgent._loop_lock:
+            if not RealEstateAgent._response_cache_hooked:
+                on_corpus_change(RealEstateAgent.response_cache.clear)
+                RealEstateAgent._response_cache_hooked = True
+
         self.tools = [
             PropertyAnalysisTool(),
             MarketAnalysisTool(),
@@ -142,50 +392,85 @@ class RealEstateAgent(BaseAgent):
             MarketMetricsCalculator(),
             FinancialCalculatorTool()
         ]
+
+        self.tools_by_name = {tool.name: tool for tool in self.tools}
+
+        # Warm the per-tool schema cache used by parameter extraction
+        for tool in self.tools:
+            _tool_schema(type(tool), tool.args_schema)
+
+        # Index every tool by its lowercased name and name parts for keyword-based selection
+        self._tool_keyword_index = {}
+        for tool in self.tools:
+            name = tool.name.lower()
+            self._tool_keyword_index[name] = tool
+            for keyword in name.split('-'):
+                self._tool_keyword_index.setdefault(keyword, tool)
         return self.tools
 
-    def initialize_agent(self) -> AgentExecutor:
-        """Initialize or reinitialize the agent executor with current tools."""
-        try:
-            # Create the prompt template with enhanced system message
+    def _get_prompt_template(self) -> "ChatPromptTemplate":
+        """
+        Build the agent prompt, reusing a cached template for an unchanged system message.
+
+        The static calculator guidance is placed first so the system block starts with a
+        byte-identical prefix on every call, which lets provider-side prompt caching kick in.
+        OpenAI caches such prefixes automatically; for Anthropic models the system block is
+        sent as a content block marked with cache_control. Only the system prompt is marked,
+        never chat history or tool results, which change on every call.
+        """
+        llm_type = self.llm._llm_type
+        cache_key = (llm_type, self.system_message)
+        prompt = self._prompt_cache.get(cache_key)
+        if prompt is None:
+            from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder, HumanMessagePromptTemplate
+            from langchain.schema import SystemMessage
+
+            system_text = _CALC_GUIDANCE + "\n\n" + self.system_message
+            if llm_type.startswith("anthropic"):
+                system_content = [{"type": "text", "text": system_text, "cache_control": {"type": "ephemeral"}}]
+            else:
+                system_content = system_text
+
             prompt = ChatPromptTemplate.from_messages([
-                SystemMessage(content=self.system_message + """
-                You now have access to powerful calculation tools for:
-                
-                Financial Metrics (use financial_calculator):
-                - ROI (Return on Investment)
-                - Cap Rate (Capitalization Rate)
-                - NOI (Net Operating Income)
-                
-                Market Metrics (use market_metrics_calculator):
-                - Vacancy Rate
-                - Absorption Rate
-                - Rent Growth Rate
-                
-                Property Metrics (use property_metrics_calculator):
-                - Price per Square Foot
-                - Operating Expense Ratio
-                - DSCR (Debt Service Coverage Ratio)
-                
-                Make sure to use the correct calculator for each metric.
-                Always show your calculations and explain the results in a clear, professional manner.
-                """),
+                SystemMessage(content=system_content),
                 MessagesPlaceholder(variable_name="chat_history"),
                 HumanMessagePromptTemplate.from_template("{input}"),
                 MessagesPlaceholder(variable_name="agent_scratchpad")
             ])
+            self._prompt_cache[cache_key] = prompt
+        return prompt
 
-            # Create the agent with OpenAI functions
-            agent = create_openai_functions_agent(
-                self.llm,
-                self.tools,
-                prompt
-            )
+    def initialize_agent(self, tools: Optional[List[BaseTool]] = None) -> AgentExecutor:
+        """Initialize or reinitialize the agent executor with the given tools (default: all tools)."""
+        from langchain.agents import create_openai_functions_agent
+
+        if tools is None:
+            tools = self.tools
+        if self.memory is None:
+            self.setup_memory()
+
+        try:
+            prompt = self._get_prompt_template()
+
+            # Reuse the compiled agent for an unchanged (llm, tools, prompt) combination.
+            # Cached agents hold references to all three, so their ids stay unique.
+            key = (id(self.llm), tuple(id(tool) for tool in tools), id(prompt))
+            agent = self._agent_cache.get(key)
+            if agent is None:
+                # Create the agent with OpenAI functions
+                agent = create_openai_functions_agent(
+                    self.llm,
+                    tools,
+                    prompt
+                )
+                if len(self._agent_cache) >= AGENT_CACHE_SIZE:
+                    self._agent_cache.pop(next(iter(self._agent_cache)))
+                self._agent_cache[key] = agent
 
             # Create the executor with optimized settings
             return AgentExecutor(
                 agent=agent,
-                tools=self.tools,
+                tools=tools,
                 memory=self.memory,
                 max_iterations=10,
                 max_execution_time=30,
@@ -195,118 +480,265 @@ class RealEstateAgent(BaseAgent):
             )
 
         except Exception as e:
-            logger.error(f"Error initializing agent: {str(e)}")
+            logger.error("Error initializing agent: %s", e)
             raise
 
-    async def arun(self, input_text: str) -> str:
-        """Run the agent asynchronously with streaming support."""
+    async def arun(self, input_text: str, tools: Optional[List[BaseTool]] = None) -> str:
+        """Run the agent asynchronously and return the full response."""
+        return "".join([chunk async for chunk in self.astream(input_text, tools=tools)])
+
+    async def astream(self, input_text: str, tools: Optional[List[BaseTool]] = None) -> AsyncIterator[str]:
+        """
+        Run the agent asynchronously, yielding buffered response chunks as they are generated.
+
+        Args:
+            input_text: The user's message
+            tools: Optional subset of the agent's tools to use for this call only
+        """
+        cache_key = LLMCache.make_key(
+            self.llm.model_name,
+            self.llm.temperature,
+            [self.system_message, *(message.content for message in self.get_chat_history()), input_text],
+            sorted(tool.name for tool in (self.tools if tools is None else tools))
+        )
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            # Record the turn as the uncached paths do, so history has no gap
+            if self.memory is not None:
+                await self.memory.asave_context({"input": input_text}, {"output": cached})
+            return
+
+        chunks = []
+        # _astream_tokens clears this when the answer used live data or is an error fallback
+        status = {"cacheable": True}
+        async for chunk in _buffer_chunks(self._astream_tokens(input_text, tools, status)):
+            chunks.append(chunk)
+            yield chunk
+        if status["cacheable"]:
+            self.response_cache.set(cache_key, "".join(chunks))
+
+    async def _astream_tokens(
+        self,
+        input_text: str,
+        tools: Optional[List[BaseTool]] = None,
+        status: Optional[Dict[str, bool]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield response tokens from the tool pipeline or the agent executor.
+
+        status["cacheable"] is set to False when the response depends on a live-data tool
+        or is the error fallback, so callers know not to cache it.
+        """
+        if status is None:
+            status = {}
         try:
             if not self.agent_executor:
                 self.agent_executor = self.initialize_agent()
 
-            # Create an async LLM instance for parameter extraction
-            async_llm = ChatOpenAI(
-                model_name=settings.MODEL_NAME,
-                temperature=settings.TEMPERATURE,
-                api_key=settings.OPENAI_API_KEY,
-                streaming=True
-            )
+            # A per-call tool subset gets its own executor; shared state is never modified
+            if tools is None:
+                tools = self.tools
+                agent_executor = self.agent_executor
+            else:
+                agent_executor = self.initialize_agent(tools)
 
             # Get selected tools from input context
+            tokens = set(_TOKEN_RE.findall(input_text.lower()))
             selected_tools = []
-            for tool in self.tools:
-                if (tool.name.lower() in input_text.lower() or 
-                    any(keyword in input_text.lower() for keyword in tool.name.split('-'))):
+            for keyword, tool in self._tool_keyword_index.items():
+                if keyword in tokens and tool in tools and tool not in selected_tools:
                     selected_tools.append(tool)
 
             if not selected_tools:
-                selected_tools = self.tools
+                selected_tools = tools
 
-            # Create tasks for each selected tool
-            tasks = []
-            for tool in selected_tools:
-                if hasattr(tool, '_arun'):
-                    tool_params = await self._extract_tool_params(tool, input_text, async_llm)
-                    if tool_params:
-                        tasks.append(self._execute_tool(tool, tool_params))
+            # A single clearly-matched tool with trivial arguments skips the routing LLM call
+            tool_calls = None
+            if len(selected_tools) == 1:
+                fast_params = self._try_fast_extract(selected_tools[0], input_text)
+                if fast_params is not None:
+                    tool_calls = [(selected_tools[0], fast_params)]
+
+            # Route to tools and extract their parameters
+            if tool_calls is None and selected_tools:
+                tool_calls = await self._route_tool_calls(selected_tools, input_text, self.llm)
+            tasks = [self._execute_tool(tool, tool_params) for tool, tool_params in tool_calls or []]
+            if any(tool.name in LIVE_DATA_TOOLS for tool, _ in tool_calls or []):
+                status["cacheable"] = False
 
             # Execute tools concurrently
             if tasks:
-                import asyncio
                 results = await asyncio.gather(*tasks, return_exceptions=True)
                 
                 processed_results = []
                 for result in results:
                     if isinstance(result, Exception):
-                        logger.error(f"Tool execution error: {str(result)}")
+                        logger.error("Tool execution error: %s", result)
                         continue
                     if result is not None:
                         processed_results.append(result)
 
                 if processed_results:
-                    return await self._generate_combined_response(processed_results, input_text, async_llm)
+                    response = []
+                    async for chunk in self._generate_combined_response(processed_results, input_text, self.llm):
+                        response.append(chunk)
+                        yield chunk
+                    if response and response[-1] is _COMBINED_RESPONSE_ERROR:
+                        status["cacheable"] = False
+                        return
+                    # The executor saves its own turns; this path bypasses it, so record the turn
+                    # here (async, so summarizing older turns doesn't block the event loop)
+                    await self.memory.asave_context({"input": input_text}, {"output": "".join(response)})
+                    return
 
-            # Fall back to regular agent if no async tools were executed
-            response = await self.agent_executor.ainvoke(
+            # Fall back to regular agent if no async tools were executed; it may call any of its tools
+            if any(tool.name in LIVE_DATA_TOOLS for tool in tools):
+                status["cacheable"] = False
+            async for event in agent_executor.astream_events(
                 {
                     "input": input_text,
-                    "chat_history": self.memory.chat_memory.messages if self.memory else []
-                }
-            )
-            return response["output"]
+                    "chat_history": self.get_chat_history()
+                },
+                version="v2"
+            ):
+                if event["event"] == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    if content:
+                        yield content
 
         except Exception as e:
-            logger.error(f"Error in async execution: {str(e)}")
+            logger.error("Error in async execution: %s", e)
             raise
 
+    def _try_fast_extract(self, tool: BaseTool, input_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Fill a tool's required parameters straight from the input when they are all numbers or enums.
+
+        Each number must sit right next to its parameter's name ("building size 25000",
+        "6% cap rate"), and the input must hold no other numbers, so a value is never
+        guessed from its position. Returns None if any required parameter can't be filled this way.
+        """
+        required_params, properties, _ = _tool_schema(type(tool), tool.args_schema)
+        if not required_params:
+            return None
+
+        enum_patterns = _tool_enum_patterns(type(tool), tool.args_schema)
+        number_patterns = _tool_number_patterns(type(tool), tool.args_schema)
+        text = input_text.lower().replace(',', '')
+        if len(_NUMBER_RE.findall(text)) != len(number_patterns):
+            return None
+
+        params = {}
+        used_spans = set()
+        for param in required_params:
+            if param in enum_patterns:
+                match = enum_patterns[param].search(text)
+                if not match:
+                    return None
+                params[param] = match.group(1).replace(' ', '_')
+                continue
+
+            if param not in number_patterns:
+                return None
+            match = number_patterns[param].search(text)
+            if not match:
+                return None
+            group = 1 if match.group(1) is not None else 2
+            span = match.span(group)
+            if span in used_spans:
+                return None
+            used_spans.add(span)
+            value = match.group(group)
+            param_type = properties[param]['type']
+            params[param] = int(float(value)) if param_type == 'integer' else float(value)
+        return params
+
+    async def _route_tool_calls(
+        self,
+        tools: List[BaseTool],
+        input_text: str,
+        async_llm: ChatOpenAI
+    ) -> List[Tuple[BaseTool, Dict[str, Any]]]:
+        """
+        Pick tools and their arguments with a single function-calling request.
+
+        Falls back to per-tool parameter extraction if the batched call fails.
+        """
+        try:
+            tool_map = {tool.name: tool for tool in tools}
+            router = async_llm.bind_tools(tools, parallel_tool_calls=True)
+            response = await router.ainvoke([HumanMessage(content=input_text)])
+            return [
+                (tool_map[call["name"]], call["args"])
+                for call in response.tool_calls
+                if call["name"] in tool_map
+            ]
+        except Exception as e:
+            logger.error("Error routing tool calls, falling back to per-tool extraction: %s", e)
+            return await self._extract_tool_calls_legacy(tools, input_text, async_llm)
+
+    async def _extract_tool_calls_legacy(
+        self,
+        tools: List[BaseTool],
+        input_text: str,
+        async_llm: ChatOpenAI
+    ) -> List[Tuple[BaseTool, Dict[str, Any]]]:
+        """Extract parameters with one LLM call per tool, run concurrently."""
+        async_tools = [tool for tool in tools if hasattr(tool, '_arun')]
+        param_results = await asyncio.gather(
+            *[self._extract_tool_params(tool, input_text, async_llm) for tool in async_tools],
+            return_exceptions=True
+        )
+
+        tool_calls = []
+        for tool, tool_params in zip(async_tools, param_results):
+            if isinstance(tool_params, Exception):
+                logger.error("Error extracting parameters for %s: %s", tool.name, tool_params)
+                continue
+            if tool_params:
+                tool_calls.append((tool, tool_params))
+        return tool_calls
+
     async def _execute_tool(self, tool: Tool, params: Dict[str, Any]) -> Any:
         """Execute a single tool with error handling."""
         try:
             if hasattr(tool, '_arun'):
                 return await tool._arun(**params)
             else:
-                import asyncio
                 return await asyncio.to_thread(tool._run, **params)
         except Exception as e:
-            logger.error(f"Error executing tool {tool.name}: {str(e)}")
+            logger.error("Error executing tool %s: %s", tool.name, e)
             return None
 
     async def _extract_tool_params(self, tool: Tool, input_text: str, async_llm: ChatOpenAI) -> Optional[Dict[str, Any]]:
         """Extract tool-specific parameters from input text using the LLM."""
         try:
-            schema = tool.args_schema.model_json_schema() if hasattr(tool, 'args_schema') else {}
-            required_params = schema.get('required', []) if schema else []
-            properties = schema.get('properties', {}) if schema else {}
+            required_params, properties, param_descriptions = _tool_schema(type(tool), tool.args_schema)
 
-            prompt = f"""
-            Based on the user input: "{input_text}"
-            Extract parameters for the tool: {tool.name}
-            Tool description: {tool.description}
-            
-            Required parameters: {required_params}
-            Parameter descriptions:
-            {chr(10).join([f'- {param}: {properties.get(param, {}).get("description", "No description")}' for param in required_params])}
-            
-            Return only the parameter values in valid JSON format.
-            If a required parameter cannot be extracted from the input, use a reasonable default value.
-            """
+            prompt = _PARAM_EXTRACTION_PROMPT.format(
+                input_text=input_text,
+                tool_name=tool.name,
+                tool_description=tool.description,
+                required_params=required_params,
+                param_descriptions=param_descriptions
+            )
             
             response = await async_llm.ainvoke([HumanMessage(content=prompt)])
             
-            import json
             try:
-                params = json.loads(response.content)
+                params = orjson.loads(response.content)
                 if isinstance(params, dict):
                     for param in required_params:
                         if param not in params:
                             params[param] = self._get_default_param_value(param, properties.get(param, {}))
                     return params
                 return None
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 return None
                 
         except Exception as e:
-            logger.error(f"Error extracting tool parameters: {str(e)}")
+            logger.error("Error extracting tool parameters: %s", e)
             return None
 
     def _get_default_param_value(self, param: str, param_info: Dict[str, Any]) -> Any:
@@ -323,17 +755,14 @@ class RealEstateAgent(BaseAgent):
         else:
             return None
 
-    async def _generate_combined_response(self, results: List[Any], input_text: str, async_llm: ChatOpenAI) -> str:
-        """Generate a combined response from multiple tool results."""
+    async def _generate_combined_response(self, results: List[Any], input_text: str, async_llm: ChatOpenAI) -> AsyncIterator[str]:
+        """Stream a combined response from multiple tool results."""
         try:
-            formatted_results = []
-            for result in results:
-                if isinstance(result, dict):
-                    formatted_results.extend([f"- {k}: {v}" for k, v in result.items()])
-                else:
-                    formatted_results.append(f"- {str(result)}")
-
-            results_str = "\n".join(formatted_results)
+            results_str = "\n".join(chain.from_iterable(
+                (f"- {k}: {str(v)[:MAX_RESULT_VALUE_CHARS]}" for k, v in result.items())
+                if isinstance(result, dict) else (f"- {str(result)[:MAX_RESULT_VALUE_CHARS]}",)
+                for result in results
+            ))
             
             prompt = f"""
             Based on the user input: "{input_text}"
@@ -347,20 +776,29 @@ class RealEstateAgent(BaseAgent):
             4. Maintains a professional tone suitable for commercial real estate
             """
             
-            response = await async_llm.ainvoke([HumanMessage(content=prompt)])
-            return response.content
+            async for chunk in async_llm.astream([HumanMessage(content=prompt)]):
+                if chunk.content:
+                    yield chunk.content
             
         except Exception as e:
-            logger.error(f"Error generating combined response: {str(e)}")
-            return "I apologize, but I encountered an error while processing the results. Please try again or contact support."
+            logger.error("Error generating combined response: %s", e)
+            yield _COMBINED_RESPONSE_ERROR
+
+    @classmethod
+    def _get_loop(cls) -> asyncio.AbstractEventLoop:
+        """Return the persistent background event loop used by run(), starting it on first use."""
+        with cls._loop_lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                threading.Thread(target=cls._loop.run_forever, daemon=True).start()
+        return cls._loop
 
     def run(self, input_text: str) -> str:
         """Run the agent synchronously."""
-        import asyncio
         try:
-            return asyncio.run(self.arun(input_text))
+            return asyncio.run_coroutine_threadsafe(self.arun(input_text), self._get_loop()).result()
         except Exception as e:
-            logger.error(f"Error in sync execution: {str(e)}")
+            logger.error("Error in sync execution: %s", e)
             raise
 
     model_config = {
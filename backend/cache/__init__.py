@@ -0,0 +1,5 @@
+from .llm_cache import LLMCache
+from .search_cache import SearchCache
+from .ttl_cache import cached, invalidate
+
+__all__ = ['LLMCache', 'SearchCache', 'cached', 'invalidate']
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+import hashlib
+import threading
+import time
+import numpy as np
+
+
+class SearchCache:
+    """
+    In-process LRU cache for web search results with a TTL per entry.
+
+    Lookups are exact first, on a hash of the normalized query and search
+    parameters. Entries stored with a query embedding can also be matched
+    semantically: a new query whose embedding has cosine similarity of at least
+    similarity_threshold with a cached one, searched with the same parameters,
+    reuses that entry's results.
+    """
+
+    def __init__(self, max_size: int = 512, similarity_threshold: float = 0.92):
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        # Every get() is a lookup; a lookup answered by get_similar() counts as a semantic hit
+        self.lookups = 0
+        self.hits = 0
+        self.semantic_hits = 0
+        # key -> (expires_at, value, params)
+        self._entries: "OrderedDict[bytes, Tuple[float, Any, Hashable]]" = OrderedDict()
+        # Unit-length query embeddings; row i belongs to _embedding_keys[i]
+        self._embeddings: Optional[np.ndarray] = None
+        self._embedding_keys: List[bytes] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: str, params: Hashable) -> bytes:
+        """Hash a query and its search parameters; case and extra whitespace are ignored."""
+        normalized = " ".join(query.lower().split())
+        return hashlib.blake2b(f"{normalized}|{params!r}".encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired."""
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            return None
+
+    def get_similar(self, embedding: Sequence[float], params: Hashable) -> Optional[Any]:
+        """Return the live entry with the same params whose query is closest to embedding, if close enough."""
+        with self._lock:
+            if self._embeddings is None or not self._embedding_keys:
+                return None
+            query = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm == 0:
+                return None
+            similarities = self._embeddings @ (query / norm)
+            now = time.monotonic()
+            for index in np.argsort(similarities)[::-1]:
+                if similarities[index] < self.similarity_threshold:
+                    break
+                key = self._embedding_keys[index]
+                expires_at, value, entry_params = self._entries[key]
+                if entry_params == params and expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.semantic_hits += 1
+                    return value
+            return None
+
+    def set(self, key: bytes, value: Any, ttl: float, params: Hashable = None,
+            embedding: Optional[Sequence[float]] = None) -> None:
+        """Store value for ttl seconds, evicting the least recently used entry when full."""
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, params)
+            if embedding is not None:
+                row = np.asarray(embedding, dtype=np.float32)
+                norm = np.linalg.norm(row)
+                if norm:
+                    row = (row / norm)[np.newaxis, :]
+                    self._embeddings = row if self._embeddings is None else np.vstack((self._embeddings, row))
+                    self._embedding_keys.append(key)
+            if len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: bytes) -> None:
+        """Drop key and its embedding row; the caller holds the lock."""
+        if self._entries.pop(key, None) is None:
+            return
+        if key in self._embedding_keys:
+            index = self._embedding_keys.index(key)
+            del self._embedding_keys[index]
+            self._embeddings = np.delete(self._embeddings, index, axis=0)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._embeddings = None
+            self._embedding_keys = []
+            self.lookups = 0
+            self.hits = 0
+            self.semantic_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        answered = self.hits + self.semantic_hits
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.lookups - answered,
+            "hit_rate": answered / self.lookups if self.lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_size
+        }
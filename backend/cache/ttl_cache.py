@@ -0,0 +1,47 @@
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+import time
+
+# Maximum number of keys kept; the oldest entry is dropped beyond this
+MAX_ENTRIES = 10000
+
+_entries: Dict[str, Tuple[float, Any]] = {}
+# Keys with a loader running, and how many; invalidate() marks those it hits as stale
+# so a load that started before the write doesn't store its result afterwards
+_loading: Dict[str, int] = {}
+_stale: Set[str] = set()
+
+
+async def cached(key: str, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Return the value cached under key, or await loader() and cache its result for ttl seconds.
+
+    The cache lives in this process only, so each worker keeps its own copy.
+    """
+    entry = _entries.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    _loading[key] = _loading.get(key, 0) + 1
+    try:
+        value = await loader()
+    finally:
+        _loading[key] -= 1
+        invalidated = key in _stale
+        if not _loading[key]:
+            del _loading[key]
+            _stale.discard(key)
+    if invalidated:
+        return value
+
+    _entries.pop(key, None)
+    _entries[key] = (time.monotonic() + ttl, value)
+    if len(_entries) > MAX_ENTRIES:
+        _entries.pop(next(iter(_entries)))
+    return value
+
+
+def invalidate(*prefixes: str) -> None:
+    """Drop every cached key starting with any of the given prefixes, including loads in flight."""
+    for key in [key for key in _entries if key.startswith(prefixes)]:
+        del _entries[key]
+    _stale.update(key for key in _loading if key.startswith(prefixes))
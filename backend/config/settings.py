@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings # type: ignore
 from dotenv import load_dotenv # type: ignore
 
@@ -17,6 +17,8 @@ class Settings(BaseSettings):
     # Supabase settings
     SUPABASE_URL: str
     SUPABASE_SERVICE_KEY: str
+    SUPABASE_ANON_KEY: str
+    SUPABASE_JWT_SECRET: Optional[str] = None  # Lets access tokens be verified without a call to Supabase Auth
     VECTOR_STORE_TABLE: str = "documents"
     VECTOR_STORE_QUERY: str = "match_documents"
     
@@ -27,6 +29,14 @@ class Settings(BaseSettings):
     # Model settings
     MODEL_NAME: str = "gpt-4-turbo-preview"
     TEMPERATURE: float = 0.7
+    SUMMARY_MODEL_NAME: str = "gpt-4o-mini"  # Cheap model used to summarize old chat turns
+    
+    # Document ingestion settings: chunk length and overlap, in cl100k_base tokens
+    CHUNK_SIZE: int = 256
+    CHUNK_OVERLAP: int = 32
+    
+    # Browser origins allowed by CORS; leave empty when CORS is handled by the reverse proxy
+    CORS_ORIGINS: List[str] = ["http://localhost:3000"]
     
     # Logging settings
     LOG_LEVEL: str = "INFO"
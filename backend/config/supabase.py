@@ -1,20 +1,69 @@
-from supabase import create_client
-import os
-from dotenv import load_dotenv
+import asyncio
+from functools import lru_cache
+from typing import Dict
+import httpx
+from postgrest import AsyncPostgrestClient
+from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+from supabase._async.client import AsyncClient
+from config.settings import settings
 
-load_dotenv()
+# Keep-alive pool for PostgREST requests; each cached async client owns one
+SUPABASE_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+SUPABASE_HTTP_TIMEOUT = 30
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+_async_clients: Dict[bool, AsyncClient] = {}
+_async_clients_lock = asyncio.Lock()
 
-if not SUPABASE_URL or not SUPABASE_ANON_KEY or not SUPABASE_SERVICE_KEY:
-    raise ValueError("SUPABASE_URL, SUPABASE_ANON_KEY and SUPABASE_SERVICE_KEY must be set in .env file")
+@lru_cache(maxsize=2)
+def get_supabase(auth=True) -> Client:
+    """Get Supabase client. Use auth=True for user operations, auth=False for admin operations.
 
-# Create two clients - one with anon key for auth, one with service key for admin operations
-supabase_auth = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    Two clients are kept - one with the anon key for auth, one with the service key for
+    admin operations - and each is created once and reused for the life of the process.
+    """
+    return create_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_ANON_KEY if auth else settings.SUPABASE_SERVICE_KEY
+    )
 
-def get_supabase(auth=True):
-    """Get Supabase client. Use auth=True for user operations, auth=False for admin operations."""
-    return supabase_auth if auth else supabase_admin
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """PostgREST client whose HTTP/2 session uses SUPABASE_HTTP_LIMITS"""
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=SUPABASE_HTTP_LIMITS
+        )
+
+class _PooledAsyncClient(AsyncClient):
+    """Async Supabase client that routes table and rpc calls through _PooledPostgrestClient"""
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=SUPABASE_HTTP_TIMEOUT) -> AsyncPostgrestClient:
+        return _PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
+async def get_async_supabase(auth=True) -> AsyncClient:
+    """Async counterpart of get_supabase, for callers that must not block the event loop.
+
+    Each client is created once per process; the lock stops concurrent first requests
+    from each building their own client and connection pool.
+    """
+    client = _async_clients.get(auth)
+    if client is None:
+        async with _async_clients_lock:
+            client = _async_clients.get(auth)
+            if client is None:
+                # Fresh options per client: the library's default instance is shared and
+                # its headers would end up carrying whichever key was used last
+                client = await _PooledAsyncClient.create(
+                    settings.SUPABASE_URL,
+                    settings.SUPABASE_ANON_KEY if auth else settings.SUPABASE_SERVICE_KEY,
+                    ClientOptions(postgrest_client_timeout=SUPABASE_HTTP_TIMEOUT)
+                )
+                _async_clients[auth] = client
+    return client
@@ -1,6 +1,9 @@
-from typing import List, Union
+from typing import Any, Dict, List, Optional, Union
 from pathlib import Path
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from types import MappingProxyType
 import logging
+import os
 from logger import setup_logger
 from langchain_community.document_loaders import ( 
     UnstructuredExcelLoader,
@@ -15,49 +18,87 @@ logger = setup_logger(__name__)
 class DocumentLoader:
     """Handles loading of various document types with error handling and logging."""
     
-    SUPPORTED_EXTENSIONS = {
+    SUPPORTED_EXTENSIONS = MappingProxyType({
         '.xlsx': UnstructuredExcelLoader,
         '.pdf': PyPDFLoader,
         '.docx': Docx2txtLoader,
         '.txt': TextLoader
-    }
+    })
+    SUPPORTED_SUFFIXES = frozenset(SUPPORTED_EXTENSIONS)
     
     @classmethod
-    def load_file(cls, file_path: Union[str, Path]) -> List[Document]:
-        """Load a single file with appropriate loader based on extension."""
+    def load_file(
+        cls,
+        file_path: Union[str, Path],
+        extra_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """Load a single file with appropriate loader based on extension, merging in any extra metadata."""
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
             
         extension = file_path.suffix.lower()
-        if extension not in cls.SUPPORTED_EXTENSIONS:
+        if extension not in cls.SUPPORTED_SUFFIXES:
             raise ValueError(f"Unsupported file type: {extension}")
             
         try:
             loader = cls.SUPPORTED_EXTENSIONS[extension](str(file_path))
-            logger.info(f"Loading file: {file_path}")
+            logger.info("Loading file: %s", file_path)
             documents = loader.load()
-            logger.info(f"Successfully loaded {len(documents)} documents from {file_path}")
+            if extra_metadata:
+                for doc in documents:
+                    doc.metadata |= extra_metadata
+            logger.info("Successfully loaded %s documents from %s", len(documents), file_path)
             return documents
         except Exception as e:
-            logger.error(f"Error loading file {file_path}: {str(e)}")
+            logger.error("Error loading file %s: %s", file_path, e)
             raise
 
+    # Parsers that are cheap enough to run in threads rather than worker processes
+    THREADED_EXTENSIONS = frozenset({'.txt'})
+
     @classmethod
     def load_directory(cls, directory_path: Union[str, Path]) -> List[Document]:
-        """Load all supported files from a directory."""
+        """Load all supported files from a directory, parsing files in parallel."""
         directory = Path(directory_path)
         if not directory.exists():
             raise NotADirectoryError(f"Directory not found: {directory}")
             
-        all_documents = []
-        for file_path in directory.iterdir():
-            if file_path.suffix.lower() in cls.SUPPORTED_EXTENSIONS:
-                try:
-                    documents = cls.load_file(file_path)
-                    all_documents.extend(documents)
-                except Exception as e:
-                    logger.error(f"Error processing {file_path}: {str(e)}")
+        file_paths: List[str] = []
+        threaded_paths: List[str] = []
+        process_paths: List[str] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                extension = os.path.splitext(entry.name)[1].lower()
+                if extension not in cls.SUPPORTED_SUFFIXES or not entry.is_file():
                     continue
-                    
-        return all_documents
\ No newline at end of file
+                file_paths.append(entry.path)
+                if extension in cls.THREADED_EXTENSIONS:
+                    threaded_paths.append(entry.path)
+                else:
+                    process_paths.append(entry.path)
+
+        loaded: Dict[str, List[Document]] = {}
+        if threaded_paths:
+            with ThreadPoolExecutor() as executor:
+                cls._collect(executor, threaded_paths, loaded)
+        if process_paths:
+            with ProcessPoolExecutor(max_workers=min(len(process_paths), os.cpu_count() or 1)) as executor:
+                cls._collect(executor, process_paths, loaded)
+
+        all_documents = []
+        for file_path in file_paths:
+            all_documents.extend(loaded.get(file_path, []))
+        return all_documents
+
+    @classmethod
+    def _collect(cls, executor: Executor, file_paths: List[str], loaded: Dict[str, List[Document]]) -> None:
+        """Load files on the executor, skipping any that fail."""
+        futures = {executor.submit(cls.load_file, file_path): file_path for file_path in file_paths}
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                loaded[file_path] = future.result()
+            except Exception as e:
+                logger.error("Error processing %s: %s", file_path, e)
+                continue
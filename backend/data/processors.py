@@ -3,18 +3,49 @@ from langchain.schema import Document #type: ignore
 from langchain_community.vectorstores import SupabaseVectorStore #type: ignore
 from langchain_openai import OpenAIEmbeddings #type: ignore
 import os
+import asyncio
+import weakref
+from functools import lru_cache
+import httpx
+from cache import SearchCache
 from logger import setup_logger
 from config.settings import settings
 
 logger = setup_logger(__name__)
 
+# Search results are reused for SEARCH_CACHE_TTL seconds, for exact query matches and
+# for queries whose embeddings have at least SEMANTIC_SIMILARITY_THRESHOLD cosine similarity
+SEARCH_CACHE_TTL = 300
+SEARCH_CACHE_SIZE = 512
+SEMANTIC_SIMILARITY_THRESHOLD = 0.97
+
+@lru_cache(maxsize=1)
+def _get_embeddings() -> OpenAIEmbeddings:
+    """Embeddings client shared by all processors, backed by a pooled keep-alive HTTP client."""
+    return OpenAIEmbeddings(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        )
+    )
+
 class DocumentProcessor:
     """Handles processing and vectorization of documents."""
     
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings(
-            api_key=settings.OPENAI_API_KEY
-        )
+        self.embeddings = _get_embeddings()
+        # One search cache per vector store, dropped along with the store
+        self._search_caches: "weakref.WeakKeyDictionary[SupabaseVectorStore, SearchCache]" = weakref.WeakKeyDictionary()
+
+    def _search_cache(self, vector_store: SupabaseVectorStore) -> SearchCache:
+        """Return the search cache for vector_store, creating it on first use."""
+        cache = self._search_caches.get(vector_store)
+        if cache is None:
+            cache = self._search_caches.setdefault(
+                vector_store,
+                SearchCache(max_size=SEARCH_CACHE_SIZE, similarity_threshold=SEMANTIC_SIMILARITY_THRESHOLD)
+            )
+        return cache
         
     def process_documents(
         self,
@@ -34,17 +65,18 @@ class DocumentProcessor:
         try:
             if metadata:
                 for doc in documents:
-                    doc.metadata.update(metadata)
-            logger.info(f"Processed {len(documents)} documents")
+                    doc.metadata |= metadata
+            logger.info("Processed %s documents", len(documents))
             return documents
         except Exception as e:
-            logger.error(f"Error processing documents: {str(e)}")
+            logger.error("Error processing documents: %s", e)
             raise
     
     def vectorize_documents(
         self,
         documents: List[Document],
-        vector_store: SupabaseVectorStore
+        vector_store: SupabaseVectorStore,
+        batch_size: int = 128
     ) -> None:
         """
         Convert documents to vectors and store in vector database.
@@ -52,13 +84,54 @@ class DocumentProcessor:
         Args:
             documents: List of documents to vectorize
             vector_store: Vector store instance
+            batch_size: Number of documents embedded and inserted per request
         """
         try:
-            vector_store.add_documents(documents)
-            logger.info(f"Vectorized and stored {len(documents)} documents")
+            for start in range(0, len(documents), batch_size):
+                self._vectorize_batch(documents[start:start + batch_size], vector_store)
+            logger.info("Vectorized and stored %s documents", len(documents))
         except Exception as e:
-            logger.error(f"Error vectorizing documents: {str(e)}")
+            logger.error("Error vectorizing documents: %s", e)
             raise
+
+    async def avectorize_documents(
+        self,
+        documents: List[Document],
+        vector_store: SupabaseVectorStore,
+        batch_size: int = 128,
+        max_concurrency: int = 4
+    ) -> None:
+        """
+        Convert documents to vectors and store them, running sub-batches concurrently.
+        
+        Args:
+            documents: List of documents to vectorize
+            vector_store: Vector store instance
+            batch_size: Number of documents embedded and inserted per request
+            max_concurrency: Maximum number of batches in flight at once
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def vectorize(batch: List[Document]) -> None:
+            async with semaphore:
+                await asyncio.to_thread(self._vectorize_batch, batch, vector_store)
+
+        try:
+            await asyncio.gather(*[
+                vectorize(documents[start:start + batch_size])
+                for start in range(0, len(documents), batch_size)
+            ])
+            logger.info("Vectorized and stored %s documents", len(documents))
+        except Exception as e:
+            logger.error("Error vectorizing documents: %s", e)
+            raise
+
+    def _vectorize_batch(self, batch: List[Document], vector_store: SupabaseVectorStore) -> None:
+        """Embed a batch with a single embeddings request and insert it."""
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in batch])
+        vector_store.add_vectors(vectors, batch)
+        # Cached results predate these documents
+        self._search_cache(vector_store).clear()
             
     def search_similar(
         self,
@@ -78,12 +151,29 @@ class DocumentProcessor:
             List[Document]: Similar documents
         """
         try:
-            results = vector_store.similarity_search(
-                query,
-                k=num_results
-            )
-            logger.info(f"Found {len(results)} similar documents for query: {query}")
-            return results
+            cache = self._search_cache(vector_store)
+            key = SearchCache.make_key(query, num_results)
+
+            # Exact-match hit skips both the embedding call and the vector search
+            results = cache.get(key)
+            if results is not None:
+                logger.info("Search cache hit for query: %s", query)
+                return list(results)
+
+            # A previous query with a near-identical embedding skips the vector search
+            embedding = self.embeddings.embed_query(query)
+            results = cache.get_similar(embedding, num_results)
+            if results is None:
+                results = vector_store.similarity_search_by_vector(
+                    embedding,
+                    k=num_results
+                )
+                logger.info("Found %s similar documents for query: %s", len(results), query)
+            else:
+                logger.info("Semantic search cache hit for query: %s", query)
+
+            cache.set(key, results, SEARCH_CACHE_TTL, num_results, embedding)
+            return list(results)
         except Exception as e:
-            logger.error(f"Error searching similar documents: {str(e)}")
-            raise 
\ No newline at end of file
+            logger.error("Error searching similar documents: %s", e)
+            raise
@@ -1,47 +1,63 @@
 import asyncio
 from fastapi import FastAPI, HTTPException, UploadFile, File, Request, WebSocket, WebSocketDisconnect #type: ignore
-from fastapi.responses import StreamingResponse 
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware #type: ignore
-from pydantic import BaseModel #type: ignore
-from typing import Optional, List, Dict, Any
-from agents.real_estate_agent import RealEstateAgent
+from pydantic import BaseModel, TypeAdapter, ValidationError #type: ignore
+from typing import Optional, List, Dict, Any, Tuple
+from agents.real_estate_agent import RealEstateAgent, DEFAULT_SYSTEM_MESSAGE, LIVE_DATA_TOOLS
+from cache import LLMCache
 from logger import setup_logger
+from config.settings import settings
 import uvicorn #type: ignore
 from vectorstore.supabase_store import VectorStoreManager
 import tempfile
 import os
+import time
 from pathlib import Path
 from data.loaders import DocumentLoader
 from data.processors import DocumentProcessor
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import uuid
-from routes.auth import router as admin_router
+import orjson
+from routes.auth import router as auth_router
 from routes.user_auth import router as user_router
 from routes.dashboard import router as dashboard_router
 from routes.admin import router as admin_router
 from tools.custom_web_search import TavilySearchWrapper, TavilySearchInput
-from config.supabase import get_supabase
+from tools.tavily_search import search_cache
+from config.supabase import get_async_supabase
 
 logger = setup_logger(__name__)
 
+@lru_cache(maxsize=4)
+def _format_timestamp(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO-8601 string, formatted at most once per second."""
+    return _format_timestamp(int(time.time()))
+
 # Initialize FastAPI app
 app = FastAPI(
     title="CRE AI Assistant API",
     description="API for Commercial Real Estate AI Assistant tools and chat",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Initialize Supabase admin client
-supabase_admin = get_supabase(auth=False)
+# Configure CORS for the configured frontend origins only; with no origins the
+# middleware is left out of the stack entirely (CORS terminated at the proxy)
+if settings.CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE"],
+        allow_headers=["Authorization", "Content-Type"],
+    )
 
 # Initialize agent and vector store
 agent = RealEstateAgent(
@@ -66,20 +82,79 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+# Sent with every SSE response so proxies (nginx) and browsers don't buffer or cache the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Tool names accepted by the chat endpoints, mapped to the agent's tool names
+CHAT_TOOL_NAMES = {
+    'search': 'tavily_search',
+    'economic-data': 'fred_economic_data',
+    'market-analysis': 'market_analysis',
+    'property-analysis': 'property_analysis',
+    'value-proposition': 'value_proposition',
+    'document-search': 'document_search',
+}
+
+# Threads behind asyncio.to_thread and run_in_executor(None, ...); tool work there is
+# mostly blocking network I/O, so the pool is larger than asyncio's cpu_count-based default
+AGENT_IO_POOL_SIZE = int(os.getenv("AGENT_IO_POOL", "64"))
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize async components on startup."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=AGENT_IO_POOL_SIZE, thread_name_prefix="tool-io")
+    )
     try:
         await agent.initialize()
     except Exception as e:
         logger.error(f"Error initializing agent: {str(e)}")
         raise
+    # Fills in embeddings for large uploads once their OpenAI batch completes; with several
+    # workers only one polls, so they don't race on the same jobs
+    if _claim_embedding_job_poller():
+        app.state.embedding_job_poller = asyncio.create_task(vector_store.run_embedding_job_poller())
+
+def _claim_embedding_job_poller() -> bool:
+    """True in exactly one worker process on this host: the one holding the poller lock file."""
+    try:
+        import fcntl
+    except ImportError:
+        # No flock on Windows; main.py runs a single worker by default there
+        return True
+    lock_file = open(os.path.join(tempfile.gettempdir(), "reva-embedding-job-poller.lock"), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    # Kept open for the life of the process; the OS releases the lock when it exits
+    app.state.embedding_job_poller_lock = lock_file
+    return True
 
 vector_store = VectorStoreManager()
 
 # Initialize search wrapper
 tavily_search = TavilySearchWrapper()
 
+# Results of batched tool calls, keyed by tool name and request body
+tool_cache = LLMCache(max_size=256, ttl=300)
+
+# Tools that cache their own results; wrapping them in tool_cache too would mean two
+# TTLs and two places to invalidate
+SELF_CACHING_TOOLS = frozenset({"market_analysis", "property_analysis", "value_proposition"})
+
+async def _cached_tool_call(tool, request: BaseModel, **params) -> Any:
+    """Run tool._arun(**params), reusing the result of an identical earlier request."""
+    cache_key = LLMCache.make_key(tool.name, 0, request.model_dump())
+    result = tool_cache.get(cache_key)
+    if result is None:
+        result = await tool._arun(**params)
+        # Tools report failures as {"error": ...}; those are retried rather than replayed
+        if not (isinstance(result, dict) and "error" in result):
+            tool_cache.set(cache_key, result)
+    return result
+
 # Request Models
 class ChatRequest(BaseModel):
     message: str
@@ -120,6 +195,10 @@ class DocumentSearchInput(BaseModel):
     threshold: Optional[float] = 0.5
     filter: Optional[Dict[str, Any]] = None
 
+class ToolCall(BaseModel):
+    tool: str
+    args: Dict[str, Any] = {}
+
 # System Message Models
 class SystemMessageCreate(BaseModel):
     message: str
@@ -131,6 +210,17 @@ class SystemMessageResponse(BaseModel):
     created_at: str
     updated_at: str
 
+# Validators compiled once for the hottest endpoints, which parse their own bodies
+_CHAT_REQUEST_ADAPTER = TypeAdapter(ChatRequest)
+_TAVILY_SEARCH_ADAPTER = TypeAdapter(TavilySearchInput)
+
+async def _parse_body(raw: Request, adapter: TypeAdapter) -> Any:
+    """Validate a JSON request body directly from bytes, reporting errors like FastAPI does."""
+    try:
+        return adapter.validate_json(await raw.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
 @app.get("/")
 async def root():
     """Root endpoint to verify API is running."""
@@ -143,6 +233,7 @@ async def root():
 
 # Include routers
 try:
+    app.include_router(auth_router, prefix="/auth", tags=["auth"])
     app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
     app.include_router(user_router, prefix="/api/users", tags=["users"])
     app.include_router(dashboard_router, prefix="/api/dashboard", tags=["dashboard"])
@@ -161,33 +252,17 @@ async def websocket_endpoint(websocket: WebSocket):
             tools = data.get("tools", [])
 
             try:
-                # If tools are specified, filter the agent's tools
-                original_tools = agent.tools.copy()
+                # If tools are specified, restrict this request to them
+                filtered_tools = None
                 if tools:
-                    available_tools = {
-                        'search': agent.tools[4],
-                        'economic-data': agent.tools[5],
-                        'market-analysis': agent.tools[1],
-                        'property-analysis': agent.tools[0],
-                        'value-proposition': agent.tools[2],
-                        'document-search': agent.tools[3],
-                    }
-                    filtered_tools = [available_tools[tool] for tool in tools if tool in available_tools]
-                    agent.tools = filtered_tools
-
-                # Run agent asynchronously
-                response = await agent.arun(message)
-                
-                # Restore original tools
-                if tools:
-                    agent.tools = original_tools
-                
-                # Stream the response in smaller chunks
-                words = response.split()
-                for i in range(0, len(words), 3):
-                    chunk = " ".join(words[i:i+3])
+                    filtered_tools = [
+                        agent.tools_by_name[CHAT_TOOL_NAMES[tool]]
+                        for tool in tools if tool in CHAT_TOOL_NAMES
+                    ]
+
+                # Stream the response as the agent generates it
+                async for chunk in agent.astream(message, tools=filtered_tools):
                     await manager.send_message(chunk, websocket)
-                    await asyncio.sleep(0.1)  # Small delay for smoother streaming
                 
                 # Send completion signal
                 await manager.send_message("[DONE]", websocket)
@@ -195,9 +270,6 @@ async def websocket_endpoint(websocket: WebSocket):
             except Exception as e:
                 logger.error(f"Error in chat: {str(e)}")
                 await manager.send_message(f"ERROR: {str(e)}", websocket)
-                # Restore original tools on error
-                if tools:
-                    agent.tools = original_tools
 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -206,89 +278,73 @@ async def websocket_endpoint(websocket: WebSocket):
         manager.disconnect(websocket)
 
 @app.post("/chat")
-async def chat(request: ChatRequest):
+async def chat(raw: Request):
     """
     Chat with the AI assistant using all available tools with streaming support.
     This endpoint is kept for backward compatibility.
+
+    Expects a ChatRequest JSON body.
     """
+    request: ChatRequest = await _parse_body(raw, _CHAT_REQUEST_ADAPTER)
     try:
-        # If tools are specified, filter the agent's tools
-        original_tools = agent.tools.copy()  # Save original tools
+        # If tools are specified, restrict this request to them
+        filtered_tools = None
         if request.tools:
-            available_tools = {
-                'search': agent.tools[4],  # TavilySearchTool
-                'economic-data': agent.tools[5],  # FREDEconomicTool
-                'market-analysis': agent.tools[1],  # MarketAnalysisTool
-                'property-analysis': agent.tools[0],  # PropertyAnalysisTool
-                'value-proposition': agent.tools[2],  # ValuePropositionTool
-                'document-search': agent.tools[3],  # DocumentSearchTool
-            }
-            filtered_tools = [available_tools[tool] for tool in request.tools if tool in available_tools]
-            agent.tools = filtered_tools
+            filtered_tools = [
+                agent.tools_by_name[CHAT_TOOL_NAMES[tool]]
+                for tool in request.tools if tool in CHAT_TOOL_NAMES
+            ]
 
         async def generate():
             try:
-                # Run agent asynchronously
-                response = await agent.arun(request.message)
-                
-                # Restore original tools
-                if request.tools:
-                    agent.tools = original_tools
+                # Stream the response as the agent generates it; newlines inside
+                # a chunk are continued as extra data lines to keep SSE framing intact
+                async for chunk in agent.astream(request.message, tools=filtered_tools):
+                    yield b"data: " + chunk.replace("\n", "\ndata: ").encode("utf-8") + b"\n\n"
                 
-                # Stream the response in smaller chunks
-                words = response.split()
-                for i in range(0, len(words), 3):  # Send 3 words at a time
-                    chunk = " ".join(words[i:i+3])
-                    yield f"data: {chunk}\n\n"
-                    await asyncio.sleep(0.1)  # Small delay for smoother streaming
-                yield "data: [DONE]\n\n"
+                yield b"data: [DONE]\n\n"
                 
             except Exception as e:
                 logger.error(f"Error in chat: {str(e)}")
-                yield f"data: ERROR: {str(e)}\n\n"
-                # Restore original tools on error
-                if request.tools:
-                    agent.tools = original_tools
+                yield f"data: ERROR: {str(e)}\n\n".encode("utf-8")
 
         return StreamingResponse(
             generate(),
-            media_type="text/event-stream"
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
         )
 
     except Exception as e:
         logger.error(f"Error in chat: {str(e)}")
-        # Restore original tools on error
-        if request.tools and 'original_tools' in locals():
-            agent.tools = original_tools
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/tools/search")
-async def search_web(request: TavilySearchRequest) -> Dict[str, Any]:
+async def search_web(request: TavilySearchRequest) -> ORJSONResponse:
     """
     Search the web using Tavily's AI-powered search engine.
     """
     try:
-        tool = agent.tools[4]  # TavilySearchTool
+        tool = agent.tools_by_name["tavily_search"]
         result = await tool._arun(query=request.query, max_results=request.max_results)
-        return {"results": result}
+        return ORJSONResponse({"results": result})
     except Exception as e:
         logger.error(f"Error in web search: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/tools/economic-data")
-async def get_economic_data(request: FREDDataRequest) -> Dict[str, Any]:
+async def get_economic_data(request: FREDDataRequest) -> ORJSONResponse:
     """
     Fetch economic data from FRED (Federal Reserve Economic Data).
     """
     try:
-        tool = agent.tools[5]  # FREDEconomicTool
+        tool = agent.tools_by_name["fred_economic_data"]
         result = await tool._arun(
             series_id=request.series_id,
             observation_start=request.observation_start,
             observation_end=request.observation_end,
             units=request.units
         )
-        return {"data": result}
+        return ORJSONResponse({"data": result})
     except Exception as e:
         logger.error(f"Error fetching economic data: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -299,7 +355,7 @@ async def analyze_market(request: MarketAnalysisRequest) -> Dict[str, Any]:
     Perform market analysis for a specific location and property type.
     """
     try:
-        tool = agent.tools[1]  # MarketAnalysisTool
+        tool = agent.tools_by_name["market_analysis"]
         result = await tool._arun(
             market_area=request.location,
             property_type=request.property_type,
@@ -316,7 +372,7 @@ async def analyze_property(request: PropertyAnalysisRequest) -> Dict[str, Any]:
     Analyze a specific property.
     """
     try:
-        tool = agent.tools[0]  # PropertyAnalysisTool
+        tool = agent.tools_by_name["property_analysis"]
         result = await tool._arun(property_id=request.property_id)
         return {"analysis": result}
     except Exception as e:
@@ -329,7 +385,7 @@ async def generate_value_proposition(request: ValuePropositionRequest) -> Dict[s
     Generate a value proposition for a property.
     """
     try:
-        tool = agent.tools[2]  # ValuePropositionTool
+        tool = agent.tools_by_name["value_proposition"]
         result = await tool._arun(
             property_type=request.property_details.get("type", ""),
             target_audience=request.target_audience or "investors",
@@ -341,25 +397,76 @@ async def generate_value_proposition(request: ValuePropositionRequest) -> Dict[s
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/tools/document-search")
-async def search_documents(request: DocumentSearchInput) -> Dict[str, Any]:
+async def search_documents(request: DocumentSearchInput) -> ORJSONResponse:
     """
     Search through internal documents and knowledge base.
     """
     try:
-        tool = agent.tools[3]  # DocumentSearchTool
+        tool = agent.tools_by_name["document_search"]
         result = await tool._arun(
             query=request.query,
             k=request.k,
             threshold=request.threshold,
             filter=request.filter
         )
-        return {"results": result}
+        return ORJSONResponse({"results": result})
     except Exception as e:
         logger.error(f"Error in document search: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/tools/batch")
+async def batch_tools(calls: List[ToolCall]):
+    """
+    Run several tool calls concurrently, streaming each result as an SSE event as soon as it is ready.
+
+    Tools are addressed by name or by the chat tool ids (search, market-analysis, ...).
+    Each event carries the call's index in the request so clients can match results.
+    """
+    tools = []
+    tool_args = []
+    for call in calls:
+        tool = agent.tools_by_name.get(CHAT_TOOL_NAMES.get(call.tool, call.tool))
+        if tool is None:
+            raise HTTPException(status_code=400, detail=f"Unknown tool: {call.tool}")
+        # Validate against the tool's schema, as BaseTool.invoke would, and pass on the
+        # validated values of the arguments the caller supplied
+        try:
+            validated = tool.args_schema.model_validate(call.args)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid arguments for {call.tool}: {e}")
+        tools.append(tool)
+        tool_args.append({key: getattr(validated, key) for key in call.args if key in type(validated).model_fields})
+
+    async def run(index: int, tool, call: ToolCall, args: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            # Live web and economic data is fetched fresh rather than replayed from the cache,
+            # and self-caching tools already reuse their own results
+            if tool.name in LIVE_DATA_TOOLS or tool.name in SELF_CACHING_TOOLS:
+                result = await tool._arun(**args)
+            else:
+                result = await _cached_tool_call(tool, call, **args)
+            return {"index": index, "tool": call.tool, "result": result}
+        except Exception as e:
+            logger.error(f"Error in batch tool call {call.tool}: {str(e)}")
+            return {"index": index, "tool": call.tool, "error": str(e)}
+
+    async def generate():
+        pending = [
+            run(index, tool, call, args)
+            for index, (tool, call, args) in enumerate(zip(tools, calls, tool_args))
+        ]
+        for finished in asyncio.as_completed(pending):
+            yield b"data: " + orjson.dumps(await finished, default=str) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
 @app.post("/tools/custom-web-search")
-async def custom_web_search(request: TavilySearchInput) -> Dict[str, Any]:
+async def custom_web_search(raw: Request) -> ORJSONResponse:
     """
     Advanced web search using Tavily's AI-powered search engine with all available features.
     
@@ -373,6 +480,7 @@ async def custom_web_search(request: TavilySearchInput) -> Dict[str, Any]:
     - include_domains: List of domains to include in search (optional)
     - exclude_domains: List of domains to exclude from search (optional)
     """
+    request: TavilySearchInput = await _parse_body(raw, _TAVILY_SEARCH_ADAPTER)
     try:
         # Process domain lists if provided as comma-separated strings
         if isinstance(request.include_domains, str):
@@ -386,7 +494,7 @@ async def custom_web_search(request: TavilySearchInput) -> Dict[str, Any]:
                 setattr(request, field, getattr(request, field).lower() == 'true')
 
         result = await tavily_search.search(request)
-        return result
+        return ORJSONResponse(result)
     except Exception as e:
         logger.error(f"Error in custom web search: {str(e)}")
         raise HTTPException(
@@ -395,20 +503,34 @@ async def custom_web_search(request: TavilySearchInput) -> Dict[str, Any]:
         )
 
 
+@app.get("/admin/cache/stats")
+async def get_cache_stats():
+    """Hit/miss statistics for the chat response, tool result and web search caches."""
+    return {
+        "chat": RealEstateAgent.response_cache.stats(),
+        "tools": tool_cache.stats(),
+        "search": search_cache.stats()
+    }
+
+# Bytes read from an upload per iteration while spooling it to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
 @app.post("/admin/documents/upload")
 async def upload_document(file: UploadFile = File(...)):
     """Upload and process a new document."""
     try:
-        # Save the uploaded file temporarily
+        # Stream the upload to a temporary file in 1MB chunks rather than reading it into memory
         suffix = Path(file.filename).suffix
+        size = 0
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                temp_file.write(chunk)
+                size += len(chunk)
             temp_path = temp_file.name
 
         try:
-            # Load and process the document using DocumentLoader
-            documents = DocumentLoader.load_file(temp_path)
+            # Load and process the document in a worker thread; parsing is CPU-bound
+            documents = await asyncio.to_thread(DocumentLoader.load_file, temp_path)
         
             if not documents:
                 raise ValueError("No content could be extracted from the file")
@@ -418,9 +540,9 @@ async def upload_document(file: UploadFile = File(...)):
                 "id": str(uuid.uuid4()),  # Generate a unique ID
                 "name": file.filename,
                 "type": file.content_type,
-                "size": len(content),
+                "size": size,
                 "source": file.filename,  # Use filename as source
-                "uploaded_at": datetime.now().isoformat()
+                "uploaded_at": _now_iso()
             }
             
             # Create document in vector store with processed documents
@@ -451,64 +573,61 @@ async def upload_document(file: UploadFile = File(...)):
             detail=str(e)
         )
 
+# Seconds the active system message is served from memory before Supabase is queried again
+SYSTEM_MESSAGE_CACHE_TTL = 60
+
+# Cached (timestamp, message) pair for the active system message
+_system_message_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+# Fixed id for the built-in default message, which is never stored
+DEFAULT_SYSTEM_MESSAGE_ID = "00000000-0000-0000-0000-000000000001"
+
+# Returned when no message is active; timestamps are filled in per call
+_DEFAULT_SYSTEM_MESSAGE_TEMPLATE = {
+    "id": DEFAULT_SYSTEM_MESSAGE_ID,
+    "message": DEFAULT_SYSTEM_MESSAGE,
+    "is_active": False
+}
+
+def _invalidate_system_message_cache() -> None:
+    """Drop cached system messages here and in the agent after a write."""
+    _system_message_cache.clear()
+    RealEstateAgent.invalidate_system_message()
+
 @app.get("/admin/system-message", response_model=SystemMessageResponse)
 async def get_system_message():
-    """Get the current active system message."""
+    """Get the current active system message, served from memory for SYSTEM_MESSAGE_CACHE_TTL seconds."""
+    cached = _system_message_cache.get("active")
+    if cached and time.monotonic() - cached[0] < SYSTEM_MESSAGE_CACHE_TTL:
+        return cached[1]
+
     try:
         # First try to get active message from the table directly
-        result = supabase_admin.table('system_messages').select('*').eq('is_active', True).limit(1).execute()
+        supabase_admin = await get_async_supabase(auth=False)
+        result = await supabase_admin.table('system_messages').select('*').eq('is_active', True).limit(1).execute()
         
         if result.data and len(result.data) > 0:
             message_data = result.data[0]
+            now = _now_iso()
             # Ensure all required fields are present
-            return {
+            active_message = {
                 "id": message_data.get("id", str(uuid.uuid4())),
                 "message": message_data.get("message", ""),
                 "is_active": message_data.get("is_active", True),
-                "created_at": message_data.get("created_at", datetime.now().isoformat()),
-                "updated_at": message_data.get("updated_at", datetime.now().isoformat())
+                "created_at": message_data.get("created_at", now),
+                "updated_at": message_data.get("updated_at", now)
             }
+            _system_message_cache["active"] = (time.monotonic(), active_message)
+            return active_message
             
         # If no active message found, return default message
+        now = _now_iso()
         default_message = {
-            "id": str(uuid.uuid4()),
-            "message": """You are an expert commercial real estate AI assistant. 
-            You help analyze properties, market conditions, and create compelling value propositions.
-            You have access to internal documents and can search through them for relevant information.
-            You can perform real-time web searches for current market trends and news.
-            You can access Federal Reserve economic data for deep market analysis.
-            
-            When analyzing comparable properties:
-            1. Focus on the most relevant adjustments and their impact on value
-            2. Explain market trends and their implications clearly
-            3. Present value ranges with context and confidence levels
-            4. Highlight key factors influencing the analysis
-            
-            You communicate professionally and focus on providing actionable insights backed by data.
-            
-            You have access to powerful calculation tools for:
-            
-            Financial Metrics (use financial_calculator):
-            - ROI (Return on Investment)
-            - Cap Rate (Capitalization Rate)
-            - NOI (Net Operating Income)
-            
-            Market Metrics (use market_metrics_calculator):
-            - Vacancy Rate
-            - Absorption Rate
-            - Rent Growth Rate
-            
-            Property Metrics (use property_metrics_calculator):
-            - Price per Square Foot
-            - Operating Expense Ratio
-            - DSCR (Debt Service Coverage Ratio)
-            
-            Make sure to use the correct calculator for each metric.
-            Always show your calculations and explain the results in a clear, professional manner.""",
-            "is_active": False,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            **_DEFAULT_SYSTEM_MESSAGE_TEMPLATE,
+            "created_at": now,
+            "updated_at": now
         }
+        _system_message_cache["active"] = (time.monotonic(), default_message)
         return default_message
     except Exception as e:
         logger.error(f"Error getting system message: {str(e)}")
@@ -518,24 +637,18 @@ async def get_system_message():
 async def create_system_message(message: SystemMessageCreate):
     """Create a new system message and set it as active."""
     try:
-        # First, deactivate all existing messages with a proper WHERE clause
-        supabase_admin.table('system_messages').update(
-            {"is_active": False}
-        ).neq('id', '00000000-0000-0000-0000-000000000000').execute()  # This ensures we update all records
-        
-        # Then create the new active message
-        new_message = {
-            "message": message.message,
-            "is_active": True,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        }
-        
-        result = supabase_admin.table('system_messages').insert(new_message).execute()
+        supabase_admin = await get_async_supabase(auth=False)
+
+        # Deactivate the current message and insert the new one in a single transaction
+        result = await supabase_admin.rpc(
+            'set_active_system_message',
+            {"p_message": message.message}
+        ).execute()
         
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create system message")
             
+        _invalidate_system_message_cache()
         return result.data[0]
         
     except Exception as e:
@@ -546,12 +659,14 @@ async def create_system_message(message: SystemMessageCreate):
 async def update_system_message(message_id: str, message: SystemMessageCreate):
     """Update an existing system message."""
     try:
-        result = supabase_admin.table('system_messages').update({
+        supabase_admin = await get_async_supabase(auth=False)
+        result = await supabase_admin.table('system_messages').update({
             "message": message.message,
-            "updated_at": datetime.now().isoformat()
+            "updated_at": _now_iso()
         }).eq("id", message_id).execute()
         
         if result.data:
+            _invalidate_system_message_cache()
             return result.data[0]
         raise HTTPException(status_code=404, detail="System message not found")
     except Exception as e:
@@ -562,8 +677,10 @@ async def update_system_message(message_id: str, message: SystemMessageCreate):
 async def delete_system_message(message_id: str):
     """Delete a system message."""
     try:
-        result = supabase_admin.table('system_messages').delete().eq("id", message_id).execute()
+        supabase_admin = await get_async_supabase(auth=False)
+        result = await supabase_admin.table('system_messages').delete().eq("id", message_id).execute()
         if result.data:
+            _invalidate_system_message_cache()
             return {"status": "success", "message": "System message deleted"}
         raise HTTPException(status_code=404, detail="System message not found")
     except Exception as e:
@@ -571,4 +688,14 @@ async def delete_system_message(message_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",  # uvloop where it is installed (not on Windows)
+        http="httptools",
+        # Each worker keeps its own in-process caches, so more workers means lower hit rates
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        proxy_headers=True,
+        access_log=False
+    )
@@ -0,0 +1,14 @@
+-- Composite indexes for the dashboard queries, which filter by user_id and then
+-- order by created_at or filter by item_type. Run outside a transaction block,
+-- since CREATE INDEX CONCURRENTLY cannot run inside one.
+--
+-- The history page and popular properties queries are already served by
+-- idx_chat_history_user_created and idx_property_views_user_count in setup.sql.
+
+-- Notifications list: user_id = ? [AND read = false] ORDER BY created_at DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS notifications_user_created_idx
+ON notifications (user_id, created_at DESC);
+
+-- Saved items list: user_id = ? AND item_type = ?
+CREATE INDEX CONCURRENTLY IF NOT EXISTS saved_items_user_type_idx
+ON saved_items (user_id, item_type);
@@ -1,16 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from typing import Any, Dict, List, Tuple
+import time
 from pydantic import BaseModel
 from datetime import datetime
-from config.supabase import get_supabase
+from config.supabase import get_async_supabase
 from logger import setup_logger
 
 router = APIRouter()
 logger = setup_logger(__name__)
 
-# Initialize Supabase admin client
-supabase_admin = get_supabase(auth=False)
-
 class User(BaseModel):
     id: str
     email: str
@@ -23,33 +21,30 @@ class User(BaseModel):
 class UsersResponse(BaseModel):
     users: List[User]
 
+# Seconds a fetched user list is served from memory
+USERS_CACHE_TTL = 30
+
+# Cached (timestamp, response) pair for the user list
+_users_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
 @router.get("/users", response_model=UsersResponse)
 async def get_users():
     """Get all registered users."""
+    cached = _users_cache.get("users")
+    if cached and time.monotonic() - cached[0] < USERS_CACHE_TTL:
+        return cached[1]
+
     try:
-        # Fetch users from Supabase auth.users view
-        result = supabase_admin.rpc(
-            'get_users'
-        ).execute()
-        
-        if not result.data:
-            return {"users": []}
-
-        # Transform the data to match our User model
-        users = []
-        for user_data in result.data:
-            user = {
-                "id": user_data["id"],
-                "email": user_data["email"],
-                "role": user_data["role"],
-                "last_sign_in_at": user_data.get("last_sign_in_at"),
-                "created_at": user_data["created_at"],
-                "updated_at": user_data["updated_at"],
-                "status": "active" if user_data.get("confirmed_at") else "inactive"
-            }
-            users.append(user)
-
-        return {"users": users}
+        # Read the periodically refreshed admin_users_v snapshot of auth.users;
+        # its columns already match the User model
+        supabase_admin = await get_async_supabase(auth=False)
+        result = await supabase_admin.table('admin_users_v').select(
+            'id, email, role, last_sign_in_at, created_at, updated_at, status'
+        ).order('created_at', desc=True).execute()
+
+        response = {"users": result.data or []}
+        _users_cache["users"] = (time.monotonic(), response)
+        return response
     except Exception as e:
         logger.error(f"Error fetching users: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
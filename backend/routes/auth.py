@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional
 import os
+import hmac
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordBearer
@@ -12,10 +13,14 @@ router = APIRouter()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Encoded once so signing doesn't re-encode the key per token
+_SECRET_BYTES = SECRET_KEY.encode()
 
 # Admin credentials
 ADMIN_EMAIL = "admin@cre.com"
 ADMIN_PASSWORD = "Admin@123"
+_ADMIN_EMAIL_BYTES = ADMIN_EMAIL.encode()
+_ADMIN_PASSWORD_BYTES = ADMIN_PASSWORD.encode()
 
 class AdminLoginRequest(BaseModel):
     email: str
@@ -32,12 +37,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
 @router.post("/admin/login", response_model=TokenResponse)
 async def admin_login(request: AdminLoginRequest):
-    if request.email != ADMIN_EMAIL or request.password != ADMIN_PASSWORD:
+    # Compare in constant time; both checks always run so timing doesn't reveal which failed
+    email_ok = hmac.compare_digest(request.email.encode(), _ADMIN_EMAIL_BYTES)
+    password_ok = hmac.compare_digest(request.password.encode(), _ADMIN_PASSWORD_BYTES)
+    if not (email_ok and password_ok):
         raise HTTPException(
             status_code=401,
             detail="Invalid credentials",
@@ -1,21 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from pydantic import BaseModel
-import os
-import sys
-from pathlib import Path
+import asyncio
 from routes.user_auth import oauth2_scheme, get_current_user
-from config.supabase import get_supabase
-import logging
+from config.supabase import get_async_supabase
+from config.settings import settings
+from cache import cached, invalidate
+from logger import setup_logger
 
-# Add the backend directory to Python path
-backend_dir = Path(__file__).resolve().parent.parent
-if str(backend_dir) not in sys.path:
-    sys.path.append(str(backend_dir))
+router = APIRouter(default_response_class=ORJSONResponse)
+# Debug output is dropped before formatting unless LOG_LEVEL=DEBUG
+logger = setup_logger(__name__, settings.LOG_LEVEL)
 
-router = APIRouter()
-logger = logging.getLogger(__name__)
+# Columns returned by list endpoints; large JSON columns are opt-in via ?include=
+CHAT_HISTORY_LIST_COLUMNS = "id,message,response,tool_used,created_at"
+SAVED_ITEM_LIST_COLUMNS = "id,item_type,title,tags,created_at"
+
+# Seconds dashboard reads are served from the in-process cache; writes invalidate early
+DASHBOARD_CACHE_TTL = 60
+
+# Seconds a chat history total is reused across pages of the same filter
+HISTORY_COUNT_CACHE_TTL = 30
 
 # Request/Response Models
 class AnalyticsResponse(BaseModel):
@@ -30,6 +37,9 @@ class SavedItemCreate(BaseModel):
     content: Dict[str, Any]
     tags: List[str] = []
 
+class MarkNotificationsReadRequest(BaseModel):
+    ids: List[str]
+
 class NotificationResponse(BaseModel):
     id: str
     title: str
@@ -39,96 +49,87 @@ class NotificationResponse(BaseModel):
     created_at: datetime
 
 # Analytics Endpoints
+async def _fetch_tool_usage(supabase, user_id: str) -> Dict[str, int]:
+    """Tool usage counts for the user, via RPC with a direct-query fallback."""
+    try:
+        tool_usage_result = await supabase.rpc(
+            'get_tool_usage_stats',
+            {'user_id': user_id}
+        ).execute()
+        return tool_usage_result.data or {}
+    except Exception as e:
+        logger.warning(f"RPC failed, falling back to direct query: {str(e)}")
+
+    # Let PostgREST group and count, returning one row per tool
+    tool_usage_result = await supabase.table("chat_history") \
+        .select("tool_used, cnt:tool_used.count()") \
+        .eq("user_id", user_id) \
+        .not_.is_("tool_used", "null") \
+        .execute()
+    return {record["tool_used"]: record["cnt"] for record in tool_usage_result.data or []}
+
+async def _fetch_query_timeline(supabase, user_id: str) -> List[Dict[str, Any]]:
+    """The user's 100 most recent queries."""
+    query_timeline_result = await supabase.table("chat_history") \
+        .select("created_at, tool_used") \
+        .eq("user_id", user_id) \
+        .order("created_at", desc=True) \
+        .limit(100) \
+        .execute()
+    return query_timeline_result.data if query_timeline_result and hasattr(query_timeline_result, 'data') else []
+
+async def _fetch_popular_properties(supabase, user_id: str) -> List[Dict[str, Any]]:
+    """The user's five most viewed properties."""
+    popular_properties_result = await supabase.table("property_views") \
+        .select("property_id, views_count") \
+        .eq("user_id", user_id) \
+        .order("views_count", desc=True) \
+        .limit(5) \
+        .execute()
+    return popular_properties_result.data if popular_properties_result and hasattr(popular_properties_result, 'data') else []
+
+async def _fetch_economic_indicators(supabase) -> List[Dict[str, Any]]:
+    """A sample of economic indicators."""
+    economic_indicators_result = await supabase.table("economic_indicators") \
+        .select("*") \
+        .limit(5) \
+        .execute()
+    return economic_indicators_result.data if economic_indicators_result and hasattr(economic_indicators_result, 'data') else []
+
 @router.get("/analytics", response_model=AnalyticsResponse)
 async def get_analytics(current_user: Dict = Depends(get_current_user)):
     """Get analytics data for the dashboard."""
     try:
         logger.info(f"Fetching analytics for user {current_user['id']}")
-        supabase = get_supabase(auth=False)
+        supabase = await get_async_supabase(auth=False)
+        user_id = current_user["id"]
         
-        # Initialize default response
-        response = {
-            "tool_usage": {},
-            "query_timeline": [],
-            "popular_properties": [],
-            "economic_indicators": []
-        }
-        
-        try:
-            # Get tool usage statistics
-            tool_usage_result = await supabase.rpc(
-                'get_tool_usage_stats',
-                {'user_id': current_user["id"]}
-            ).execute()
+        async def load_analytics() -> Dict[str, Any]:
+            # The four reads are independent, so run them concurrently; a failed
+            # read is logged and its section left empty
+            sections = {
+                "tool_usage": ({}, "tool usage stats"),
+                "query_timeline": ([], "query timeline"),
+                "popular_properties": ([], "popular properties"),
+                "economic_indicators": ([], "economic indicators"),
+            }
+            results = await asyncio.gather(
+                _fetch_tool_usage(supabase, user_id),
+                _fetch_query_timeline(supabase, user_id),
+                _fetch_popular_properties(supabase, user_id),
+                _fetch_economic_indicators(supabase),
+                return_exceptions=True
+            )
             
-            if tool_usage_result and hasattr(tool_usage_result, 'data'):
-                response["tool_usage"] = tool_usage_result.data or {}
-            else:
-                # Fallback to direct query if RPC fails
-                logger.warning("RPC failed, falling back to direct query")
-                tool_usage_result = await supabase.table("chat_history") \
-                    .select("tool_used") \
-                    .eq("user_id", current_user["id"]) \
-                    .not_.is_("tool_used", "null") \
-                    .execute()
-                
-                tool_usage = {}
-                if tool_usage_result and hasattr(tool_usage_result, 'data'):
-                    for record in tool_usage_result.data:
-                        tool = record.get("tool_used")
-                        if tool:
-                            tool_usage[tool] = tool_usage.get(tool, 0) + 1
-                response["tool_usage"] = tool_usage
-                
-        except Exception as e:
-            logger.error(f"Error getting tool usage stats: {str(e)}")
-            # Continue with empty tool usage
-        
-        try:
-            # Get query timeline
-            query_timeline_result = await supabase.table("chat_history") \
-                .select("created_at, tool_used") \
-                .eq("user_id", current_user["id"]) \
-                .order("created_at", desc=True) \
-                .limit(100) \
-                .execute()
-                
-            if query_timeline_result and hasattr(query_timeline_result, 'data'):
-                response["query_timeline"] = query_timeline_result.data
-                
-        except Exception as e:
-            logger.error(f"Error getting query timeline: {str(e)}")
-            # Continue with empty query timeline
-        
-        try:
-            # Get popular properties
-            popular_properties_result = await supabase.table("property_views") \
-                .select("property_id, views_count") \
-                .eq("user_id", current_user["id"]) \
-                .order("views_count", desc=True) \
-                .limit(5) \
-                .execute()
-                
-            if popular_properties_result and hasattr(popular_properties_result, 'data'):
-                response["popular_properties"] = popular_properties_result.data
-                
-        except Exception as e:
-            logger.error(f"Error getting popular properties: {str(e)}")
-            # Continue with empty popular properties
+            response = {}
+            for (key, (default, label)), result in zip(sections.items(), results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error getting {label}: {str(result)}")
+                    result = default
+                response[key] = result
+            return response
         
-        try:
-            # Get economic indicators
-            economic_indicators_result = await supabase.table("economic_indicators") \
-                .select("*") \
-                .limit(5) \
-                .execute()
-                
-            if economic_indicators_result and hasattr(economic_indicators_result, 'data'):
-                response["economic_indicators"] = economic_indicators_result.data
-                
-        except Exception as e:
-            logger.error(f"Error getting economic indicators: {str(e)}")
-            # Continue with empty economic indicators
+        response = await cached(f"{user_id}:analytics", DASHBOARD_CACHE_TTL, load_analytics)
         
         logger.info(f"Successfully fetched analytics for user {current_user['id']}")
         return response
@@ -150,35 +151,48 @@ async def get_chat_history(
     page: int = 1,
     limit: int = 10,
     search: Optional[str] = None,
-    tool: Optional[str] = None
+    tool: Optional[str] = None,
+    include: Optional[str] = None
 ):
-    """Get user's chat history with pagination."""
+    """Get user's chat history with pagination. Pass include=metadata to also return each entry's metadata."""
     try:
-        print(f"Fetching chat history for user {current_user['id']}")  # Debug log
+        logger.debug("Fetching chat history for user %s", current_user['id'])
         offset = (page - 1) * limit
-        supabase = get_supabase(auth=False)  # Use admin client for data operations
-        
-        # Build the base query
-        query = supabase.table("chat_history") \
-            .select("*", count="exact") \
-            .eq("user_id", current_user["id"])
-            
-        # Add search filter if provided
-        if search:
-            query = query.or_(f"message.ilike.%{search}%,response.ilike.%{search}%")
-            
-        # Add tool filter if provided
-        if tool and tool != 'all':
-            query = query.eq("tool_used", tool)
-            
-        # Add pagination and ordering
-        result = await query \
-            .order("created_at", desc=True) \
-            .range(offset, offset + limit - 1) \
-            .execute()
-            
-        total = result.count if hasattr(result, 'count') else 0
+        supabase = await get_async_supabase(auth=False)  # Use admin client for data operations
         
+        user_id = current_user["id"]
+
+        def apply_filters(query):
+            # Add search filter if provided
+            if search:
+                query = query.or_(f"message.ilike.%{search}%,response.ilike.%{search}%")
+            # Add tool filter if provided
+            if tool and tool != 'all':
+                query = query.eq("tool_used", tool)
+            return query
+
+        async def load_total() -> int:
+            count_result = await apply_filters(
+                supabase.table("chat_history")
+                .select("id", count="exact", head=True)
+                .eq("user_id", user_id)
+            ).execute()
+            return count_result.count or 0
+
+        # The page and the total are separate queries run side by side; the total is
+        # cached per filter so paging through results only fetches rows
+        columns = CHAT_HISTORY_LIST_COLUMNS + (",metadata" if include == "metadata" else "")
+        data_query = apply_filters(
+            supabase.table("chat_history")
+            .select(columns)
+            .eq("user_id", user_id)
+        ).order("created_at", desc=True).range(offset, offset + limit - 1)
+
+        result, total = await asyncio.gather(
+            data_query.execute(),
+            cached(f"{user_id}:history-count:{tool or 'all'}:{search or ''}", HISTORY_COUNT_CACHE_TTL, load_total)
+        )
+
         return {
             "status": "success",
             "data": result.data if result and hasattr(result, 'data') else [],
@@ -187,7 +201,7 @@ async def get_chat_history(
             "total": total
         }
     except Exception as e:
-        print(f"Error in get_chat_history: {str(e)}")  # Debug log
+        logger.error(f"Error in get_chat_history: {str(e)}")
         return {
             "status": "success",
             "data": [],
@@ -197,6 +211,23 @@ async def get_chat_history(
         }
 
 # Saved Items Endpoints
+async def _insert_saved_items(items: List[SavedItemCreate], user_id: str) -> List[Dict[str, Any]]:
+    """Insert saved items for a user in a single request."""
+    supabase = await get_async_supabase(auth=False)
+    
+    result = await supabase.table("saved_items").insert([
+        {
+            "user_id": user_id,
+            "item_type": item.item_type,
+            "title": item.title,
+            "content": item.content,
+            "tags": item.tags or []
+        }
+        for item in items
+    ]).execute()
+    invalidate(f"{user_id}:saved-items:", f"{user_id}:stats")
+    return result.data or []
+
 @router.post("/save-item")
 async def save_item(
     item: SavedItemCreate,
@@ -204,56 +235,91 @@ async def save_item(
 ):
     """Save a new item to the user's saved items."""
     try:
-        supabase = get_supabase(auth=False)
-        
-        result = await supabase.table("saved_items").insert({
-            "user_id": current_user["id"],
-            "item_type": item.item_type,
-            "title": item.title,
-            "content": item.content,
-            "tags": item.tags or []
-        }).execute()
-        
-        return {"status": "success", "data": result.data[0] if result.data else None}
+        data = await _insert_saved_items([item], current_user["id"])
+        return {"status": "success", "data": data[0] if data else None}
     except Exception as e:
         logger.error(f"Error saving item: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/save-items")
+async def save_items(
+    items: List[SavedItemCreate],
+    current_user: Dict = Depends(get_current_user)
+):
+    """Save several items to the user's saved items in one round-trip."""
+    try:
+        if not items:
+            return {"status": "success", "data": []}
+        data = await _insert_saved_items(items, current_user["id"])
+        return {"status": "success", "data": data}
+    except Exception as e:
+        logger.error(f"Error saving items: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/saved-items")
 async def get_saved_items(
     current_user: Dict = Depends(get_current_user),
-    item_type: Optional[str] = None
+    item_type: Optional[str] = None,
+    include: Optional[str] = None
 ):
-    """Get user's saved items with optional type filter."""
+    """Get user's saved items with optional type filter. Pass include=content to also return item content."""
     try:
-        print(f"Fetching saved items for user {current_user['id']}")  # Debug log
-        supabase = get_supabase(auth=False)  # Use admin client for data operations
+        logger.debug("Fetching saved items for user %s", current_user['id'])
+        supabase = await get_async_supabase(auth=False)  # Use admin client for data operations
         
+        columns = SAVED_ITEM_LIST_COLUMNS + (",content" if include == "content" else "")
         query = supabase.table("saved_items") \
-            .select("*") \
+            .select(columns) \
             .eq("user_id", current_user["id"])
             
         if item_type and item_type != 'all':
             query = query.eq("item_type", item_type)
             
-        result = await query.execute()
+        result = await cached(
+            f"{current_user['id']}:saved-items:{item_type or 'all'}:{include == 'content'}",
+            DASHBOARD_CACHE_TTL,
+            query.execute
+        )
         
         # Handle empty results gracefully
         if not result or not hasattr(result, 'data'):
-            print("No result object returned from Supabase")  # Debug log
+            logger.debug("No result object returned from Supabase")
             return {"status": "success", "data": []}
             
         if not result.data:
-            print(f"No saved items found for user {current_user['id']}")  # Debug log
+            logger.debug("No saved items found for user %s", current_user['id'])
             return {"status": "success", "data": []}
             
-        print(f"Found {len(result.data)} saved items")  # Debug log
+        logger.debug("Found %d saved items", len(result.data))
         return {"status": "success", "data": result.data}
         
     except Exception as e:
-        print(f"Error in get_saved_items: {str(e)}")  # Debug log
+        logger.error(f"Error in get_saved_items: {str(e)}")
         return {"status": "success", "data": []}
 
+@router.get("/saved-items/{item_id}")
+async def get_saved_item(
+    item_id: str,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get a single saved item, including its content."""
+    try:
+        supabase = await get_async_supabase(auth=False)  # Use admin client for data operations
+        
+        result = await supabase.table("saved_items") \
+            .select(SAVED_ITEM_LIST_COLUMNS + ",content") \
+            .eq("id", item_id) \
+            .eq("user_id", current_user["id"]) \
+            .limit(1) \
+            .execute()
+    except Exception as e:
+        logger.error(f"Error getting saved item: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+        
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return {"status": "success", "data": result.data[0]}
+
 @router.delete("/saved-items/{item_id}")
 async def delete_saved_item(
     item_id: str,
@@ -261,13 +327,14 @@ async def delete_saved_item(
 ):
     """Delete a saved item."""
     try:
-        supabase = get_supabase(auth=False)  # Use admin client for data operations
+        supabase = await get_async_supabase(auth=False)  # Use admin client for data operations
         
         result = await supabase.table("saved_items") \
             .delete() \
             .eq("id", item_id) \
             .eq("user_id", current_user["id"]) \
             .execute()
+        invalidate(f"{current_user['id']}:saved-items:", f"{current_user['id']}:stats")
             
         if not result.data:
             raise HTTPException(
@@ -287,20 +354,36 @@ async def get_notifications(
 ):
     """Get user's notifications."""
     try:
-        supabase = get_supabase(auth=False)  # Use admin client for data operations
+        supabase = await get_async_supabase(auth=False)  # Use admin client for data operations
         
         query = supabase.table("notifications") \
-            .select("*") \
+            .select("id,title,message,type,read,created_at") \
             .eq("user_id", current_user["id"])
             
         if unread_only:
             query = query.eq("read", False)
             
-        result = await query.order("created_at", desc=True).execute()
+        result = await cached(
+            f"{current_user['id']}:notifications:{unread_only}",
+            DASHBOARD_CACHE_TTL,
+            query.order("created_at", desc=True).execute
+        )
         return result.data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _mark_notifications_read(notification_ids: List[str], user_id: str) -> List[Dict[str, Any]]:
+    """Mark the given notifications of a user as read in a single request."""
+    supabase = await get_async_supabase(auth=False)  # Use admin client for data operations
+    
+    result = await supabase.table("notifications") \
+        .update({"read": True}) \
+        .in_("id", notification_ids) \
+        .eq("user_id", user_id) \
+        .execute()
+    invalidate(f"{user_id}:notifications:")
+    return result.data
+
 @router.post("/notifications/{notification_id}/mark-read")
 async def mark_notification_read(
     notification_id: str,
@@ -308,15 +391,22 @@ async def mark_notification_read(
 ):
     """Mark a notification as read."""
     try:
-        supabase = get_supabase(auth=False)  # Use admin client for data operations
-        
-        result = await supabase.table("notifications") \
-            .update({"read": True}) \
-            .eq("id", notification_id) \
-            .eq("user_id", current_user["id"]) \
-            .execute()
-            
-        return {"status": "success", "data": result.data}
+        data = await _mark_notifications_read([notification_id], current_user["id"])
+        return {"status": "success", "data": data}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/notifications/mark-read")
+async def mark_notifications_read(
+    request: MarkNotificationsReadRequest,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Mark several notifications as read in one round-trip."""
+    try:
+        if not request.ids:
+            return {"status": "success", "data": []}
+        data = await _mark_notifications_read(request.ids, current_user["id"])
+        return {"status": "success", "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -327,7 +417,7 @@ async def track_chat(
 ):
     """Track a chat interaction in the history."""
     try:
-        supabase = get_supabase(auth=False)
+        supabase = await get_async_supabase(auth=False)
         
         result = await supabase.table("chat_history").insert({
             "user_id": current_user["id"],
@@ -336,6 +426,11 @@ async def track_chat(
             "tool_used": chat_data.get("tool_used"),
             "metadata": chat_data.get("metadata", {})
         }).execute()
+        invalidate(
+            f"{current_user['id']}:analytics",
+            f"{current_user['id']}:stats",
+            f"{current_user['id']}:history-count:"
+        )
         
         return {"status": "success", "data": result.data[0] if result.data else None}
     except Exception as e:
@@ -346,35 +441,24 @@ async def track_chat(
 async def get_stats(current_user: Dict = Depends(get_current_user)):
     """Get user's dashboard statistics."""
     try:
-        supabase = get_supabase(auth=False)
+        supabase = await get_async_supabase(auth=False)
         
-        # Get saved items count
-        saved_items_result = await supabase.table("saved_items") \
-            .select("id", count="exact") \
-            .eq("user_id", current_user["id"]) \
-            .execute()
-            
-        # Get active chats (chats from last 24 hours)
-        active_chats_result = await supabase.table("chat_history") \
-            .select("id", count="exact") \
-            .eq("user_id", current_user["id"]) \
-            .gte("created_at", (datetime.now() - timedelta(days=1)).isoformat()) \
-            .execute()
-            
-        # Get total queries
-        total_queries_result = await supabase.table("chat_history") \
-            .select("id", count="exact") \
-            .eq("user_id", current_user["id"]) \
-            .execute()
+        # Saved items, chats from the last 24 hours and total queries in one round-trip
+        result = await cached(
+            f"{current_user['id']}:stats",
+            DASHBOARD_CACHE_TTL,
+            supabase.rpc('get_dashboard_stats', {'uid': current_user["id"]}).execute
+        )
         
+        stats = result.data[0] if result and result.data else {}
         return {
             "status": "success",
             "data": {
-                "saved_items": saved_items_result.count if hasattr(saved_items_result, 'count') else 0,
-                "active_chats": active_chats_result.count if hasattr(active_chats_result, 'count') else 0,
-                "total_queries": total_queries_result.count if hasattr(total_queries_result, 'count') else 0
+                "saved_items": stats.get("saved_items", 0),
+                "active_chats": stats.get("active_chats", 0),
+                "total_queries": stats.get("total_queries", 0)
             }
         }
     except Exception as e:
         logger.error(f"Error getting stats: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
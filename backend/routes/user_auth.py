@@ -1,16 +1,26 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, EmailStr
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from config.settings import settings
 from config.supabase import get_supabase
 from postgrest.exceptions import APIError
 from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Seconds a verified token's user is reused before it is checked again
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_MAX_SIZE = 1024
+
+# token -> (monotonic expiry, user dict)
+_token_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
 class UserRegisterRequest(BaseModel):
     email: EmailStr
     password: str
@@ -154,8 +164,67 @@ async def login_user(request: UserLoginRequest):
             detail=f"An error occurred during login: {str(e)}"
         )
 
+def _user_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the serialize_user shape from Supabase access token claims."""
+    metadata = claims.get("user_metadata") or {}
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "full_name": metadata.get("full_name"),
+        "email_verified": metadata.get("email_verified", False),
+        "created_at": None,
+        "last_sign_in": None
+    }
+
+def _verify_token(token: str) -> Tuple[Dict[str, Any], float]:
+    """Return the token's user and how many seconds it stays valid.
+
+    Tokens are checked locally against SUPABASE_JWT_SECRET when it is set; otherwise,
+    or if local verification fails, Supabase Auth is asked.
+    """
+    if settings.SUPABASE_JWT_SECRET:
+        try:
+            claims = jwt.decode(
+                token,
+                settings.SUPABASE_JWT_SECRET,
+                algorithms=["HS256"],
+                audience="authenticated"
+            )
+            return _user_from_claims(claims), min(TOKEN_CACHE_TTL, claims["exp"] - time.time())
+        except (JWTError, KeyError) as e:
+            logger.debug("Local token verification failed, asking Supabase Auth: %s", e)
+
+    user = get_supabase(auth=True).auth.get_user(token)
+    if not user or not user.user:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid token"
+        )
+    return serialize_user(user.user), TOKEN_CACHE_TTL
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """Resolve the bearer token to the signed-in user's serialized record."""
+    entry = _token_cache.get(token)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    try:
+        user, ttl = _verify_token(token)
+    except Exception as e:
+        logger.error(f"Error getting current user: {str(e)}")
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid token"
+        )
+
+    _token_cache.pop(token, None)
+    _token_cache[token] = (time.monotonic() + ttl, user)
+    if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+        _token_cache.pop(next(iter(_token_cache)))
+    return user
+
 @router.get("/me")
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def read_current_user(token: str = Depends(oauth2_scheme)):
     supabase = get_supabase(auth=True)
     try:
         # Get current user
@@ -0,0 +1,35 @@
+"""
+Compiled kernel for the standard comparable-sale adjustments.
+
+The kernel releases the GIL, so analyses running in worker threads can fill
+their matrices in parallel. Numba is optional: when it isn't installed, fill_standard_adjustments is None
+and ComparableAnalysisTool computes the same columns with NumPy.
+"""
+import numpy as np
+
+try:
+    from numba import njit # type: ignore
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def fill_standard_adjustments(
+        building_size: np.ndarray,
+        months_diff: np.ndarray,
+        subject_size: float,
+        market_col: int,
+        location_col: int,
+        size_col: int,
+        market_rate: float,
+        location_factor: float,
+        size_factor: float,
+        pct: np.ndarray
+    ) -> None:
+        """Fill the market, location and size columns of pct in one pass over the comps"""
+        for i in range(building_size.shape[0]):
+            pct[i, market_col] = months_diff[i] * market_rate
+            pct[i, location_col] = location_factor
+            pct[i, size_col] = (subject_size - building_size[i]) / building_size[i] * size_factor
+else:
+    fill_standard_adjustments = None
@@ -0,0 +1,50 @@
+"""
+Input helpers for the metric calculators.
+
+Each calculation's inputs are a NamedTuple whose field defaults match the keys of the
+tool's values dict. A values dict holding lists (one entry per property) is a batch:
+every row is computed with a single NumPy expression, and a scalar call is the same
+computation over length-1 arrays.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+import numpy as np
+
+T = TypeVar("T")
+
+
+def row(input_type: Type[T], values: Dict[str, Any]) -> T:
+    """Build one calculation's inputs from a values dict, defaulting missing keys"""
+    return input_type(*[values.get(field, default) for field, default in input_type._field_defaults.items()])
+
+
+def is_batch(values: Dict[str, Any]) -> bool:
+    """True if any value is a list of per-property values"""
+    return any(isinstance(value, (list, tuple)) for value in values.values())
+
+
+def columns(values: Dict[str, Any], defaults: Dict[str, float]) -> List[np.ndarray]:
+    """
+    Return one float array per key in defaults, broadcast to a common length.
+
+    A missing key or a single number applies to every row, like the scalar calculators'
+    values.get(key, default). Lists of different lengths raise ValueError.
+    """
+    arrays = [np.asarray(values.get(key, default), dtype=float) for key, default in defaults.items()]
+    return [np.atleast_1d(array) for array in np.broadcast_arrays(*arrays)]
+
+
+def single(inputs: Tuple[float, ...]) -> List[np.ndarray]:
+    """One calculation's inputs as length-1 arrays, for the batched calculators"""
+    return [np.array([value], dtype=float) for value in inputs]
+
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Elementwise numerator / denominator, NaN where the denominator is zero"""
+    result = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def rounded(array: np.ndarray) -> List[Optional[float]]:
+    """Round to two decimals for output, with None in place of NaN"""
+    return [None if np.isnan(value) else value for value in np.round(array, 2).tolist()]
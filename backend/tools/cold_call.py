@@ -2,9 +2,15 @@ from typing import Dict, Any, Optional, ClassVar
 from langchain.tools import Tool
 from pydantic import BaseModel, Field
 from langchain.callbacks.manager import CallbackManagerForToolRun
-import json
+import asyncio
+import orjson
 from pathlib import Path
 
+class _KeepMissing(dict):
+    """format_map mapping that leaves unknown placeholders in place"""
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
 class ColdCallTemplate(BaseModel):
     """Template structure for cold call scripts"""
     name: str
@@ -58,6 +64,10 @@ class ColdCallScriptTool(Tool):
     templates_path: ClassVar[Path] = Path("data/templates/cold_call")
     templates: Dict[str, ColdCallTemplate] = {}
     
+    # Templates parsed from disk, shared by all instances until a template file changes
+    _templates_cache: ClassVar[Dict[str, ColdCallTemplate]] = {}
+    _templates_mtime: ClassVar[Optional[float]] = None
+    
     def __init__(self):
         """Initialize the tool and load templates"""
         super().__init__(
@@ -70,20 +80,34 @@ class ColdCallScriptTool(Tool):
         self.templates_path.mkdir(parents=True, exist_ok=True)
         self.templates = self._load_templates()
     
+    @classmethod
+    def _current_templates_mtime(cls) -> float:
+        """Latest modification time of the templates directory and its template files"""
+        return max(
+            [cls.templates_path.stat().st_mtime]
+            + [template_file.stat().st_mtime for template_file in cls.templates_path.glob("*.json")]
+        )
+    
     def _load_templates(self) -> Dict[str, ColdCallTemplate]:
-        """Load all available templates from the templates directory"""
+        """Load all available templates, re-reading the directory only when it has changed"""
         templates = {}
         if not self.templates_path.exists():
             return templates
+        
+        cls = type(self)
+        mtime = cls._current_templates_mtime()
+        if mtime == cls._templates_mtime:
+            return cls._templates_cache
             
         for template_file in self.templates_path.glob("*.json"):
             try:
-                with open(template_file, "r") as f:
-                    data = json.load(f)
-                    template = ColdCallTemplate(**data)
-                    templates[template.name] = template
+                data = orjson.loads(template_file.read_bytes())
+                template = ColdCallTemplate(**data)
+                templates[template.name] = template
             except Exception as e:
                 print(f"Error loading template {template_file}: {e}")
+        cls._templates_cache = templates
+        cls._templates_mtime = mtime
         return templates
     
     def _run(
@@ -145,14 +169,15 @@ class ColdCallScriptTool(Tool):
                 )
             )
         
-        # Replace variables in template
-        script = template.template
-        for key, value in prospect_info.items():
-            placeholder = "{" + key + "}"
-            if placeholder in script:
-                script = script.replace(placeholder, str(value))
-                
-        return script
+        # Fill all variables in one pass; unknown placeholders are kept as-is
+        try:
+            return template.template.format_map(_KeepMissing(prospect_info))
+        except (ValueError, IndexError, AttributeError):
+            # Template has braces that aren't simple placeholders; substitute them one by one
+            script = template.template
+            for key, value in prospect_info.items():
+                script = script.replace("{" + key + "}", str(value))
+            return script
     
     async def _arun(
         self,
@@ -166,8 +191,9 @@ class ColdCallScriptTool(Tool):
         optimize_strategy: Optional[str] = None,
         callback_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
-        """Async version of _run"""
-        return self._run(
+        """Async version of _run, run in a worker thread so template file reads don't block the event loop"""
+        return await asyncio.to_thread(
+            self._run,
             script_text=script_text,
             template_name=template_name,
             company_name=company_name,
@@ -182,6 +208,10 @@ class ColdCallScriptTool(Tool):
     def add_template(self, template: ColdCallTemplate) -> None:
         """Add a new template to the collection"""
         template_path = self.templates_path / f"{template.name}.json"
-        with open(template_path, "w") as f:
-            json.dump(template.dict(), f, indent=2)
-        self.templates[template.name] = template
\ No newline at end of file
+        template_path.write_text(template.model_dump_json(indent=2))
+        self.templates[template.name] = template
+        
+        # Keep the shared cache in step with the file just written
+        cls = type(self)
+        cls._templates_cache[template.name] = template
+        cls._templates_mtime = cls._current_templates_mtime()
\ No newline at end of file
@@ -1,9 +1,13 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, NamedTuple, Callable
 from datetime import datetime, timedelta
+from functools import lru_cache
+import numpy as np
+from tools._adjustments_numba import fill_standard_adjustments
 from pydantic import BaseModel, Field
 from langchain.tools import BaseTool
 from langchain.callbacks.manager import CallbackManagerForToolRun
 from enum import Enum
+import asyncio
 
 class AdjustmentType(str, Enum):
     """Types of adjustments that can be made to comparable properties"""
@@ -34,6 +38,46 @@ class ComparableProperty(BaseModel):
     cap_rate: Optional[float] = None
     noi: Optional[float] = None
 
+# ComparableProperty and MarketAdjustment values built in this module come from the
+# data source or from internal float math, so they are created with model_construct
+# and skip validation
+
+# Column order of the adjustment matrices built in _apply_adjustments
+# as (type, value) pairs so loops don't look up .value on every pass
+ADJUSTMENT_TYPES: tuple[tuple[AdjustmentType, str], ...] = tuple((t, t.value) for t in AdjustmentType)
+ADJUSTMENT_COLUMNS = {adj_type: i for i, (adj_type, _) in enumerate(ADJUSTMENT_TYPES)}
+
+# Standard adjustment rates
+MARKET_APPRECIATION_PER_MONTH = 0.0025  # 3% annual appreciation
+LOCATION_FACTOR = 0.05
+SIZE_FACTOR = -0.1  # -10% per 100% size difference
+
+# Number of non-zero adjustments reported per returned comp
+MAX_REPORTED_ADJUSTMENTS = 3
+
+class ComparableArrays(NamedTuple):
+    """Per-field arrays for a list of comps, aligned by index"""
+    sale_price: np.ndarray
+    building_size: np.ndarray
+    sale_date: np.ndarray  # datetime64[D]
+    price_per_sf: np.ndarray
+    cap_rate: np.ndarray  # NaN where unknown
+
+    @classmethod
+    def from_comps(cls, comps: List["ComparableProperty"]) -> "ComparableArrays":
+        n = len(comps)
+        return cls(
+            sale_price=np.fromiter((c.sale_price for c in comps), dtype=np.float64, count=n),
+            building_size=np.fromiter((c.building_size for c in comps), dtype=np.float64, count=n),
+            sale_date=np.array([c.sale_date.date() for c in comps], dtype="datetime64[D]"),
+            price_per_sf=np.fromiter((c.price_per_sf for c in comps), dtype=np.float64, count=n),
+            cap_rate=np.fromiter(
+                (np.nan if c.cap_rate is None else c.cap_rate for c in comps),
+                dtype=np.float64,
+                count=n
+            )
+        )
+
 class MarketAdjustment(BaseModel):
     """Structure for market adjustment calculations"""
     adjustment_type: AdjustmentType
@@ -67,6 +111,88 @@ class ComparableAnalysisOutput(BaseModel):
     confidence_score: float
     supporting_data: Dict[str, Any]
 
+# Rationale text for each standard adjustment, given (comp, subject, percentage)
+def _market_rationale(comp: ComparableProperty, subject: Dict[str, Any], percentage: float) -> str:
+    # The percentage is months * rate, so the month count needs no second clock read
+    return f"Market appreciation over {percentage / MARKET_APPRECIATION_PER_MONTH:.1f} months"
+
+def _location_rationale(comp: ComparableProperty, subject: Dict[str, Any], percentage: float) -> str:
+    return "Location quality adjustment"
+
+def _size_rationale(comp: ComparableProperty, subject: Dict[str, Any], percentage: float) -> str:
+    size_diff_pct = (subject["building_size"] - comp.building_size) / comp.building_size
+    return f"Size difference adjustment: {size_diff_pct:.1%}"
+
+def _default_rationale(comp: ComparableProperty, subject: Dict[str, Any], percentage: float) -> str:
+    return "No adjustment needed"
+
+_RATIONALES: Dict[AdjustmentType, Callable[[ComparableProperty, Dict[str, Any], float], str]] = {
+    AdjustmentType.MARKET_CONDITIONS: _market_rationale,
+    AdjustmentType.LOCATION: _location_rationale,
+    AdjustmentType.SIZE: _size_rationale,
+}
+
+@lru_cache(maxsize=128)
+def _mock_comps(
+    property_type: str,
+    location: str,
+    max_comps: int
+) -> tuple[tuple[ComparableProperty, ...], ComparableArrays]:
+    """
+    Deterministic mock comps, built once per input combination and shared read-only.
+
+    Sale dates depend on the current day, so they are left unset here and filled in
+    per call by _dated_mock_comps.
+    """
+    mock_comps = tuple(
+        ComparableProperty.model_construct(
+            property_id=f"PROP{i}",
+            address=f"{i*100} Main St, {location}",
+            sale_price=10000000.0 + (i * 500000),
+            price_per_sf=350.0 + (i * 10),
+            property_type=property_type,
+            building_size=25000.0 + (i * 1000),
+            year_built=2010 - i,
+            occupancy_rate=0.95 - (i * 0.02),
+            quality_rating=4,
+            amenities=["Lobby", "Parking", "Security"],
+            parking_ratio=3.0,
+            lease_type="NNN",
+            cap_rate=0.065 + (i * 0.002),
+            noi=650000.0 + (i * 25000)
+        )
+        for i in range(max_comps)
+    )
+    n = len(mock_comps)
+    arrays = ComparableArrays(
+        sale_price=np.fromiter((c.sale_price for c in mock_comps), dtype=np.float64, count=n),
+        building_size=np.fromiter((c.building_size for c in mock_comps), dtype=np.float64, count=n),
+        sale_date=np.empty(0, dtype="datetime64[D]"),
+        price_per_sf=np.fromiter((c.price_per_sf for c in mock_comps), dtype=np.float64, count=n),
+        cap_rate=np.fromiter((c.cap_rate for c in mock_comps), dtype=np.float64, count=n)
+    )
+    for array in arrays:
+        array.flags.writeable = False
+    return mock_comps, arrays
+
+def _dated_mock_comps(
+    property_type: str,
+    location: str,
+    max_comps: int
+) -> tuple[List[ComparableProperty], ComparableArrays]:
+    """Copies of the cached mock comps with sale dates counted back from now"""
+    base_comps, base_arrays = _mock_comps(property_type, location, max_comps)
+    current_date = datetime.now()
+    comps = [
+        comp.model_copy(update={
+            "sale_date": current_date - timedelta(days=i*90),
+            "amenities": list(comp.amenities)
+        })
+        for i, comp in enumerate(base_comps)
+    ]
+    sale_date = np.array([c.sale_date.date() for c in comps], dtype="datetime64[D]")
+    return comps, base_arrays._replace(sale_date=sale_date)
+
 class ComparableAnalysisTool(BaseTool):
     """Tool for generating and analyzing comparable properties"""
     
@@ -84,145 +210,112 @@ class ComparableAnalysisTool(BaseTool):
         max_comps: int,
         max_age_years: int,
         radius_miles: float
-    ) -> List[ComparableProperty]:
-        """Fetch recent comparable sales from the database"""
+    ) -> tuple[List[ComparableProperty], ComparableArrays]:
+        """Fetch recent comparable sales from the database, along with their numeric fields as arrays"""
         # This would typically integrate with a real estate database
-        # For demonstration, returning mock data
-        current_date = datetime.now()
-        mock_comps = [
-            ComparableProperty(
-                property_id=f"PROP{i}",
-                address=f"{i*100} Main St, {location}",
-                sale_date=current_date - timedelta(days=i*90),
-                sale_price=10000000 + (i * 500000),
-                price_per_sf=350 + (i * 10),
-                property_type=property_type,
-                building_size=25000 + (i * 1000),
-                year_built=2010 - i,
-                occupancy_rate=0.95 - (i * 0.02),
-                quality_rating=4,
-                amenities=["Lobby", "Parking", "Security"],
-                parking_ratio=3.0,
-                lease_type="NNN",
-                cap_rate=0.065 + (i * 0.002),
-                noi=650000 + (i * 25000)
-            )
-            for i in range(max_comps)
-        ]
-        return mock_comps
+        # For demonstration, returning mock data; only these inputs affect it
+        return _dated_mock_comps(property_type, location, max_comps)
 
-    def _calculate_market_adjustment(
+    def _apply_adjustments(
         self,
-        comp: ComparableProperty,
+        arrays: ComparableArrays,
         subject: Dict[str, Any],
-        adjustment_type: AdjustmentType,
-        market_conditions: Optional[Dict[str, Any]] = None
-    ) -> MarketAdjustment:
-        """Calculate specific market adjustments"""
+        specific_adjustments: Optional[Dict[str, float]] = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute every adjustment for every comp at once.
+
+        Returns (n_comps, n_adjustment_types) matrices of adjustment percentages and their
+        dollar impact, with columns in ADJUSTMENT_TYPES order, and the adjusted value of each comp.
+        """
+        n = len(arrays.sale_price)
+        pct = np.zeros((n, len(ADJUSTMENT_TYPES)))
         
-        if adjustment_type == AdjustmentType.MARKET_CONDITIONS:
-            # Time-based market adjustment (e.g., 3% per year appreciation)
-            months_diff = (datetime.now() - comp.sale_date).days / 30.44
-            adjustment_pct = (months_diff * 0.0025)  # 3% annual appreciation
-            
-            return MarketAdjustment(
-                adjustment_type=adjustment_type,
-                percentage=adjustment_pct,
-                rationale=f"Market appreciation over {months_diff:.1f} months",
-                impact_value=comp.sale_price * adjustment_pct
+        months_diff = (np.datetime64("today", "D") - arrays.sale_date).astype(np.float64) / 30.44
+        if fill_standard_adjustments is not None:
+            fill_standard_adjustments(
+                arrays.building_size,
+                months_diff,
+                float(subject["building_size"]),
+                ADJUSTMENT_COLUMNS[AdjustmentType.MARKET_CONDITIONS],
+                ADJUSTMENT_COLUMNS[AdjustmentType.LOCATION],
+                ADJUSTMENT_COLUMNS[AdjustmentType.SIZE],
+                MARKET_APPRECIATION_PER_MONTH,
+                LOCATION_FACTOR,
+                SIZE_FACTOR,
+                pct
             )
+        else:
+            # Time-based market adjustment
+            pct[:, ADJUSTMENT_COLUMNS[AdjustmentType.MARKET_CONDITIONS]] = months_diff * MARKET_APPRECIATION_PER_MONTH
             
-        elif adjustment_type == AdjustmentType.LOCATION:
             # Location quality adjustment
-            location_factor = 0.05  # 5% per quality point difference
-            return MarketAdjustment(
-                adjustment_type=adjustment_type,
-                percentage=location_factor,
-                rationale="Location quality adjustment",
-                impact_value=comp.sale_price * location_factor
-            )
+            pct[:, ADJUSTMENT_COLUMNS[AdjustmentType.LOCATION]] = LOCATION_FACTOR
             
-        elif adjustment_type == AdjustmentType.SIZE:
             # Size adjustment (economies of scale)
-            size_diff_pct = (subject["building_size"] - comp.building_size) / comp.building_size
-            size_factor = size_diff_pct * -0.1  # -10% adjustment per 100% size difference
-            
-            return MarketAdjustment(
-                adjustment_type=adjustment_type,
-                percentage=size_factor,
-                rationale=f"Size difference adjustment: {size_diff_pct:.1%}",
-                impact_value=comp.sale_price * size_factor
-            )
-            
-        else:
-            # Default minimal adjustment
-            return MarketAdjustment(
-                adjustment_type=adjustment_type,
-                percentage=0.0,
-                rationale="No adjustment needed",
-                impact_value=0.0
-            )
+            size_diff_pct = (subject["building_size"] - arrays.building_size) / arrays.building_size
+            pct[:, ADJUSTMENT_COLUMNS[AdjustmentType.SIZE]] = size_diff_pct * SIZE_FACTOR
+        
+        # User-specified overrides replace the standard adjustment for every comp
+        if specific_adjustments:
+            for col, (_, adj_key) in enumerate(ADJUSTMENT_TYPES):
+                if adj_key in specific_adjustments:
+                    pct[:, col] = specific_adjustments[adj_key]
+        
+        impact = arrays.sale_price[:, None] * pct
+        adjusted = arrays.sale_price + impact.sum(axis=1)
+        return pct, impact, adjusted
 
-    def _apply_adjustments(
+    def _describe_adjustments(
         self,
-        comps: List[ComparableProperty],
+        comp: ComparableProperty,
+        columns: np.ndarray,
+        pct_row: np.ndarray,
+        impact_row: np.ndarray,
         subject: Dict[str, Any],
         specific_adjustments: Optional[Dict[str, float]] = None
-    ) -> tuple[List[MarketAdjustment], Dict[str, float]]:
-        """Apply all relevant adjustments to comparable properties"""
-        all_adjustments = []
-        adjusted_values = {}
-        
-        for comp in comps:
-            comp_adjustments = []
-            
-            # Calculate standard adjustments
-            for adj_type in AdjustmentType:
-                if specific_adjustments and adj_type.value in specific_adjustments:
-                    # Use provided specific adjustment
-                    adjustment = MarketAdjustment(
-                        adjustment_type=adj_type,
-                        percentage=specific_adjustments[adj_type.value],
-                        rationale=f"User-specified {adj_type.value} adjustment",
-                        impact_value=comp.sale_price * specific_adjustments[adj_type.value]
-                    )
-                else:
-                    # Calculate standard adjustment
-                    adjustment = self._calculate_market_adjustment(
-                        comp,
-                        subject,
-                        adj_type
-                    )
-                
-                comp_adjustments.append(adjustment)
+    ) -> List[MarketAdjustment]:
+        """Build MarketAdjustment entries for the given adjustment columns of one comp"""
+        adjustments = []
+        for col in columns:
+            adj_type, adj_key = ADJUSTMENT_TYPES[col]
+            if specific_adjustments and adj_key in specific_adjustments:
+                rationale = f"User-specified {adj_key} adjustment"
+            else:
+                rationale = _RATIONALES.get(adj_type, _default_rationale)(comp, subject, pct_row[col])
             
-            # Calculate total adjustment for this comp
-            total_adjustment = sum(adj.impact_value for adj in comp_adjustments)
-            adjusted_value = comp.sale_price + total_adjustment
-            
-            adjusted_values[comp.property_id] = adjusted_value
-            all_adjustments.extend(comp_adjustments)
-        
-        return all_adjustments, adjusted_values
+            adjustments.append(MarketAdjustment.model_construct(
+                adjustment_type=adj_type,
+                percentage=float(pct_row[col]),
+                rationale=rationale,
+                impact_value=float(impact_row[col])
+            ))
+        return adjustments
 
     def _analyze_market_trends(
         self,
-        comps: List[ComparableProperty]
+        arrays: ComparableArrays
     ) -> Dict[str, Any]:
         """Analyze market trends from comparable data"""
         # Calculate various market metrics
-        avg_price_per_sf = sum(c.price_per_sf for c in comps) / len(comps)
-        avg_cap_rate = sum(c.cap_rate for c in comps if c.cap_rate) / len([c for c in comps if c.cap_rate])
+        avg_price_per_sf = float(arrays.price_per_sf.mean())
+        has_cap_rate = ~np.isnan(arrays.cap_rate)
+        avg_cap_rate = float(arrays.cap_rate[has_cap_rate].mean()) if has_cap_rate.any() else None
         
-        # Sort by date to analyze trends
-        sorted_comps = sorted(comps, key=lambda x: x.sale_date)
+        # Order by date to analyze trends
+        order = np.argsort(arrays.sale_date, kind="stable")
         price_trend = [
             {
-                "date": c.sale_date.strftime("%Y-%m-%d"),
-                "price_per_sf": c.price_per_sf,
-                "cap_rate": c.cap_rate
+                "date": date,
+                "price_per_sf": price_per_sf,
+                "cap_rate": cap_rate if known else None
             }
-            for c in sorted_comps
+            for date, price_per_sf, cap_rate, known in zip(
+                np.datetime_as_string(arrays.sale_date[order], unit="D").tolist(),
+                arrays.price_per_sf[order].tolist(),
+                arrays.cap_rate[order].tolist(),
+                has_cap_rate[order].tolist()
+            )
         ]
         
         return {
@@ -262,7 +355,7 @@ class ComparableAnalysisTool(BaseTool):
         }
         
         # Fetch comparable sales
-        comps = self._fetch_recent_sales(
+        comps, comp_arrays = self._fetch_recent_sales(
             property_type,
             location,
             max_comps,
@@ -271,30 +364,41 @@ class ComparableAnalysisTool(BaseTool):
         )
         
         # Calculate adjustments
-        adjustments, adjusted_values = self._apply_adjustments(
-            comps,
+        adjustment_pct, adjustment_impact, adjusted = self._apply_adjustments(
+            comp_arrays,
             subject_property,
             specific_adjustments
         )
+        adjusted_values = dict(zip((c.property_id for c in comps), adjusted.tolist()))
         
         # Analyze market trends
-        market_trends = self._analyze_market_trends(comps)
+        market_trends = self._analyze_market_trends(comp_arrays)
         
-        # Calculate final value range
-        adjusted_values_list = list(adjusted_values.values())
+        # Calculate final value range; the median is the upper middle value, found without a full sort
+        mid = len(adjusted) // 2
         final_value_range = {
-            "min": min(adjusted_values_list),
-            "max": max(adjusted_values_list),
-            "mean": sum(adjusted_values_list) / len(adjusted_values_list),
-            "median": sorted(adjusted_values_list)[len(adjusted_values_list)//2]
+            "min": float(adjusted.min()),
+            "max": float(adjusted.max()),
+            "mean": float(adjusted.mean()),
+            "median": float(np.partition(adjusted, mid)[mid])
         }
         
-        # Summarize key adjustments for better readability
-        summarized_adjustments = []
-        for comp in comps:
-            comp_adjustments = [adj for adj in adjustments if abs(adj.impact_value) > 0]
-            if comp_adjustments:
-                summarized_adjustments.extend(comp_adjustments[:3])  # Keep only significant adjustments
+        # Summarize each returned comp's largest adjustments, skipping those with no impact
+        top_comps = comps[:3]  # Limit to top 3 comps for conciseness
+        magnitude = np.abs(adjustment_impact[:len(top_comps)])
+        largest = np.argsort(-magnitude, axis=1, kind="stable")[:, :MAX_REPORTED_ADJUSTMENTS]
+        summarized_adjustments = [
+            adjustment
+            for i, comp in enumerate(top_comps)
+            for adjustment in self._describe_adjustments(
+                comp,
+                largest[i][magnitude[i, largest[i]] > 0],
+                adjustment_pct[i],
+                adjustment_impact[i],
+                subject_property,
+                specific_adjustments
+            )
+        ]
         
         # Format market trends more concisely
         concise_market_trends = {
@@ -306,7 +410,7 @@ class ComparableAnalysisTool(BaseTool):
         
         return ComparableAnalysisOutput(
             subject_property=subject_property,
-            comparable_properties=comps[:3],  # Limit to top 3 comps for conciseness
+            comparable_properties=top_comps,
             adjustments=summarized_adjustments,
             adjusted_values=adjusted_values,
             final_value_range=final_value_range,
@@ -315,7 +419,7 @@ class ComparableAnalysisTool(BaseTool):
             supporting_data={
                 "comp_count": len(comps),
                 "data_quality": "high",
-                "primary_adjustments": list(set(adj.adjustment_type for adj in summarized_adjustments))
+                "primary_adjustments": list(dict.fromkeys(adj.adjustment_type for adj in summarized_adjustments))
             }
         )
 
@@ -332,8 +436,9 @@ class ComparableAnalysisTool(BaseTool):
         specific_adjustments: Optional[Dict[str, float]] = None,
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> ComparableAnalysisOutput:
-        """Async version of _run"""
-        return self._run(
+        """Async version of _run; the analysis runs in a worker thread so it doesn't block the event loop"""
+        return await asyncio.to_thread(
+            self._run,
             property_type=property_type,
             location=location,
             building_size=building_size,
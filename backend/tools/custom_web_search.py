@@ -1,4 +1,5 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from functools import lru_cache
 from langchain_community.tools.tavily_search import TavilySearchResults
 from pydantic import BaseModel, Field
 import os
@@ -18,6 +19,14 @@ class TavilySearchInput(BaseModel):
     include_domains: Optional[List[str]] = Field(default=None, description="List of domains to include")
     exclude_domains: Optional[List[str]] = Field(default=None, description="List of domains to exclude")
 
+@lru_cache(maxsize=32)
+def _cached_search_tool(api_key: str, params: Tuple[Tuple[str, Any], ...]) -> TavilySearchResults:
+    """One reusable TavilySearchResults per distinct parameter set"""
+    return TavilySearchResults(
+        api_key=api_key,
+        **{key: list(value) if isinstance(value, tuple) else value for key, value in params}
+    )
+
 class TavilySearchWrapper:
     def __init__(self):
         self.api_key = os.getenv("TAVILY_API_KEY")
@@ -25,15 +34,17 @@ class TavilySearchWrapper:
             raise ValueError("TAVILY_API_KEY environment variable is not set")
 
     def create_search_tool(self, params: Dict[str, Any]) -> TavilySearchResults:
-        return TavilySearchResults(
-            api_key=self.api_key,
-            **params
-        )
+        # Lists (domain filters) become tuples so the parameters can be a cache key
+        frozen = tuple(sorted(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in params.items()
+        ))
+        return _cached_search_tool(self.api_key, frozen)
 
     async def search(self, params: TavilySearchInput) -> Dict[str, Any]:
         try:
             # Convert params to dict and filter out None values
-            search_params = params.dict(exclude_none=True)
+            search_params = params.model_dump(exclude_none=True)
             query = search_params.pop('query')  # Remove query from params as it's passed separately
 
             # Create search tool with remaining parameters
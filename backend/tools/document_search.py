@@ -1,8 +1,14 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+from collections import defaultdict
 from langchain.tools import BaseTool # type: ignore
-from pydantic import BaseModel, Field # type: ignore
+from langchain_core.documents import Document # type: ignore
+from pydantic import BaseModel, Field, PrivateAttr # type: ignore
 from vectorstore.supabase_store import VectorStoreManager # type: ignore
 import asyncio
+import orjson
+
+# Seconds concurrent searches wait so they can be sent to the vector store together
+BATCH_WINDOW = 0.01
 
 class DocumentSearchInput(BaseModel):
     """Input schema for document search."""
@@ -22,6 +28,49 @@ class DocumentSearchInput(BaseModel):
         }
     }
 
+class _QueryBatcher:
+    """
+    Coalesces searches that arrive within BATCH_WINDOW of each other into one
+    VectorStoreManager.batch_query call per (k, filter) group.
+    """
+    
+    def __init__(self, vector_store: VectorStoreManager):
+        self.vector_store = vector_store
+        self._pending: List[Tuple[str, int, Optional[Dict[str, Any]], asyncio.Future]] = []
+        self._flushes: set = set()
+    
+    async def query(self, query: str, k: int, filter: Optional[Dict[str, Any]]) -> List[Tuple[Document, float]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, k, filter, future))
+        if len(self._pending) == 1:
+            loop.call_later(BATCH_WINDOW, self._start_flush)
+        return await future
+    
+    def _start_flush(self) -> None:
+        pending, self._pending = self._pending, []
+        groups = defaultdict(list)
+        for item in pending:
+            groups[(item[1], orjson.dumps(item[2], option=orjson.OPT_SORT_KEYS))].append(item)
+        for items in groups.values():
+            # Keep a reference so the task isn't garbage collected mid-flight
+            task = asyncio.ensure_future(self._run_group(items))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+    
+    async def _run_group(self, items: List[Tuple[str, int, Optional[Dict[str, Any]], asyncio.Future]]) -> None:
+        _, k, filter, _ = items[0]
+        try:
+            results = await self.vector_store.batch_query([item[0] for item in items], k=k, filter=filter)
+        except Exception as e:
+            for item in items:
+                if not item[3].done():
+                    item[3].set_exception(e)
+            return
+        for item, result in zip(items, results):
+            if not item[3].done():
+                item[3].set_result(result)
+
 class DocumentSearchTool(BaseTool):
     name: str = "document_search"
     description: str = """Searches through internal documents and knowledge base for relevant information.
@@ -31,6 +80,7 @@ class DocumentSearchTool(BaseTool):
     
     args_schema: type[BaseModel] = DocumentSearchInput
     vector_store: VectorStoreManager = Field(default_factory=VectorStoreManager)
+    _batcher: Optional[_QueryBatcher] = PrivateAttr(default=None)
 
     def _run(
         self,
@@ -65,14 +115,11 @@ class DocumentSearchTool(BaseTool):
             Dict containing search results and metadata
         """
         try:
-            # Perform the search with scores
-            results = await self.vector_store.query(
-                query=query,
-                k=k,
-                threshold=threshold,
-                return_scores=True,
-                filter=filter
-            )
+            # Perform the search with scores, batched with any concurrent searches
+            if self._batcher is None:
+                self._batcher = _QueryBatcher(self.vector_store)
+            results = await self._batcher.query(query, k, filter)
+            results = [(doc, score) for doc, score in results if score >= threshold]
             
             # Format the results
             formatted_results = []
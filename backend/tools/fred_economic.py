@@ -7,10 +7,48 @@ from fredapi import Fred
 from logger import setup_logger
 import pandas as pd
 from datetime import datetime, timedelta
+from functools import cache, lru_cache
+import xml.etree.ElementTree as ET
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = setup_logger(__name__)
 load_dotenv()
 
+class _PooledFred(Fred):
+    """Fred client that fetches over a keep-alive requests.Session instead of a fresh urlopen per call"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+        )
+        self.session.mount("https://", adapter)
+        if self.proxies:
+            self.session.proxies.update(self.proxies)
+    
+    # fredapi routes every request through the name-mangled Fred.__fetch_data
+    def _Fred__fetch_data(self, url):
+        response = self.session.get(url + "&api_key=" + self.api_key, timeout=30)
+        root = ET.fromstring(response.content)
+        if response.status_code >= 400:
+            raise ValueError(root.get("message"))
+        return root
+
+@cache
+def _fred_client() -> Fred:
+    """One pooled FRED client per process, shared by every tool instance"""
+    return _PooledFred(api_key=os.getenv("FRED_API_KEY"))
+
+@lru_cache(maxsize=256)
+def _cached_series_info(fred: Fred, series_id: str) -> pd.Series:
+    """Series metadata (title, units, frequency) rarely changes, so it is fetched once per series"""
+    return fred.get_series_info(series_id)
+
 class FREDSearchInput(BaseModel):
     series_id: str = Field(..., description="FRED series ID to look up (e.g., 'GDP' for Gross Domestic Product)")
     observation_start: Optional[str] = Field(
@@ -34,7 +72,7 @@ class FREDEconomicTool(StructuredTool):
     
     def __init__(self, **data):
         super().__init__(**data)
-        self._fred = Fred(api_key=os.getenv("FRED_API_KEY"))
+        self._fred = _fred_client()
         
     def _process_dates(self, observation_start: Optional[str], observation_end: Optional[str]) -> tuple:
         if not observation_end:
@@ -94,15 +132,15 @@ class FREDEconomicTool(StructuredTool):
             
             # Convert data to a format that can be JSON serialized
             if isinstance(data, pd.Series):
-                data_dict = {
-                    str(date): float(value) if pd.notna(value) else None
-                    for date, value in data.items()
-                }
+                # Whole-series conversion; missing observations become None
+                dates = data.index.strftime("%Y-%m-%d").tolist()
+                values = data.astype(float).astype(object).where(data.notna(), None).tolist()
+                data_dict = dict(zip(dates, values))
             else:
                 data_dict = {}
             
             # Get series information
-            series_info = await asyncio.to_thread(self._fred.get_series_info, series_id)
+            series_info = await asyncio.to_thread(_cached_series_info, self._fred, series_id)
             
             return {
                 "series_id": series_id,
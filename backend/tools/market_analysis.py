@@ -1,15 +1,110 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, NamedTuple, Union
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
-import asyncio
+from cache import cached
+from tools._calculator_inputs import row, is_batch, columns, single, safe_divide, rounded
+import numpy as np
 import logging
 
+logger = logging.getLogger(__name__)
+
+# Seconds an analysis result is reused for identical arguments
+MARKET_ANALYSIS_CACHE_TTL = 1800
+
+# Placeholder section results. They don't depend on the arguments, so every call returns
+# the same shared dict; treat them as read-only.
+_MARKET_OVERVIEW = {
+    "market_size": "Large metropolitan area",
+    "market_phase": "Growth",
+    "market_stability": "High",
+    "key_drivers": [
+        "Strong job market",
+        "Population growth",
+        "Infrastructure development"
+    ]
+}
+
+_MARKET_METRICS = {
+    "vacancy_rate": "5.2%",
+    "absorption_rate": "Positive",
+    "average_lease_rate": "$25/sq ft/year",
+    "cap_rate": "6.5%",
+    "price_per_sqft": "$250",
+    "inventory_levels": "15M sq ft"
+}
+
+_MARKET_TRENDS = {
+    "price_trend": "Upward",
+    "vacancy_trend": "Decreasing",
+    "development_pipeline": "Moderate",
+    "demand_indicators": "Strong",
+    "rent_growth": "3.5% annually"
+}
+
+_COMPETITIVE_ANALYSIS = {
+    "competition_level": "Moderate",
+    "market_saturation": "65%",
+    "barriers_to_entry": "High",
+    "major_players": [
+        "Local REIT holdings",
+        "Institutional investors",
+        "Private equity firms"
+    ]
+}
+
+_OPPORTUNITIES_AND_RISKS = {
+    "opportunities": [
+        "Growing demand in tech sector",
+        "Redevelopment potential in submarkets",
+        "Strong rental growth prospects"
+    ],
+    "risks": [
+        "Potential interest rate increases",
+        "New supply in pipeline",
+        "Economic uncertainty"
+    ],
+    "recommendation": "Market conditions favorable for investment"
+}
+
+# Report section that answers each metric a caller can ask for in specific_metrics;
+# section names themselves are accepted too
+_SECTION_FOR_METRIC = {
+    "vacancy_rate": "market_metrics",
+    "absorption": "market_metrics",
+    "absorption_rate": "market_metrics",
+    "rental_rates": "market_metrics",
+    "lease_rates": "market_metrics",
+    "average_lease_rate": "market_metrics",
+    "cap_rate": "market_metrics",
+    "cap_rates": "market_metrics",
+    "price_per_sqft": "market_metrics",
+    "inventory_levels": "market_metrics",
+    "price_trend": "trends",
+    "vacancy_trend": "trends",
+    "rent_growth": "trends",
+    "development_pipeline": "trends",
+    "demand_indicators": "trends",
+    "competition": "competitive_analysis",
+    "market_saturation": "competitive_analysis",
+    "barriers_to_entry": "competitive_analysis",
+    "major_players": "competitive_analysis",
+    "opportunities": "opportunities_and_risks",
+    "risks": "opportunities_and_risks",
+    "recommendation": "opportunities_and_risks",
+    **{section: section for section in (
+        "market_overview", "market_metrics", "trends", "competitive_analysis", "opportunities_and_risks"
+    )}
+}
+
 class MarketAnalysisInput(BaseModel):
     """Input schema for market analysis."""
     market_area: str = Field(description="Geographic area for market analysis (city, region, etc.)")
     property_type: str = Field(description="Type of commercial property to analyze")
     timeframe: Optional[str] = Field(default="12 months", description="Timeframe for analysis (e.g., '6 months', '12 months')")
-    specific_metrics: Optional[List[str]] = Field(default=None, description="Specific metrics to analyze")
+    specific_metrics: Optional[List[str]] = Field(
+        default=None,
+        description="Specific metrics to analyze; only the report sections covering them are returned"
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -26,7 +121,9 @@ class MarketAnalysisTool(BaseTool):
     name: str = "market_analysis"
     description: str = """Analyzes commercial real estate market conditions for specific areas and property types.
     Provides insights on market trends, vacancy rates, rental rates, cap rates, and investment opportunities.
-    Use this when you need to understand market dynamics and trends for a specific area."""
+    Use this when you need to understand market dynamics and trends for a specific area.
+    Pass specific_metrics (e.g. vacancy_rate, rental_rates, cap_rate, rent_growth, competition, risks)
+    to get only the market overview plus the sections covering those metrics."""
     
     args_schema: type[BaseModel] = MarketAnalysisInput
 
@@ -55,35 +152,30 @@ class MarketAnalysisTool(BaseTool):
         Returns:
             Dict containing market analysis results
         """
+        sections = {
+            "market_overview": lambda: self._get_market_overview(market_area, property_type),
+            "market_metrics": lambda: self._get_market_metrics(market_area, property_type),
+            "trends": lambda: self._analyze_trends(market_area, property_type, timeframe),
+            "competitive_analysis": lambda: self._get_competitive_analysis(market_area, property_type),
+            "opportunities_and_risks": lambda: self._assess_opportunities_and_risks(market_area, property_type)
+        }
+        
+        # Only build the sections the requested metrics need; with no recognised
+        # metrics the full report is returned
+        needed = {_SECTION_FOR_METRIC[metric] for metric in specific_metrics or () if metric in _SECTION_FOR_METRIC}
+        if needed:
+            needed.add("market_overview")
+
+        async def build_analysis() -> Dict[str, Any]:
+            # The sections are cheap in-process lookups, so they are built directly
+            return {name: build() for name, build in sections.items() if not needed or name in needed}
+
         try:
-            # Get market overview concurrently
-            market_overview = self._get_market_overview(market_area, property_type)
-            market_metrics = self._get_market_metrics(market_area, property_type)
-            trends = self._analyze_trends(market_area, property_type, timeframe)
-            competitive = self._get_competitive_analysis(market_area, property_type)
-            opportunities = self._assess_opportunities_and_risks(market_area, property_type)
-            
-            # Use asyncio.gather to run all analyses concurrently
-            results = await asyncio.gather(
-                asyncio.to_thread(lambda: market_overview),
-                asyncio.to_thread(lambda: market_metrics),
-                asyncio.to_thread(lambda: trends),
-                asyncio.to_thread(lambda: competitive),
-                asyncio.to_thread(lambda: opportunities)
-            )
-            
-            analysis = {
-                "market_overview": results[0],
-                "market_metrics": results[1],
-                "trends": results[2],
-                "competitive_analysis": results[3],
-                "opportunities_and_risks": results[4]
-            }
-            
-            return analysis
+            # Agents often repeat a call with the same arguments; errors are not cached
+            key = f"market_analysis:{(market_area, property_type, timeframe, tuple(specific_metrics or ()))!r}"
+            return await cached(key, MARKET_ANALYSIS_CACHE_TTL, build_analysis)
             
         except Exception as e:
-            logger = logging.getLogger(__name__)
             logger.error(f"Error in market analysis: {str(e)}")
             return {
                 "error": str(e),
@@ -93,66 +185,39 @@ class MarketAnalysisTool(BaseTool):
 
     def _get_market_overview(self, market_area: str, property_type: str) -> Dict[str, Any]:
         """Get general market overview."""
-        return {
-            "market_size": "Large metropolitan area",
-            "market_phase": "Growth",
-            "market_stability": "High",
-            "key_drivers": [
-                "Strong job market",
-                "Population growth",
-                "Infrastructure development"
-            ]
-        }
+        return _MARKET_OVERVIEW
 
     def _get_market_metrics(self, market_area: str, property_type: str) -> Dict[str, Any]:
         """Calculate key market metrics."""
-        return {
-            "vacancy_rate": "5.2%",
-            "absorption_rate": "Positive",
-            "average_lease_rate": "$25/sq ft/year",
-            "cap_rate": "6.5%",
-            "price_per_sqft": "$250",
-            "inventory_levels": "15M sq ft"
-        }
+        return _MARKET_METRICS
 
     def _analyze_trends(self, market_area: str, property_type: str, timeframe: str) -> Dict[str, Any]:
         """Analyze market trends over specified timeframe."""
-        return {
-            "price_trend": "Upward",
-            "vacancy_trend": "Decreasing",
-            "development_pipeline": "Moderate",
-            "demand_indicators": "Strong",
-            "rent_growth": "3.5% annually"
-        }
+        return _MARKET_TRENDS
 
     def _get_competitive_analysis(self, market_area: str, property_type: str) -> Dict[str, Any]:
         """Analyze competitive landscape."""
-        return {
-            "competition_level": "Moderate",
-            "market_saturation": "65%",
-            "barriers_to_entry": "High",
-            "major_players": [
-                "Local REIT holdings",
-                "Institutional investors",
-                "Private equity firms"
-            ]
-        }
+        return _COMPETITIVE_ANALYSIS
 
     def _assess_opportunities_and_risks(self, market_area: str, property_type: str) -> Dict[str, Any]:
         """Assess market opportunities and risks."""
-        return {
-            "opportunities": [
-                "Growing demand in tech sector",
-                "Redevelopment potential in submarkets",
-                "Strong rental growth prospects"
-            ],
-            "risks": [
-                "Potential interest rate increases",
-                "New supply in pipeline",
-                "Economic uncertainty"
-            ],
-            "recommendation": "Market conditions favorable for investment"
-        }
+        return _OPPORTUNITIES_AND_RISKS
+
+class VacancyInputs(NamedTuple):
+    """Inputs for the vacancy rate calculation."""
+    vacant_space: float = 0
+    total_space: float = 0
+
+class AbsorptionInputs(NamedTuple):
+    """Inputs for the net absorption calculation."""
+    space_leased: float = 0
+    space_vacated: float = 0
+    time_period: float = 12
+
+class RentGrowthInputs(NamedTuple):
+    """Inputs for the rent growth calculation."""
+    initial_rent: float = 0
+    final_rent: float = 0
 
 class MarketMetricsCalculatorInput(BaseModel):
     """Input schema for market metrics calculations."""
@@ -160,11 +225,12 @@ class MarketMetricsCalculatorInput(BaseModel):
         description="Type of calculation to perform (vacancy_rate, absorption_rate, rent_growth)",
         enum=["vacancy_rate", "absorption_rate", "rent_growth"]
     )
-    values: Dict[str, float] = Field(
+    values: Dict[str, Union[float, List[float]]] = Field(
         description="""Dictionary of values needed for calculation.
         For Vacancy Rate: vacant_space, total_space
         For Absorption Rate: space_leased, space_vacated, time_period
-        For Rent Growth: initial_rent, final_rent"""
+        For Rent Growth: initial_rent, final_rent
+        To calculate many properties at once, give each value as a list with one entry per property."""
     )
 
 class MarketMetricsCalculator(BaseTool):
@@ -177,79 +243,98 @@ class MarketMetricsCalculator(BaseTool):
         - Vacancy Rate: {"operation": "vacancy_rate", "values": {"vacant_space": 5000, "total_space": 50000}}
         - Absorption Rate: {"operation": "absorption_rate", "values": {"space_leased": 10000, "space_vacated": 3000, "time_period": 12}}
         - Rent Growth: {"operation": "rent_growth", "values": {"initial_rent": 30, "final_rent": 35}}
+        - Several properties: {"operation": "vacancy_rate", "values": {"vacant_space": [5000, 2000], "total_space": [50000, 40000]}}
         """
     args_schema: type[BaseModel] = MarketMetricsCalculatorInput
 
-    def _run(self, operation: str, values: Dict[str, float]) -> Dict[str, Any]:
+    def _run(self, operation: str, values: Dict[str, Union[float, List[float]]]) -> Dict[str, Any]:
         """
         Perform market-specific calculations based on the operation type.
         
         Args:
             operation: Type of calculation (vacancy_rate, absorption_rate, rent_growth)
-            values: Dictionary containing required values for calculation
+            values: Dictionary containing required values for calculation, or lists of
+                them with one entry per property
             
         Returns:
-            Dictionary containing calculation results
+            Dictionary containing calculation results; for lists, one result list per
+            output, with None for rows that would divide by zero
         """
-        if operation == "vacancy_rate":
-            return self._calculate_vacancy_rate(values)
-        elif operation == "absorption_rate":
-            return self._calculate_absorption_rate(values)
-        elif operation == "rent_growth":
-            return self._calculate_rent_growth(values)
-        else:
-            raise ValueError(f"Unsupported operation: {operation}")
-
-    def _calculate_vacancy_rate(self, values: Dict[str, float]) -> Dict[str, Any]:
-        """Calculate market vacancy rate."""
         try:
-            vacant_space = values.get("vacant_space", 0)
-            total_space = values.get("total_space", 0)
+            batch = is_batch(values)
+            if operation == "vacancy_rate":
+                if batch:
+                    return self._calculate_vacancy_rate_batch(columns(values, VacancyInputs._field_defaults))
+                return self._calculate_vacancy_rate(row(VacancyInputs, values))
+            elif operation == "absorption_rate":
+                if batch:
+                    return self._calculate_absorption_rate_batch(columns(values, AbsorptionInputs._field_defaults))
+                return self._calculate_absorption_rate(row(AbsorptionInputs, values))
+            elif operation == "rent_growth":
+                if batch:
+                    return self._calculate_rent_growth_batch(columns(values, RentGrowthInputs._field_defaults))
+                return self._calculate_rent_growth(row(RentGrowthInputs, values))
+        except (TypeError, ValueError, ArithmeticError) as e:
+            return {"error": f"{operation} calculation failed: {str(e)}"}
+        raise ValueError(f"Unsupported operation: {operation}")
+
+    def _calculate_vacancy_rate_batch(self, inputs: List[np.ndarray]) -> Dict[str, Any]:
+        """Calculate market vacancy rates for aligned arrays of inputs."""
+        vacant_space, total_space = inputs
+        return {"vacancy_rate": rounded(safe_divide(vacant_space, total_space) * 100)}
+
+    def _calculate_absorption_rate_batch(self, inputs: List[np.ndarray]) -> Dict[str, Any]:
+        """Calculate net absorption rates for aligned arrays of inputs."""
+        space_leased, space_vacated, time_period = inputs
+        net_absorption = space_leased - space_vacated
+        return {
+            "net_absorption": rounded(net_absorption),
+            "monthly_absorption": rounded(safe_divide(net_absorption, time_period))
+        }
+
+    def _calculate_rent_growth_batch(self, inputs: List[np.ndarray]) -> Dict[str, Any]:
+        """Calculate rent growth rates for aligned arrays of inputs."""
+        initial_rent, final_rent = inputs
+        return {"rent_growth_rate": rounded(safe_divide(final_rent - initial_rent, initial_rent) * 100)}
+
+    def _calculate_vacancy_rate(self, inputs: VacancyInputs) -> Dict[str, Any]:
+        """Calculate market vacancy rate."""
+        vacant_space, total_space = inputs
+        
+        if total_space == 0:
+            return {"error": "Total space cannot be zero"}
             
-            if total_space == 0:
-                return {"error": "Total space cannot be zero"}
-                
-            vacancy_rate = (vacant_space / total_space) * 100
-            return {
-                "vacancy_rate": round(vacancy_rate, 2),
-                "vacant_space": vacant_space,
-                "total_space": total_space
-            }
-        except Exception as e:
-            return {"error": f"Vacancy rate calculation failed: {str(e)}"}
+        result = self._calculate_vacancy_rate_batch(single(inputs))
+        return {
+            "vacancy_rate": result["vacancy_rate"][0],
+            "vacant_space": vacant_space,
+            "total_space": total_space
+        }
 
-    def _calculate_absorption_rate(self, values: Dict[str, float]) -> Dict[str, Any]:
+    def _calculate_absorption_rate(self, inputs: AbsorptionInputs) -> Dict[str, Any]:
         """Calculate net absorption rate."""
-        try:
-            space_leased = values.get("space_leased", 0)
-            space_vacated = values.get("space_vacated", 0)
-            time_period = values.get("time_period", 12)  # months
-            
-            net_absorption = space_leased - space_vacated
-            monthly_absorption = net_absorption / time_period
-            
-            return {
-                "net_absorption": round(net_absorption, 2),
-                "monthly_absorption": round(monthly_absorption, 2),
-                "time_period": time_period
-            }
-        except Exception as e:
-            return {"error": f"Absorption rate calculation failed: {str(e)}"}
+        space_leased, space_vacated, time_period = inputs
+        
+        if time_period == 0:
+            return {"error": "Time period cannot be zero"}
+        
+        result = self._calculate_absorption_rate_batch(single(inputs))
+        return {
+            "net_absorption": result["net_absorption"][0],
+            "monthly_absorption": result["monthly_absorption"][0],
+            "time_period": time_period
+        }
 
-    def _calculate_rent_growth(self, values: Dict[str, float]) -> Dict[str, Any]:
+    def _calculate_rent_growth(self, inputs: RentGrowthInputs) -> Dict[str, Any]:
         """Calculate rent growth rate."""
-        try:
-            initial_rent = values.get("initial_rent", 0)
-            final_rent = values.get("final_rent", 0)
+        initial_rent, final_rent = inputs
+        
+        if initial_rent == 0:
+            return {"error": "Initial rent cannot be zero"}
             
-            if initial_rent == 0:
-                return {"error": "Initial rent cannot be zero"}
-                
-            growth_rate = ((final_rent - initial_rent) / initial_rent) * 100
-            return {
-                "rent_growth_rate": round(growth_rate, 2),
-                "initial_rent": initial_rent,
-                "final_rent": final_rent
-            }
-        except Exception as e:
-            return {"error": f"Rent growth calculation failed: {str(e)}"}
\ No newline at end of file
+        result = self._calculate_rent_growth_batch(single(inputs))
+        return {
+            "rent_growth_rate": result["rent_growth_rate"][0],
+            "initial_rent": initial_rent,
+            "final_rent": final_rent
+        }
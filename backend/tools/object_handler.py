@@ -1,10 +1,20 @@
-from typing import Dict, Any, Optional, ClassVar, List
+from typing import Dict, Any, Optional, ClassVar, List, Tuple
 from langchain.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from langchain.callbacks.manager import CallbackManagerForToolRun
-import json
+import orjson
+import os
+import re
 from pathlib import Path
 
+try:
+    import ahocorasick # type: ignore
+except ImportError:
+    ahocorasick = None
+
+# A {name} placeholder in a response template
+_PLACEHOLDER_RE = re.compile(r"\{([^{}]+)\}")
+
 class ObjectionPattern(BaseModel):
     """Structure for objection handling patterns"""
     name: str
@@ -41,11 +51,65 @@ class ObjectionHandlerTool(BaseTool):
     patterns_path: ClassVar[Path] = Path("data/patterns/objections")
     patterns: Dict[str, ObjectionPattern] = {}
     
+    # Parsed pattern files shared by all instances, keyed by (path, mtime) so an
+    # edited file is re-read on the next load
+    _PATTERN_CACHE: ClassVar[Dict[Tuple[str, float], ObjectionPattern]] = {}
+    
+    # Matching indexes rebuilt whenever patterns change: lowercased keywords per
+    # pattern name, and patterns grouped by category
+    _keywords_lower: Dict[str, tuple] = PrivateAttr(default_factory=dict)
+    _by_category: Dict[Optional[str], List[ObjectionPattern]] = PrivateAttr(default_factory=dict)
+    # Placeholder names used by each pattern's response template
+    _placeholders: Dict[str, frozenset] = PrivateAttr(default_factory=dict)
+    # Keyword automaton (keyword -> names of the patterns using it); None without pyahocorasick
+    _automaton: Any = PrivateAttr(default=None)
+    
     def __init__(self):
         """Initialize the tool and load objection patterns"""
         super().__init__()
         self.patterns_path.mkdir(parents=True, exist_ok=True)
         self.patterns = self._load_patterns()
+        self._index_patterns()
+    
+    def _index_patterns(self) -> None:
+        """Precompute lowercased keywords and category buckets for _find_matching_pattern"""
+        self._keywords_lower = {
+            name: tuple(keyword.lower() for keyword in pattern.keywords)
+            for name, pattern in self.patterns.items()
+        }
+        self._by_category = {}
+        for pattern in self.patterns.values():
+            self._by_category.setdefault(pattern.category, []).append(pattern)
+        self._placeholders = {
+            name: frozenset(_PLACEHOLDER_RE.findall(pattern.response_template))
+            for name, pattern in self.patterns.items()
+        }
+        
+        self._automaton = None
+        if ahocorasick is not None:
+            owners: Dict[str, List[str]] = {}
+            for name, keywords in self._keywords_lower.items():
+                for keyword in keywords:
+                    if keyword:
+                        owners.setdefault(keyword, []).append(name)
+            if owners:
+                automaton = ahocorasick.Automaton()
+                for keyword, names in owners.items():
+                    automaton.add_word(keyword, (keyword, names))
+                automaton.make_automaton()
+                self._automaton = automaton
+    
+    def _keyword_counts(self, objection_lower: str) -> Dict[str, int]:
+        """Number of distinct keywords of each pattern found in the text, in one automaton pass"""
+        counts: Dict[str, int] = {}
+        seen = set()
+        for _, (keyword, names) in self._automaton.iter(objection_lower):
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            for name in names:
+                counts[name] = counts.get(name, 0) + 1
+        return counts
     
     def _load_patterns(self) -> Dict[str, ObjectionPattern]:
         """Load all available objection patterns"""
@@ -53,16 +117,31 @@ class ObjectionHandlerTool(BaseTool):
         if not self.patterns_path.exists():
             return patterns
             
-        for pattern_file in self.patterns_path.glob("*.json"):
-            try:
-                with open(pattern_file, "r") as f:
-                    data = json.load(f)
-                    pattern = ObjectionPattern(**data)
+        # scandir hands back each entry's type with the listing, so only pattern files get stat'd
+        with os.scandir(self.patterns_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    key = (entry.path, entry.stat().st_mtime)
+                    pattern = self._PATTERN_CACHE.get(key)
+                    if pattern is None:
+                        with open(entry.path, "rb") as f:
+                            data = orjson.loads(f.read())
+                        pattern = ObjectionPattern(**data)
+                        self._evict_cached_pattern(entry.path)
+                        self._PATTERN_CACHE[key] = pattern
                     patterns[pattern.name] = pattern
-            except Exception as e:
-                print(f"Error loading pattern {pattern_file}: {e}")
+                except Exception as e:
+                    print(f"Error loading pattern {entry.path}: {e}")
         return patterns
     
+    @classmethod
+    def _evict_cached_pattern(cls, path: str) -> None:
+        """Drop cached entries for a pattern file, whatever mtime they were read at"""
+        for key in [key for key in cls._PATTERN_CACHE if key[0] == path]:
+            del cls._PATTERN_CACHE[key]
+    
     def _find_matching_pattern(self, objection_text: str, category: Optional[str] = None) -> Optional[ObjectionPattern]:
         """Find the best matching pattern for the given objection"""
         if not objection_text:
@@ -72,12 +151,14 @@ class ObjectionHandlerTool(BaseTool):
         best_match = None
         max_matches = 0
         
-        for pattern in self.patterns.values():
-            if category and pattern.category != category:
-                continue
-                
+        candidates = self._by_category.get(category, []) if category else self.patterns.values()
+        counts = self._keyword_counts(objection_lower) if self._automaton is not None else None
+        for pattern in candidates:
             # Check for keyword matches
-            matches = sum(1 for keyword in pattern.keywords if keyword.lower() in objection_lower)
+            if counts is not None:
+                matches = counts.get(pattern.name, 0)
+            else:
+                matches = sum(1 for keyword in self._keywords_lower[pattern.name] if keyword in objection_lower)
             
             # If this pattern has more matching keywords, it's a better match
             if matches > max_matches:
@@ -118,11 +199,12 @@ class ObjectionHandlerTool(BaseTool):
         
         # Replace variables in template
         response = pattern.response_template
-        if context:
-            for key, value in context.items():
-                placeholder = "{" + key + "}"
-                if placeholder in response:
-                    response = response.replace(placeholder, str(value))
+        placeholders = self._placeholders.get(pattern.name)
+        if context and placeholders:
+            subs = {key: str(value) for key, value in context.items() if key in placeholders}
+            if subs:
+                # Placeholders without a context value are left as written
+                response = _PLACEHOLDER_RE.sub(lambda match: subs.get(match.group(1), match.group(0)), response)
         
         # Add follow-up if available
         if pattern.follow_up:
@@ -150,6 +232,7 @@ class ObjectionHandlerTool(BaseTool):
     def add_pattern(self, pattern: ObjectionPattern) -> None:
         """Add a new objection pattern"""
         pattern_path = self.patterns_path / f"{pattern.name}.json"
-        with open(pattern_path, "w") as f:
-            json.dump(pattern.dict(), f, indent=2)
-        self.patterns[pattern.name] = pattern
\ No newline at end of file
+        pattern_path.write_bytes(orjson.dumps(pattern.model_dump(), option=orjson.OPT_INDENT_2))
+        self._evict_cached_pattern(str(pattern_path))
+        self.patterns[pattern.name] = pattern
+        self._index_patterns()
\ No newline at end of file
@@ -1,7 +1,49 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple, Union
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
+from cache import cached
+from tools._calculator_inputs import row, is_batch, columns, single, safe_divide, rounded
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+import asyncio
 import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Worker threads for property analyses, owned by this module so a burst of analyses can't
+# queue behind other to_thread work in the loop's default executor. One pool per process.
+_TOOL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("REVA_TOOL_THREADS", "16")),
+    thread_name_prefix="reva-tool"
+)
+
+# Seconds an analysis result is reused for identical property inputs
+PROPERTY_ANALYSIS_CACHE_TTL = 1800
+
+# (monotonic time read, year); the year is re-read from the clock at most hourly
+_YEAR_CACHE_TTL = 3600
+_year_cache: List[tuple] = []
+
+# DSCR band lower bounds, ascending, and the label for each band (one more than thresholds)
+_DSCR_THRESHOLDS = (1.0, 1.25, 1.5)
+_DSCR_LABELS = (
+    "Poor debt service coverage - potential risk",
+    "Adequate debt service coverage",
+    "Good debt service coverage",
+    "Strong debt service coverage"
+)
+
+def _current_year() -> int:
+    """Current UTC year, cached so condition assessments don't each read the wall clock"""
+    now = time.monotonic()
+    if _year_cache and now - _year_cache[0][0] < _YEAR_CACHE_TTL:
+        return _year_cache[0][1]
+    year = time.gmtime().tm_year
+    _year_cache[:] = [(now, year)]
+    return year
 
 class PropertyAnalysisInput(BaseModel):
     """Input schema for property analysis."""
@@ -60,50 +102,23 @@ class PropertyAnalysisTool(BaseTool):
             Dict containing analysis results
         """
         try:
-            import asyncio
+            # One worker-thread dispatch for the whole analysis rather than one per component
+            async def build_analysis() -> Dict[str, Any]:
+                return await asyncio.get_running_loop().run_in_executor(
+                    _TOOL_EXECUTOR,
+                    self._run_all_analyses,
+                    property_type,
+                    location,
+                    size,
+                    price,
+                    year_built
+                )
             
-            # Create tasks for each analysis component
-            tasks = [
-                asyncio.to_thread(lambda: {
-                    "type": property_type,
-                    "location": location,
-                    "size": size,
-                    "price": price,
-                    "year_built": year_built
-                }),
-                asyncio.to_thread(lambda: self._analyze_location(location)),
-                asyncio.to_thread(lambda: self._calculate_market_metrics(property_type, size, price)),
-                asyncio.to_thread(lambda: self._assess_condition(year_built)),
-                asyncio.to_thread(lambda: self._generate_recommendations(property_type, location))
-            ]
+            # Agents often repeat a call with the same arguments; errors are not cached
+            key = f"property_analysis:{(property_type, location, size, price, year_built)!r}"
+            return await cached(key, PROPERTY_ANALYSIS_CACHE_TTL, build_analysis)
             
-            # Execute all analysis tasks concurrently
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results and handle any exceptions
-            processed_results = []
-            for result in results:
-                if isinstance(result, Exception):
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"Analysis component error: {str(result)}")
-                    continue
-                processed_results.append(result)
-            
-            # Combine all results into final analysis
-            if len(processed_results) == 5:
-                analysis = {
-                    "property_overview": processed_results[0],
-                    "location_analysis": processed_results[1],
-                    "market_metrics": processed_results[2],
-                    "condition_assessment": processed_results[3],
-                    "recommendations": processed_results[4]
-                }
-                return analysis
-            else:
-                raise Exception("One or more analysis components failed")
-                
         except Exception as e:
-            logger = logging.getLogger(__name__)
             logger.error(f"Error in property analysis: {str(e)}")
             return {
                 "error": str(e),
@@ -111,6 +126,23 @@ class PropertyAnalysisTool(BaseTool):
                 "location": location
             }
 
+    def _run_all_analyses(self, property_type: str, location: str, size: Optional[float],
+                          price: Optional[float], year_built: Optional[int]) -> Dict[str, Any]:
+        """Run every analysis component in sequence and assemble the result."""
+        return {
+            "property_overview": {
+                "type": property_type,
+                "location": location,
+                "size": size,
+                "price": price,
+                "year_built": year_built
+            },
+            "location_analysis": self._analyze_location(location),
+            "market_metrics": self._calculate_market_metrics(property_type, size, price),
+            "condition_assessment": self._assess_condition(year_built),
+            "recommendations": self._generate_recommendations(property_type, location)
+        }
+
     def _analyze_location(self, location: str) -> Dict[str, Any]:
         """Analyze the property location."""
         # Placeholder for location analysis logic
@@ -139,9 +171,7 @@ class PropertyAnalysisTool(BaseTool):
         if not year_built:
             return {"condition": "Unknown"}
             
-        import datetime
-        current_year = datetime.datetime.now().year
-        age = current_year - year_built
+        age = _current_year() - year_built
         
         if age < 5:
             condition = "Excellent"
@@ -158,31 +188,49 @@ class PropertyAnalysisTool(BaseTool):
             "renovation_needed": age > 30
         }
 
-    def _generate_recommendations(self, property_type: str, location: str) -> List[str]:
-        """Generate property-specific recommendations."""
-        return [
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _generate_recommendations(property_type: str, location: str) -> Tuple[str, ...]:
+        """Generate property-specific recommendations (cached, so returned as a tuple)."""
+        return (
             f"Consider market trends for {property_type} properties in {location}",
             "Conduct detailed property inspection",
             "Review tenant history and occupancy rates",
             "Analyze potential for value-add improvements"
-        ]
+        )
 
-    async def _agenerate_recommendations(self, property_type: str, location: str) -> List[str]:
+    async def _agenerate_recommendations(self, property_type: str, location: str) -> Tuple[str, ...]:
         """Generate recommendations asynchronously."""
         return self._generate_recommendations(property_type, location)
 
 
+class PricePerSqftInputs(NamedTuple):
+    """Inputs for the price per square foot calculation."""
+    price: float = 0
+    square_feet: float = 0
+
+class ExpenseRatioInputs(NamedTuple):
+    """Inputs for the operating expense ratio calculation."""
+    operating_expenses: float = 0
+    gross_operating_income: float = 0
+
+class DSCRInputs(NamedTuple):
+    """Inputs for the debt service coverage ratio calculation."""
+    noi: float = 0
+    debt_service: float = 0
+
 class PropertyMetricsCalculatorInput(BaseModel):
     """Input schema for property metrics calculations."""
     operation: str = Field(
         description="Type of calculation to perform (price_per_sqft, operating_expense_ratio, dscr)",
         enum=["price_per_sqft", "operating_expense_ratio", "dscr"]
     )
-    values: Dict[str, float] = Field(
+    values: Dict[str, Union[float, List[float]]] = Field(
         description="""Dictionary of values needed for calculation.
         For Price per Sqft: price, square_feet
         For Operating Expense Ratio: operating_expenses, gross_operating_income
-        For DSCR: noi, debt_service"""
+        For DSCR: noi, debt_service
+        To calculate many properties at once, give each value as a list with one entry per property."""
     )
 
     model_config = {
@@ -207,91 +255,105 @@ class PropertyMetricsCalculator(BaseTool):
         - Price per Sqft: {"operation": "price_per_sqft", "values": {"price": 2000000, "square_feet": 10000}}
         - Operating Expense Ratio: {"operation": "operating_expense_ratio", "values": {"operating_expenses": 300000, "gross_operating_income": 800000}}
         - DSCR: {"operation": "dscr", "values": {"noi": 500000, "debt_service": 400000}}
+        - Several properties: {"operation": "dscr", "values": {"noi": [500000, 320000], "debt_service": [400000, 300000]}}
         """
     args_schema: type[BaseModel] = PropertyMetricsCalculatorInput
 
-    def _run(self, operation: str, values: Dict[str, float]) -> Dict[str, Any]:
+    def _run(self, operation: str, values: Dict[str, Union[float, List[float]]]) -> Dict[str, Any]:
         """
         Perform property-specific calculations based on the operation type.
         
         Args:
             operation: Type of calculation (price_per_sqft, operating_expense_ratio, dscr)
-            values: Dictionary containing required values for calculation
+            values: Dictionary containing required values for calculation, or lists of
+                them with one entry per property
             
         Returns:
-            Dictionary containing calculation results
+            Dictionary containing calculation results; for lists, one result list per
+            output, with None for rows that would divide by zero
         """
-        if operation == "price_per_sqft":
-            return self._calculate_price_per_sqft(values)
-        elif operation == "operating_expense_ratio":
-            return self._calculate_operating_expense_ratio(values)
-        elif operation == "dscr":
-            return self._calculate_dscr(values)
-        else:
-            raise ValueError(f"Unsupported operation: {operation}")
+        try:
+            batch = is_batch(values)
+            if operation == "price_per_sqft":
+                if batch:
+                    return self._calculate_price_per_sqft_batch(columns(values, PricePerSqftInputs._field_defaults))
+                return self._calculate_price_per_sqft(row(PricePerSqftInputs, values))
+            elif operation == "operating_expense_ratio":
+                if batch:
+                    return self._calculate_operating_expense_ratio_batch(
+                        columns(values, ExpenseRatioInputs._field_defaults)
+                    )
+                return self._calculate_operating_expense_ratio(row(ExpenseRatioInputs, values))
+            elif operation == "dscr":
+                if batch:
+                    return self._calculate_dscr_batch(columns(values, DSCRInputs._field_defaults))
+                return self._calculate_dscr(row(DSCRInputs, values))
+        except (TypeError, ValueError, ArithmeticError) as e:
+            return {"error": f"{operation} calculation failed: {str(e)}"}
+        raise ValueError(f"Unsupported operation: {operation}")
+
+    def _calculate_price_per_sqft_batch(self, inputs: List[np.ndarray]) -> Dict[str, Any]:
+        """Calculate price per square foot for aligned arrays of inputs."""
+        price, square_feet = inputs
+        return {"price_per_sqft": rounded(safe_divide(price, square_feet))}
+
+    def _calculate_operating_expense_ratio_batch(self, inputs: List[np.ndarray]) -> Dict[str, Any]:
+        """Calculate operating expense ratios for aligned arrays of inputs."""
+        operating_expenses, gross_operating_income = inputs
+        return {"operating_expense_ratio": rounded(safe_divide(operating_expenses, gross_operating_income) * 100)}
+
+    def _calculate_dscr_batch(self, inputs: List[np.ndarray]) -> Dict[str, Any]:
+        """Calculate Debt Service Coverage Ratios and their interpretations for aligned arrays of inputs."""
+        noi, debt_service = inputs
+        dscr = safe_divide(noi, debt_service)
+        bands = np.searchsorted(_DSCR_THRESHOLDS, dscr, side="right").tolist()
+        return {
+            "dscr": rounded(dscr),
+            "interpretation": [
+                None if missing else _DSCR_LABELS[band]
+                for band, missing in zip(bands, np.isnan(dscr).tolist())
+            ]
+        }
 
-    def _calculate_price_per_sqft(self, values: Dict[str, float]) -> Dict[str, Any]:
+    def _calculate_price_per_sqft(self, inputs: PricePerSqftInputs) -> Dict[str, Any]:
         """Calculate price per square foot."""
-        try:
-            price = values.get("price", 0)
-            square_feet = values.get("square_feet", 0)
+        price, square_feet = inputs
+        
+        if square_feet == 0:
+            return {"error": "Square footage cannot be zero"}
             
-            if square_feet == 0:
-                return {"error": "Square footage cannot be zero"}
-                
-            price_per_sqft = price / square_feet
-            return {
-                "price_per_sqft": round(price_per_sqft, 2),
-                "price": price,
-                "square_feet": square_feet
-            }
-        except Exception as e:
-            return {"error": f"Price per square foot calculation failed: {str(e)}"}
+        result = self._calculate_price_per_sqft_batch(single(inputs))
+        return {
+            "price_per_sqft": result["price_per_sqft"][0],
+            "price": price,
+            "square_feet": square_feet
+        }
 
-    def _calculate_operating_expense_ratio(self, values: Dict[str, float]) -> Dict[str, Any]:
+    def _calculate_operating_expense_ratio(self, inputs: ExpenseRatioInputs) -> Dict[str, Any]:
         """Calculate operating expense ratio."""
-        try:
-            operating_expenses = values.get("operating_expenses", 0)
-            gross_operating_income = values.get("gross_operating_income", 0)
+        operating_expenses, gross_operating_income = inputs
+        
+        if gross_operating_income == 0:
+            return {"error": "Gross operating income cannot be zero"}
             
-            if gross_operating_income == 0:
-                return {"error": "Gross operating income cannot be zero"}
-                
-            expense_ratio = (operating_expenses / gross_operating_income) * 100
-            return {
-                "operating_expense_ratio": round(expense_ratio, 2),
-                "operating_expenses": operating_expenses,
-                "gross_operating_income": gross_operating_income
-            }
-        except Exception as e:
-            return {"error": f"Operating expense ratio calculation failed: {str(e)}"}
+        result = self._calculate_operating_expense_ratio_batch(single(inputs))
+        return {
+            "operating_expense_ratio": result["operating_expense_ratio"][0],
+            "operating_expenses": operating_expenses,
+            "gross_operating_income": gross_operating_income
+        }
 
-    def _calculate_dscr(self, values: Dict[str, float]) -> Dict[str, Any]:
+    def _calculate_dscr(self, inputs: DSCRInputs) -> Dict[str, Any]:
         """Calculate Debt Service Coverage Ratio."""
-        try:
-            noi = values.get("noi", 0)
-            debt_service = values.get("debt_service", 0)
-            
-            if debt_service == 0:
-                return {"error": "Debt service cannot be zero"}
-                
-            dscr = noi / debt_service
-            return {
-                "dscr": round(dscr, 2),
-                "noi": noi,
-                "debt_service": debt_service,
-                "interpretation": self._interpret_dscr(dscr)
-            }
-        except Exception as e:
-            return {"error": f"DSCR calculation failed: {str(e)}"}
+        noi, debt_service = inputs
+        
+        if debt_service == 0:
+            return {"error": "Debt service cannot be zero"}
             
-    def _interpret_dscr(self, dscr: float) -> str:
-        """Interpret DSCR value."""
-        if dscr >= 1.5:
-            return "Strong debt service coverage"
-        elif dscr >= 1.25:
-            return "Good debt service coverage"
-        elif dscr >= 1.0:
-            return "Adequate debt service coverage"
-        else:
-            return "Poor debt service coverage - potential risk"
\ No newline at end of file
+        result = self._calculate_dscr_batch(single(inputs))
+        return {
+            "dscr": result["dscr"][0],
+            "noi": noi,
+            "debt_service": debt_service,
+            "interpretation": result["interpretation"][0]
+        }
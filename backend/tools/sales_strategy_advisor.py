@@ -4,6 +4,37 @@ from pydantic import BaseModel, Field
 from langchain.callbacks.manager import CallbackManagerForToolRun
 from datetime import datetime
 from enum import Enum
+import time
+
+# Default market factors, filled in with the property's location and type
+_FACTOR_TEMPLATES = (
+    "Strong demand in {location}",
+    "Growing interest in {property_type} properties",
+    "Favorable interest rates"
+)
+
+# Key considerations, filled positionally with property type, location, value label,
+# market trend and market strength
+_CONSIDERATION_TEMPLATES = (
+    "Property Type: {0} specific market dynamics",
+    "Location: {1} market conditions",
+    "Value Range: {2} property considerations",
+    "Market Strength: {3} market with {4} confidence"
+)
+_SPECIAL_CONSIDERATION_TEMPLATE = "Special Consideration: {0}: {1}"
+
+# (monotonic time read, month name); the month is re-read from the clock at most once a minute
+_MONTH_CACHE_TTL = 60
+_month_cache: List[tuple] = []
+
+def _current_month() -> str:
+    """Current month name, cached so each recommendation doesn't format a fresh datetime"""
+    now = time.monotonic()
+    if _month_cache and now - _month_cache[0][0] < _MONTH_CACHE_TTL:
+        return _month_cache[0][1]
+    month = datetime.now().strftime("%B")
+    _month_cache[:] = [(now, month)]
+    return month
 
 class SaleMethod(str, Enum):
     """Enumeration of available sale methods"""
@@ -73,9 +104,8 @@ class SalesStrategyAdvisorTool(BaseTool):
             trend="stable",
             strength=0.7,
             factors=[
-                "Strong demand in {location}",
-                f"Growing interest in {property_type} properties",
-                "Favorable interest rates"
+                template.format(location=location, property_type=property_type)
+                for template in _FACTOR_TEMPLATES
             ],
             recommendation="Current market conditions are favorable for sale"
         )
@@ -103,7 +133,7 @@ class SalesStrategyAdvisorTool(BaseTool):
         timeline_constraints: Optional[str] = None
     ) -> tuple[str, str]:
         """Generate timing recommendations and estimated timeline"""
-        current_month = datetime.now().strftime("%B")
+        current_month = _current_month()
         
         if timeline_constraints:
             timing = f"Based on your constraints: {timeline_constraints}"
@@ -126,7 +156,7 @@ class SalesStrategyAdvisorTool(BaseTool):
         timeline_constraints: Optional[str] = None,
         special_conditions: Optional[Dict[str, Any]] = None,
         run_manager: Optional[CallbackManagerForToolRun] = None,
-    ) -> SalesStrategyOutput:
+    ) -> Dict[str, Any]:
         """
         Generate sales strategy recommendations
         """
@@ -152,28 +182,32 @@ class SalesStrategyAdvisorTool(BaseTool):
         )
         
         # Compile key considerations
-        key_considerations = [
-            f"Property Type: {property_type} specific market dynamics",
-            f"Location: {location} market conditions",
-            f"Value Range: {'Premium' if property_value >= 50000000 else 'Standard'} property considerations",
-            f"Market Strength: {market_analysis.trend.title()} market with {market_analysis.strength:.0%} confidence"
-        ]
+        consideration_values = (
+            property_type,
+            location,
+            "Premium" if property_value >= 50000000 else "Standard",
+            market_analysis.trend.title(),
+            f"{market_analysis.strength:.0%}"
+        )
+        key_considerations = [template.format(*consideration_values) for template in _CONSIDERATION_TEMPLATES]
         
         if special_conditions:
-            key_considerations.extend([
-                f"Special Consideration: {k}: {v}"
+            key_considerations.extend(
+                _SPECIAL_CONSIDERATION_TEMPLATE.format(k, v)
                 for k, v in special_conditions.items()
-            ])
+            )
         
-        return SalesStrategyOutput(
-            recommended_method=recommended_method,
-            alternative_methods=alternative_methods,
-            timing_recommendation=timing_recommendation,
-            rationale=f"Based on {market_analysis.recommendation} and property characteristics",
-            market_analysis=market_analysis,
-            estimated_timeline=estimated_timeline,
-            key_considerations=key_considerations
-        )
+        # Plain dict in SalesStrategyOutput's JSON shape: building the model costs more
+        # than the rest of the call, and the agent only reads the values back out
+        return {
+            "recommended_method": recommended_method.value,
+            "alternative_methods": [method.value for method in alternative_methods],
+            "timing_recommendation": timing_recommendation,
+            "rationale": f"Based on {market_analysis.recommendation} and property characteristics",
+            "market_analysis": market_analysis.model_dump(),
+            "estimated_timeline": estimated_timeline,
+            "key_considerations": key_considerations
+        }
     
     async def _arun(
         self,
@@ -184,8 +218,10 @@ class SalesStrategyAdvisorTool(BaseTool):
         timeline_constraints: Optional[str] = None,
         special_conditions: Optional[Dict[str, Any]] = None,
         run_manager: Optional[CallbackManagerForToolRun] = None,
-    ) -> SalesStrategyOutput:
+    ) -> Dict[str, Any]:
         """Async version of _run"""
+        # _run is a few microseconds of pure Python, far less than a thread-pool
+        # hand-off would cost, so it runs directly on the event loop
         return self._run(
             property_type=property_type,
             property_value=property_value,
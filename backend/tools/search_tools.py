@@ -1,13 +1,53 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from langchain_core.tools import tool
 from langchain_core.tools import ToolException
+from functools import lru_cache
+import threading
+import time
 
-from vectorstore.supabase_store import VectorStoreManager
+from vectorstore.supabase_store import VectorStoreManager, on_corpus_change
 from logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Seconds a search result may be reused; adding or deleting documents clears the cache sooner
+SEARCH_CACHE_TTL = 300
+
+_vector_store: Optional[VectorStoreManager] = None
+_vector_store_lock = threading.Lock()
+
+def _vs() -> VectorStoreManager:
+    """Vector store shared by every search, so its Supabase and embedding clients are reused.
+
+    The lock stops concurrent first searches from each building their own manager.
+    """
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                _vector_store = VectorStoreManager()
+    return _vector_store
+
+@lru_cache(maxsize=1024)
+def _cached_query(query: str, k: int, threshold: float, ttl_bucket: int) -> Tuple[Tuple[str, float, str], ...]:
+    """(content, score, source) for each match at or above threshold.
+
+    ttl_bucket is the current SEARCH_CACHE_TTL window, so entries stop matching
+    once the window rolls over.
+    """
+    # VectorStoreManager.query is a coroutine, so this sync path calls the
+    # underlying store directly and applies the threshold itself
+    return tuple(
+        (doc.page_content, score, doc.metadata.get('source', 'Unknown'))
+        for doc, score in _vs().vector_store.similarity_search_by_vector_with_relevance_scores(
+            _vs().embed_query(query), k=k
+        )
+        if score >= threshold
+    )
+
+on_corpus_change(_cached_query.cache_clear)
+
 class SearchQuery(BaseModel):
     query: str = Field(description="The search query to execute")
     k: Optional[int] = Field(default=5, description="Number of results to return")
@@ -27,21 +67,15 @@ def search_documents(
     Returns the most relevant document passages.
     """
     try:
-        vector_store = VectorStoreManager()
-        results = vector_store.query(query, k=k, threshold=threshold)
+        results = _cached_query(query, k, threshold, int(time.monotonic() // SEARCH_CACHE_TTL))
         
         if not results:
             return "No relevant documents found for the given query."
             
-        formatted_results = []
-        for doc, score in results:
-            formatted_results.append(
-                f"Relevance Score: {score:.2f}\n"
-                f"Content: {doc.page_content}\n"
-                f"Source: {doc.metadata.get('source', 'Unknown')}\n"
-            )
-            
-        return "\n\n".join(formatted_results)
+        return "\n\n".join(
+            f"Relevance Score: {score:.2f}\nContent: {content}\nSource: {source}\n"
+            for content, score, source in results
+        )
         
     except Exception as e:
         logger.error(f"Error in document search: {str(e)}")
@@ -1,14 +1,54 @@
 from typing import Optional, List, ClassVar
 from langchain.tools import StructuredTool
 from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_openai import OpenAIEmbeddings # type: ignore
 from pydantic import BaseModel, Field
+from functools import lru_cache
+import asyncio
 import os
 from dotenv import load_dotenv
+from cache import SearchCache
 from logger import setup_logger
 
 logger = setup_logger(__name__)
 load_dotenv()
 
+# Read once; searches fail until it is configured
+TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+if not TAVILY_API_KEY:
+    logger.warning("TAVILY_API_KEY is not set; tavily_search calls will fail")
+
+# Seconds search results are reused; queries about fast-moving facts expire much sooner
+SEARCH_CACHE_TTL = 3600
+VOLATILE_SEARCH_CACHE_TTL = 60
+VOLATILE_QUERY_TERMS = ("weather", "price", "today")
+
+# Shared by every TavilySearchTool in the process. OpenAI embeddings of unrelated
+# queries routinely score 0.8-0.95 ("Austin office vacancy" vs "Dallas office vacancy"),
+# so only near-identical rewordings may share results, as in data/processors.py
+search_cache = SearchCache(max_size=512, similarity_threshold=0.97)
+
+def _cache_ttl(query: str) -> float:
+    """TTL for a query's results, short when the answer is likely to change within minutes"""
+    query_lower = query.lower()
+    if any(term in query_lower for term in VOLATILE_QUERY_TERMS):
+        return VOLATILE_SEARCH_CACHE_TTL
+    return SEARCH_CACHE_TTL
+
+@lru_cache(maxsize=8)
+def _get_tavily_client(max_results: int, search_depth: str) -> TavilySearchResults:
+    """Search client for one combination of settings, reused across calls"""
+    return TavilySearchResults(
+        max_results=max_results,
+        search_depth=search_depth,
+        api_key=TAVILY_API_KEY
+    )
+
+@lru_cache(maxsize=1)
+def _query_embeddings() -> OpenAIEmbeddings:
+    """Embedding client for semantic cache lookups, created on first use"""
+    return OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
+
 class TavilySearchInput(BaseModel):
     query: str = Field(..., description="The search query to look up")
     max_results: Optional[int] = Field(default=3, description="Maximum number of results to return")
@@ -24,12 +64,16 @@ class TavilySearchTool(StructuredTool):
     
     def _run(self, query: str, max_results: int = 3, search_depth: str = "basic") -> List[dict]:
         try:
-            search = TavilySearchResults(
-                max_results=max_results,
-                search_depth=search_depth,
-                api_key=os.getenv("TAVILY_API_KEY")
-            )
-            results = search.invoke(query)
+            params = (max_results, search_depth)
+            key = SearchCache.make_key(query, params)
+            results = search_cache.get(key)
+            if results is not None:
+                return results
+            
+            results = _get_tavily_client(max_results, search_depth).invoke(query)
+            # Failed searches come back as an error string; only real results are cached
+            if isinstance(results, list):
+                search_cache.set(key, results, _cache_ttl(query), params)
             return results
         except Exception as e:
             logger.error(f"Error in Tavily search: {str(e)}")
@@ -40,13 +84,29 @@ class TavilySearchTool(StructuredTool):
         Async implementation of Tavily search.
         """
         try:
-            search = TavilySearchResults(
-                max_results=max_results,
-                search_depth=search_depth,
-                api_key=os.getenv("TAVILY_API_KEY")
-            )
-            # Use ainvoke for async operation
-            results = await search.ainvoke(query)
+            params = (max_results, search_depth)
+            key = SearchCache.make_key(query, params)
+            results = search_cache.get(key)
+            if results is not None:
+                return results
+            
+            # The search starts straight away; a reworded query with the same meaning can
+            # still reuse earlier results if its embedding, fetched meanwhile, matches one
+            search = asyncio.create_task(_get_tavily_client(max_results, search_depth).ainvoke(query))
+            embedding = None
+            try:
+                embedding = await _query_embeddings().aembed_query(query)
+                results = search_cache.get_similar(embedding, params)
+                if results is not None:
+                    search.cancel()
+                    return results
+            except Exception as e:
+                logger.warning(f"Skipping semantic search cache: {str(e)}")
+            
+            results = await search
+            # Failed searches come back as an error string; only real results are cached
+            if isinstance(results, list):
+                search_cache.set(key, results, _cache_ttl(query), params, embedding)
             return results
         except Exception as e:
             logger.error(f"Error in async Tavily search: {str(e)}")
@@ -1,8 +1,35 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, ClassVar, Callable, Tuple, Literal, Union, Annotated
+from collections import OrderedDict
 from langchain.tools import BaseTool
-from pydantic import BaseModel, Field
-import asyncio
-import logging
+from pydantic import BaseModel, Discriminator, Field, model_validator
+import re
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Headline benefit for each target audience
+_AUDIENCE_BENEFITS = {
+    "investors": "strong ROI potential and stable cash flow",
+    "tenants": "prime location and modern amenities",
+    "developers": "development potential and market opportunity"
+}
+
+# Benefit statement for features mentioning each keyword; earlier keywords win when a
+# feature mentions several
+_BENEFIT_MAPPING = {
+    "parking": "Convenient parking for employees and visitors",
+    "security": "Enhanced safety and peace of mind",
+    "amenities": "Improved tenant satisfaction and retention",
+    "location": "Reduced commute times and better accessibility",
+    "modern": "Lower operating costs and improved efficiency"
+}
+_BENEFIT_PRIORITY = {key: index for index, key in enumerate(_BENEFIT_MAPPING)}
+_BENEFIT_RE = re.compile("|".join(map(re.escape, _BENEFIT_MAPPING)), re.IGNORECASE)
+
+# Generated propositions keyed by their inputs, most recently used last. Generation is
+# pure, so entries never go stale; the oldest is dropped past _PROPOSITION_CACHE_SIZE.
+_PROPOSITION_CACHE_SIZE = 512
+_proposition_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
 
 class ValuePropositionInput(BaseModel):
     """Input schema for value proposition generation."""
@@ -67,43 +94,31 @@ class ValuePropositionTool(BaseTool):
         Returns:
             Dict containing value proposition components
         """
+        # Feature order is part of the key: the first two features lead the core proposition.
+        # Cached propositions are shared between callers, so they copy the input lists.
+        key = (
+            property_type,
+            target_audience,
+            tuple(property_features),
+            tuple(location_benefits) if location_benefits is not None else None,
+            market_position
+        )
+        proposition = _proposition_cache.get(key)
+        if proposition is not None:
+            _proposition_cache.move_to_end(key)
+            return proposition
+
         try:
-            # Create tasks for each value proposition component
-            tasks = [
-                asyncio.to_thread(lambda: self._generate_core_proposition(property_type, target_audience, property_features)),
-                asyncio.to_thread(lambda: self._identify_key_benefits(property_features, location_benefits)),
-                asyncio.to_thread(lambda: self._analyze_competitive_advantages(property_type, property_features, market_position)),
-                asyncio.to_thread(lambda: self._create_targeted_messaging(target_audience, property_type)),
-                asyncio.to_thread(lambda: self._calculate_roi_potential(property_type, market_position))
-            ]
-            
-            # Execute all tasks concurrently
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results and handle any exceptions
-            processed_results = []
-            for result in results:
-                if isinstance(result, Exception):
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"Value proposition component error: {str(result)}")
-                    continue
-                processed_results.append(result)
-            
-            # Combine all results into final value proposition
-            if len(processed_results) == 5:
-                value_prop = {
-                    "core_value_proposition": processed_results[0],
-                    "key_benefits": processed_results[1],
-                    "competitive_advantages": processed_results[2],
-                    "target_messaging": processed_results[3],
-                    "roi_potential": processed_results[4]
-                }
-                return value_prop
-            else:
-                raise Exception("One or more value proposition components failed")
+            # The components are cheap in-process string and dict work, so they are built directly
+            proposition = {
+                "core_value_proposition": self._generate_core_proposition(property_type, target_audience, property_features),
+                "key_benefits": self._identify_key_benefits(property_features, location_benefits),
+                "competitive_advantages": self._analyze_competitive_advantages(property_type, property_features, market_position),
+                "target_messaging": self._create_targeted_messaging(target_audience, property_type),
+                "roi_potential": self._calculate_roi_potential(property_type, market_position)
+            }
                 
         except Exception as e:
-            logger = logging.getLogger(__name__)
             logger.error(f"Error generating value proposition: {str(e)}")
             return {
                 "error": str(e),
@@ -111,6 +126,11 @@ class ValuePropositionTool(BaseTool):
                 "target_audience": target_audience
             }
 
+        _proposition_cache[key] = proposition
+        if len(_proposition_cache) > _PROPOSITION_CACHE_SIZE:
+            _proposition_cache.popitem(last=False)
+        return proposition
+
     def _generate_core_proposition(
         self,
         property_type: str,
@@ -118,13 +138,7 @@ class ValuePropositionTool(BaseTool):
         property_features: List[str]
     ) -> str:
         """Generate core value proposition statement."""
-        audience_benefits = {
-            "investors": "strong ROI potential and stable cash flow",
-            "tenants": "prime location and modern amenities",
-            "developers": "development potential and market opportunity"
-        }
-        
-        benefit = audience_benefits.get(target_audience.lower(), "exceptional value")
+        benefit = _AUDIENCE_BENEFITS.get(target_audience.lower(), "exceptional value")
         features_highlight = ", ".join(property_features[:2])
         
         return f"A premium {property_type} property offering {benefit}, featuring {features_highlight} in a strategic location."
@@ -140,7 +154,7 @@ class ValuePropositionTool(BaseTool):
                 self._convert_feature_to_benefit(feature)
                 for feature in property_features
             ],
-            "location_advantages": location_benefits or [
+            "location_advantages": list(location_benefits) if location_benefits else [
                 "Excellent accessibility",
                 "Strong market presence",
                 "Growing neighborhood"
@@ -151,17 +165,10 @@ class ValuePropositionTool(BaseTool):
 
     def _convert_feature_to_benefit(self, feature: str) -> str:
         """Convert property feature to benefit statement."""
-        benefit_mapping = {
-            "parking": "Convenient parking for employees and visitors",
-            "security": "Enhanced safety and peace of mind",
-            "amenities": "Improved tenant satisfaction and retention",
-            "location": "Reduced commute times and better accessibility",
-            "modern": "Lower operating costs and improved efficiency"
-        }
-        
-        for key, value in benefit_mapping.items():
-            if key in feature.lower():
-                return value
+        found = _BENEFIT_RE.findall(feature)
+        if found:
+            key = min((match.lower() for match in found), key=_BENEFIT_PRIORITY.__getitem__)
+            return _BENEFIT_MAPPING[key]
                 
         return f"Enhanced value through {feature}"
 
@@ -174,7 +181,7 @@ class ValuePropositionTool(BaseTool):
         """Analyze and present competitive advantages."""
         return {
             "market_position": market_position or "Premium",
-            "unique_features": property_features,
+            "unique_features": list(property_features),
             "differentiators": [
                 "Strategic location",
                 "Modern amenities",
@@ -232,19 +239,44 @@ class ValuePropositionTool(BaseTool):
         return self._calculate_roi_potential(property_type, market_position)
 
 
+class ROIValues(BaseModel):
+    """Values for an ROI calculation."""
+    operation: Literal["roi"] = "roi"
+    initial_investment: float = Field(description="Total amount invested")
+    net_profit: float = Field(description="Net profit on the investment")
+
+class CapRateValues(BaseModel):
+    """Values for a cap rate calculation."""
+    operation: Literal["cap_rate"] = "cap_rate"
+    noi: float = Field(description="Net operating income")
+    property_value: float = Field(description="Property value")
+
+class NOIValues(BaseModel):
+    """Values for an NOI calculation."""
+    operation: Literal["noi"] = "noi"
+    gross_income: float = Field(description="Gross income")
+    operating_expenses: float = Field(description="Operating expenses")
+
 class FinancialCalculatorInput(BaseModel):
     """Input schema for financial calculations."""
-    operation: str = Field(
-        description="Type of calculation to perform (roi, cap_rate, noi)",
-        enum=["roi", "cap_rate", "noi"]
+    operation: Literal["roi", "cap_rate", "noi"] = Field(
+        description="Type of calculation to perform (roi, cap_rate, noi)"
     )
-    values: Dict[str, float] = Field(
+    values: Annotated[Union[ROIValues, CapRateValues, NOIValues], Discriminator("operation")] = Field(
         description="""Dictionary of values needed for calculation.
         For ROI: initial_investment, net_profit
         For Cap Rate: noi, property_value
         For NOI: gross_income, operating_expenses"""
     )
 
+    @model_validator(mode="before")
+    @classmethod
+    def _tag_values(cls, data: Any) -> Any:
+        """Pick the values model from the top-level operation"""
+        if isinstance(data, dict) and isinstance(data.get("values"), dict):
+            data = {**data, "values": {**data["values"], "operation": data.get("operation")}}
+        return data
+
 class FinancialCalculatorTool(BaseTool):
     """Tool for performing financial calculations related to commercial real estate."""
     name: str = "financial_calculator"
@@ -258,73 +290,74 @@ class FinancialCalculatorTool(BaseTool):
         """
     args_schema: type[BaseModel] = FinancialCalculatorInput
 
-    def _run(self, operation: str, values: Dict[str, float]) -> Dict[str, Any]:
+    def _run(self, operation: str, values: Union[ROIValues, CapRateValues, NOIValues]) -> Dict[str, Any]:
         """
         Perform financial calculations based on the operation type.
         
         Args:
             operation: Type of calculation (roi, cap_rate, noi)
-            values: Dictionary containing required values for calculation
+            values: Values for the operation; a plain dict is validated against its values model
             
         Returns:
             Dictionary containing calculation results
         """
-        if operation == "roi":
-            return self._calculate_roi(values)
-        elif operation == "cap_rate":
-            return self._calculate_cap_rate(values)
-        elif operation == "noi":
-            return self._calculate_noi(values)
-        else:
-            raise ValueError(f"Unsupported operation: {operation}")
+        calculate = self._OPERATIONS.get(operation)
+        if calculate is None:
+            return {"error": f"Unsupported operation: {operation}"}
+        try:
+            # Callers that go straight to _run/_arun (the agent's tool execution, /tools/batch)
+            # skip args_schema, so validate here; ValidationError is a ValueError
+            if not isinstance(values, BaseModel):
+                values = FinancialCalculatorInput.model_validate({"operation": operation, "values": values}).values
+            return calculate(self, values)
+        except (TypeError, ValueError, ArithmeticError) as e:
+            return {"error": f"{operation} calculation failed: {str(e)}"}
 
-    def _calculate_roi(self, values: Dict[str, float]) -> Dict[str, Any]:
+    def _calculate_roi(self, values: ROIValues) -> Dict[str, Any]:
         """Calculate Return on Investment."""
-        try:
-            initial_investment = values.get("initial_investment", 0)
-            net_profit = values.get("net_profit", 0)
+        initial_investment = values.initial_investment
+        net_profit = values.net_profit
+        
+        if initial_investment == 0:
+            return {"error": "Initial investment cannot be zero"}
             
-            if initial_investment == 0:
-                return {"error": "Initial investment cannot be zero"}
-                
-            roi = (net_profit / initial_investment) * 100
-            return {
-                "roi": round(roi, 2),
-                "initial_investment": initial_investment,
-                "net_profit": net_profit
-            }
-        except Exception as e:
-            return {"error": f"ROI calculation failed: {str(e)}"}
+        roi = (net_profit / initial_investment) * 100
+        return {
+            "roi": round(roi, 2),
+            "initial_investment": initial_investment,
+            "net_profit": net_profit
+        }
 
-    def _calculate_cap_rate(self, values: Dict[str, float]) -> Dict[str, Any]:
+    def _calculate_cap_rate(self, values: CapRateValues) -> Dict[str, Any]:
         """Calculate Capitalization Rate."""
-        try:
-            noi = values.get("noi", 0)
-            property_value = values.get("property_value", 0)
+        noi = values.noi
+        property_value = values.property_value
+        
+        if property_value == 0:
+            return {"error": "Property value cannot be zero"}
             
-            if property_value == 0:
-                return {"error": "Property value cannot be zero"}
-                
-            cap_rate = (noi / property_value) * 100
-            return {
-                "cap_rate": round(cap_rate, 2),
-                "noi": noi,
-                "property_value": property_value
-            }
-        except Exception as e:
-            return {"error": f"Cap Rate calculation failed: {str(e)}"}
+        cap_rate = (noi / property_value) * 100
+        return {
+            "cap_rate": round(cap_rate, 2),
+            "noi": noi,
+            "property_value": property_value
+        }
 
-    def _calculate_noi(self, values: Dict[str, float]) -> Dict[str, Any]:
+    def _calculate_noi(self, values: NOIValues) -> Dict[str, Any]:
         """Calculate Net Operating Income."""
-        try:
-            gross_income = values.get("gross_income", 0)
-            operating_expenses = values.get("operating_expenses", 0)
-            
-            noi = gross_income - operating_expenses
-            return {
-                "noi": round(noi, 2),
-                "gross_income": gross_income,
-                "operating_expenses": operating_expenses
-            }
-        except Exception as e:
-            return {"error": f"NOI calculation failed: {str(e)}"}
\ No newline at end of file
+        gross_income = values.gross_income
+        operating_expenses = values.operating_expenses
+        
+        noi = gross_income - operating_expenses
+        return {
+            "noi": round(noi, 2),
+            "gross_income": gross_income,
+            "operating_expenses": operating_expenses
+        }
+
+    # Calculation for each operation name, looked up once per _run call
+    _OPERATIONS: ClassVar[Dict[str, Callable[["FinancialCalculatorTool", Any], Dict[str, Any]]]] = {
+        "roi": _calculate_roi,
+        "cap_rate": _calculate_cap_rate,
+        "noi": _calculate_noi
+    }
@@ -76,24 +76,91 @@ ON economic_indicators(date DESC);
 CREATE INDEX IF NOT EXISTS idx_system_messages_active 
 ON system_messages(is_active) WHERE is_active = true;
 
--- Function for tool usage statistics
-CREATE OR REPLACE FUNCTION get_tool_usage_stats(user_id UUID)
-RETURNS jsonb
-LANGUAGE plpgsql AS $$
+-- Per-user, per-day tool counts, kept current by a trigger on chat_history so the
+-- dashboard reads a handful of rows instead of aggregating the history
+CREATE TABLE IF NOT EXISTS user_tool_counts (
+    user_id UUID NOT NULL,
+    tool_used TEXT NOT NULL,
+    day DATE NOT NULL,
+    cnt BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, tool_used, day)
+);
+
+-- Backfill from existing history; rows the trigger already maintains are left alone
+INSERT INTO user_tool_counts (user_id, tool_used, day, cnt)
+SELECT user_id, tool_used, created_at::date, COUNT(*)
+FROM chat_history
+WHERE tool_used IS NOT NULL
+GROUP BY user_id, tool_used, created_at::date
+ON CONFLICT (user_id, tool_used, day) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_tool_count()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp AS $$
 BEGIN
-    RETURN (
-        SELECT jsonb_object_agg(tool_used, count)
-        FROM (
-            SELECT tool_used, COUNT(*) as count
-            FROM chat_history
-            WHERE user_id = $1
-            AND created_at >= NOW() - INTERVAL '7 days'
-            GROUP BY tool_used
-        ) t
-    );
+    -- An update that changes the counted key moves one count from the old row to the new one
+    IF TG_OP = 'UPDATE'
+        AND NEW.user_id IS NOT DISTINCT FROM OLD.user_id
+        AND NEW.tool_used IS NOT DISTINCT FROM OLD.tool_used
+        AND NEW.created_at::date IS NOT DISTINCT FROM OLD.created_at::date THEN
+        RETURN NEW;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.tool_used IS NOT NULL THEN
+        UPDATE user_tool_counts
+        SET cnt = GREATEST(cnt - 1, 0)
+        WHERE user_id = OLD.user_id
+        AND tool_used = OLD.tool_used
+        AND day = COALESCE(OLD.created_at, CURRENT_TIMESTAMP)::date;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.tool_used IS NOT NULL THEN
+        INSERT INTO user_tool_counts (user_id, tool_used, day, cnt)
+        VALUES (NEW.user_id, NEW.tool_used, COALESCE(NEW.created_at, CURRENT_TIMESTAMP)::date, 1)
+        ON CONFLICT (user_id, tool_used, day) DO UPDATE SET cnt = user_tool_counts.cnt + 1;
+    END IF;
+
+    RETURN NULL;
 END;
 $$;
 
+DROP TRIGGER IF EXISTS bump_chat_history_tool_count ON chat_history;
+CREATE TRIGGER bump_chat_history_tool_count
+    AFTER INSERT OR UPDATE OF user_id, tool_used, created_at OR DELETE ON chat_history
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_tool_count();
+
+-- Function for tool usage statistics over the last 7 days
+CREATE OR REPLACE FUNCTION get_tool_usage_stats(user_id UUID)
+RETURNS jsonb
+LANGUAGE sql STABLE AS $$
+    SELECT jsonb_object_agg(tool_used, count)
+    FROM (
+        SELECT tc.tool_used, SUM(tc.cnt) as count
+        FROM user_tool_counts tc
+        WHERE tc.user_id = $1
+        AND tc.day > CURRENT_DATE - 7
+        GROUP BY tc.tool_used
+    ) t;
+$$;
+
+-- Function for dashboard stats: chat_history is scanned once for both chat counts
+CREATE OR REPLACE FUNCTION get_dashboard_stats(uid UUID)
+RETURNS TABLE (
+    saved_items BIGINT,
+    active_chats BIGINT,
+    total_queries BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        (SELECT COUNT(*) FROM saved_items si WHERE si.user_id = uid),
+        COUNT(*) FILTER (WHERE ch.created_at >= NOW() - INTERVAL '1 day'),
+        COUNT(*)
+    FROM chat_history ch
+    WHERE ch.user_id = uid;
+$$;
+
 -- Function to update timestamps
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -139,6 +206,7 @@ ALTER TABLE chat_history ENABLE ROW LEVEL SECURITY;
 ALTER TABLE saved_items ENABLE ROW LEVEL SECURITY;
 ALTER TABLE property_views ENABLE ROW LEVEL SECURITY;
 ALTER TABLE system_messages ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_tool_counts ENABLE ROW LEVEL SECURITY;
 
 -- Drop existing policies if they exist
 DROP POLICY IF EXISTS "Users can view their own chat history" ON chat_history;
@@ -151,6 +219,7 @@ DROP POLICY IF EXISTS "Users can view their own property views" ON property_view
 DROP POLICY IF EXISTS "Users can insert their own property views" ON property_views;
 DROP POLICY IF EXISTS "Users can update their own property views" ON property_views;
 DROP POLICY IF EXISTS "Admins can manage system messages" ON system_messages;
+DROP POLICY IF EXISTS "Users can view their own tool counts" ON user_tool_counts;
 
 -- Create RLS policies for chat_history
 CREATE POLICY "Users can view their own chat history"
@@ -161,6 +230,11 @@ CREATE POLICY "Users can insert their own chat history"
     ON chat_history FOR INSERT
     WITH CHECK (auth.uid() = user_id);
 
+-- Create RLS policies for user_tool_counts; rows are only written by the chat_history trigger
+CREATE POLICY "Users can view their own tool counts"
+    ON user_tool_counts FOR SELECT
+    USING (auth.uid() = user_id);
+
 -- Create RLS policies for saved_items
 CREATE POLICY "Users can view their own saved items"
     ON saved_items FOR SELECT
@@ -214,6 +288,23 @@ BEGIN
 END;
 $$;
 
+-- Function to replace the active system message in one transaction
+CREATE OR REPLACE FUNCTION set_active_system_message(p_message TEXT)
+RETURNS SETOF system_messages
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE system_messages
+    SET is_active = false
+    WHERE is_active = true;
+
+    RETURN QUERY
+    INSERT INTO system_messages (message, is_active)
+    VALUES (p_message, true)
+    RETURNING *;
+END;
+$$;
+
 -- Function to get all users
 CREATE OR REPLACE FUNCTION get_users()
 RETURNS TABLE (
@@ -308,4 +399,35 @@ GRANT ALL ON ALL SEQUENCES IN SCHEMA public TO authenticated;
 GRANT ALL ON ALL FUNCTIONS IN SCHEMA public TO authenticated;
 
 -- Grant execute permission to authenticated users
-GRANT EXECUTE ON FUNCTION get_users() TO authenticated; 
\ No newline at end of file
+GRANT EXECUTE ON FUNCTION get_users() TO authenticated; 
+
+-- Snapshot of auth.users for the admin user list, refreshed every minute
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS admin_users_v AS
+SELECT
+    au.id,
+    au.email::text AS email,
+    COALESCE(au.role::text, 'user') AS role,
+    au.last_sign_in_at,
+    au.created_at,
+    au.updated_at,
+    CASE WHEN au.confirmed_at IS NOT NULL THEN 'active' ELSE 'inactive' END AS status
+FROM auth.users au;
+
+-- Unique index required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_admin_users_v_id
+ON admin_users_v(id);
+
+CREATE INDEX IF NOT EXISTS idx_admin_users_v_created
+ON admin_users_v(created_at DESC);
+
+-- Only the service role may read user emails (after the schema-wide grants above)
+REVOKE ALL ON admin_users_v FROM anon, authenticated;
+GRANT SELECT ON admin_users_v TO service_role;
+
+SELECT cron.schedule(
+    'refresh-admin-users-v',
+    '* * * * *',
+    'REFRESH MATERIALIZED VIEW CONCURRENTLY admin_users_v'
+);
@@ -1,32 +1,176 @@
-from typing import List, Tuple, Optional, Dict, Union
+from typing import Callable, List, Tuple, Optional, Dict, Union
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import httpx
 import logging
+import threading
+import time
+import uuid
+import orjson
+import openai # type: ignore
+from openai import AsyncOpenAI # type: ignore
 from langchain_community.vectorstores import SupabaseVectorStore # type: ignore
 from langchain_openai import OpenAIEmbeddings # type: ignore
 from langchain_core.documents import Document # type: ignore
-from supabase.client import Client, create_client # type: ignore
+from supabase.client import Client # type: ignore
+from postgrest.exceptions import APIError # type: ignore
 from langchain_text_splitters import RecursiveCharacterTextSplitter # type: ignore
-from tenacity import retry, stop_after_attempt, wait_exponential # type: ignore
+from tenacity import retry, retry_if_exception, retry_if_exception_type, stop_after_attempt, wait_exponential # type: ignore
 from datetime import datetime
 from config.settings import settings
+from config.supabase import get_supabase
 from logger import setup_logger
 import asyncio
 
 logger = setup_logger(__name__)
 
+# Called after documents are added or deleted, so search result caches can be dropped
+_corpus_change_callbacks: List[Callable[[], None]] = []
+
+def on_corpus_change(callback: Callable[[], None]) -> None:
+    """Register a callback to run whenever the document corpus changes."""
+    _corpus_change_callbacks.append(callback)
+
+def _notify_corpus_change() -> None:
+    for callback in _corpus_change_callbacks:
+        callback()
+
+# Chunks per embeddings request, and how many requests may be in flight at once
+EMBEDDING_BATCH_SIZE = 96
+EMBEDDING_CONCURRENCY = 10
+
+# Connection pool for embeddings requests, shared by every manager; sized for
+# EMBEDDING_CONCURRENCY batches alongside concurrent query embeddings
+EMBEDDING_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+EMBEDDING_HTTP_TIMEOUT = 30
+
+# Seconds allowed for uploading a batch input file or downloading its results;
+# either can approach the Batch API's 200MB file limit
+BATCH_FILE_TIMEOUT = 600
+
+@lru_cache(maxsize=1)
+def _get_embeddings_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Keep-alive (sync, async) HTTP clients for OpenAIEmbeddings; the async one speaks HTTP/2."""
+    return (
+        httpx.Client(limits=EMBEDDING_HTTP_LIMITS, timeout=EMBEDDING_HTTP_TIMEOUT),
+        httpx.AsyncClient(limits=EMBEDDING_HTTP_LIMITS, timeout=EMBEDDING_HTTP_TIMEOUT, http2=True)
+    )
+
+@lru_cache(maxsize=1)
+def _get_openai_client() -> AsyncOpenAI:
+    """OpenAI client for Batch API calls, on the shared async HTTP client."""
+    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=_get_embeddings_http_clients()[1])
+
+# Uploads with more chunks than this are embedded through the OpenAI Batch API: half
+# the price and far higher rate limits, but results arrive minutes to hours later.
+# Their chunks are stored straight away without embeddings, and
+# run_embedding_job_poller fills the embeddings in once the batch completes.
+BATCH_EMBEDDING_MIN_CHUNKS = 500
+EMBEDDING_JOB_POLL_INTERVAL = 60
+_EMBEDDING_JOB_FAILED = ("failed", "expired", "cancelled")
+
+# Retry for searches and deletes: only transient network, Supabase and OpenAI errors, with short
+# backoff so a request isn't held for long. tenacity sleeps with asyncio.sleep when
+# wrapping a coroutine, so waiting doesn't block the event loop.
+_TRANSIENT_ERRORS = (
+    httpx.HTTPError,
+    TimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError
+)
+# Postgres error classes worth another attempt: connection loss, resource exhaustion,
+# server shutdown, serialization failures and deadlocks
+_TRANSIENT_SQLSTATES = ("08", "53", "57P", "40001", "40P01")
+
+def _is_transient_api_error(error: BaseException) -> bool:
+    """Whether a PostgREST APIError is a 5xx response or a transient Postgres error.
+
+    postgrest-py raises APIError for every non-2xx response; when the body isn't
+    PostgREST's JSON (a gateway 502/503, say) its code is the HTTP status.
+    """
+    if not isinstance(error, APIError):
+        return False
+    code = str(error.code or "")
+    if code.isdigit() and len(code) == 3:
+        return code.startswith("5")
+    return code.startswith(_TRANSIENT_SQLSTATES)
+
+_retry_transient = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.5, max=4),
+    retry=retry_if_exception_type(_TRANSIENT_ERRORS) | retry_if_exception(_is_transient_api_error),
+    reraise=True
+)
+
+# Query embeddings shared by every manager, keyed by the SHA-256 of the query text and
+# kept in least-recently-used order. Entries expire after QUERY_EMBEDDING_TTL seconds
+# so a change of embedding model is picked up without a restart.
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+QUERY_EMBEDDING_TTL = 3600
+_query_embeddings: "OrderedDict[bytes, Tuple[float, List[float]]]" = OrderedDict()
+_query_embeddings_lock = threading.Lock()
+
+def _query_embedding_key(query: str) -> bytes:
+    return hashlib.sha256(query.encode()).digest()
+
+def _get_query_embedding(key: bytes) -> Optional[List[float]]:
+    """Cached embedding for key, or None if it is missing or expired."""
+    with _query_embeddings_lock:
+        entry = _query_embeddings.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _query_embeddings[key]
+            return None
+        _query_embeddings.move_to_end(key)
+        return entry[1]
+
+def _set_query_embedding(key: bytes, embedding: List[float]) -> None:
+    with _query_embeddings_lock:
+        _query_embeddings[key] = (time.monotonic() + QUERY_EMBEDDING_TTL, embedding)
+        _query_embeddings.move_to_end(key)
+        if len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+            _query_embeddings.popitem(last=False)
+
 class VectorStoreManager:
     def __init__(self):
-        self.supabase: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_KEY
-        )
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        # Clients and the splitter are built on first use, so importing the module or
+        # constructing a manager opens no connections (and a forked worker builds its own)
+        self._supabase: Optional[Client] = None
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+        self._text_splitter: Optional[RecursiveCharacterTextSplitter] = None
         self._vector_store = None
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=50,
-        )
+
+    @property
+    def supabase(self) -> Client:
+        if self._supabase is None:
+            # The process-wide service-key client, so managers share its connection pool
+            self._supabase = get_supabase(auth=False)
+        return self._supabase
+
+    @property
+    def embeddings(self) -> OpenAIEmbeddings:
+        if self._embeddings is None:
+            http_client, http_async_client = _get_embeddings_http_clients()
+            self._embeddings = OpenAIEmbeddings(
+                openai_api_key=settings.OPENAI_API_KEY,
+                http_client=http_client,
+                http_async_client=http_async_client
+            )
+        return self._embeddings
+
+    @property
+    def text_splitter(self) -> RecursiveCharacterTextSplitter:
+        if self._text_splitter is None:
+            # Chunks are measured in tokens of the embedding model's encoding
+            self._text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+                encoding_name="cl100k_base",
+                chunk_size=settings.CHUNK_SIZE,
+                chunk_overlap=settings.CHUNK_OVERLAP,
+            )
+        return self._text_splitter
 
     @property
     def vector_store(self) -> SupabaseVectorStore:
@@ -39,15 +183,60 @@ class VectorStoreManager:
             )
         return self._vector_store
 
-    async def list_documents(self) -> List[Dict]:
-        """List all uploaded documents with metadata."""
+    def embed_query(self, query: str) -> List[float]:
+        """Embedding for a search query, reused from the shared cache when possible."""
+        key = _query_embedding_key(query)
+        embedding = _get_query_embedding(key)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(query)
+            _set_query_embedding(key, embedding)
+        return embedding
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """Async version of embed_query."""
+        key = _query_embedding_key(query)
+        embedding = _get_query_embedding(key)
+        if embedding is None:
+            embedding = await self.embeddings.aembed_query(query)
+            _set_query_embedding(key, embedding)
+        return embedding
+
+    async def list_documents(self, limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        List uploaded documents with metadata, newest first.
+        
+        Args:
+            limit (int): Maximum number of documents to return. Defaults to 50.
+            cursor (Optional[str]): next_cursor from the previous page. Defaults to None (first page).
+            
+        Returns:
+            Dict: {"items": [{"id", "metadata", "chunk_count"}, ...], "next_cursor": str or None when there are no more pages}
+        """
         try:
-            # Use regular similarity search since we don't need scores for listing
-            response = self.vector_store.similarity_search(
-                query="",
-                k=100  # Adjust this number based on how many documents you want to list
+            # Keyset pagination on (created_at, id) rather than OFFSET; id breaks ties
+            # between documents stored at the same instant
+            request = (
+                self.supabase.table("documents_meta")
+                .select("id, metadata, chunk_count, created_at")
+                .order("created_at", desc=True)
+                .order("id", desc=True)
+                .limit(limit)
             )
-            return [{"id": doc.metadata.get("id"), "metadata": doc.metadata} for doc in response]
+            if cursor:
+                created_at, _, last_id = cursor.rpartition(",")
+                request = request.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt.{last_id})'
+                )
+            response = await asyncio.to_thread(request.execute)
+            
+            rows = response.data or []
+            items = [
+                {"id": row["id"], "metadata": row["metadata"], "chunk_count": row["chunk_count"]}
+                for row in rows
+            ]
+            next_cursor = f'{rows[-1]["created_at"]},{rows[-1]["id"]}' if len(rows) == limit else None
+            return {"items": items, "next_cursor": next_cursor}
         except Exception as e:
             logger.error(f"Error listing documents: {str(e)}")
             raise
@@ -55,25 +244,28 @@ class VectorStoreManager:
     async def get_document(self, document_id: str) -> Dict:
         """Get a specific document's metadata."""
         try:
-            response = self.vector_store.similarity_search(
-                query="",
-                k=1,
-                filter={"id": document_id}
+            response = await asyncio.to_thread(
+                self.supabase.table("documents_meta")
+                .select("id, metadata, chunk_count")
+                .eq("id", document_id)
+                .limit(1)
+                .execute
             )
-            if response:
-                doc = response[0]
-                return {"id": doc.metadata.get("id"), "metadata": doc.metadata}
-            return {}
+            return response.data[0] if response.data else {}
         except Exception as e:
             logger.error(f"Error getting document {document_id}: {str(e)}")
             raise
 
+    @_retry_transient
     async def delete_document(self, document_id: str) -> None:
         """Delete a document and its vectors."""
         try:
-            # SupabaseVectorStore handles deletion of vectors
-            await self.vector_store.delete({"id": document_id})
-            logger.info(f"Successfully deleted document {document_id}")
+            # Chunks and the documents_meta row go in one transaction
+            response = await asyncio.to_thread(
+                self.supabase.rpc("delete_document", {"document_id": document_id}).execute
+            )
+            _notify_corpus_change()
+            logger.info(f"Successfully deleted document {document_id} ({response.data} chunks)")
         except Exception as e:
             logger.error(f"Error deleting document {document_id}: {str(e)}")
             raise
@@ -89,18 +281,31 @@ class VectorStoreManager:
     ) -> str:
         """Create vector store from documents with metadata."""
         try:
-            # Split documents into chunks
-            docs = self.text_splitter.split_documents(documents)
-            
-            # Add metadata to each document chunk
-            for doc in docs:
-                doc.metadata.update(metadata)
+            # Split documents into chunks, merging the upload metadata into each source
+            # document's metadata once; the splitter copies it onto every chunk. Splitting
+            # a large upload is CPU-heavy, so it runs off the event loop.
+            docs = await asyncio.to_thread(
+                self.text_splitter.create_documents,
+                [doc.page_content for doc in documents],
+                metadatas=[{**doc.metadata, **metadata} for doc in documents]
+            )
             
-            # Create vector store directly using LangChain's SupabaseVectorStore
-            vector_store = await self.create_from_documents(docs)
+            if len(docs) > BATCH_EMBEDDING_MIN_CHUNKS:
+                await self._submit_embedding_job(docs, metadata["id"])
+            else:
+                await self.create_from_documents(docs)
+            if not docs:
+                return None
             
-            # Return the first document's ID as the main document ID
-            return docs[0].metadata.get("id") if docs else None
+            # Every chunk carries the upload's metadata, so its ID is the document ID
+            await asyncio.to_thread(
+                self.supabase.table("documents_meta").upsert({
+                    "id": metadata["id"],
+                    "metadata": metadata,
+                    "chunk_count": len(docs)
+                }).execute
+            )
+            return metadata["id"]
                 
         except Exception as e:
             logger.error(f"Error processing document: {str(e)}")
@@ -118,20 +323,173 @@ class VectorStoreManager:
         """Create vector store from documents with retry logic."""
         try:
             logger.info(f"Creating vector store from {len(documents)} documents")
-            vector_store = SupabaseVectorStore.from_documents(
-                documents,
-                self.embeddings,
-                client=self.supabase,
-                table_name="documents",
-                query_name="match_documents",
-                chunk_size=chunk_size
-            )
+            batches = [
+                documents[i:i + EMBEDDING_BATCH_SIZE]
+                for i in range(0, len(documents), EMBEDDING_BATCH_SIZE)
+            ]
+            semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+            async def embed_batch(batch: List[Document]) -> List[List[float]]:
+                async with semaphore:
+                    return await self.embeddings.aembed_documents([doc.page_content for doc in batch])
+
+            embedded = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+            rows = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "content": doc.page_content,
+                    "embedding": embedding,
+                    "metadata": doc.metadata
+                }
+                for batch, embeddings in zip(batches, embedded)
+                for doc, embedding in zip(batch, embeddings)
+            ]
+
+            await self._upsert_rows(rows, chunk_size)
+            _notify_corpus_change()
             logger.info("Successfully created vector store")
-            return vector_store
+            return self.vector_store
         except Exception as e:
             logger.error(f"Error creating vector store: {str(e)}")
             raise
 
+    async def _upsert_rows(self, rows: List[Dict], chunk_size: int = 500) -> None:
+        """Upsert rows into the documents table, chunk_size rows per request to keep bodies small."""
+        for i in range(0, len(rows), chunk_size):
+            await asyncio.to_thread(
+                self.supabase.table("documents").upsert(rows[i:i + chunk_size]).execute
+            )
+
+    async def _set_embeddings(self, rows: List[Dict], chunk_size: int = 500) -> int:
+        """
+        Set the embeddings of existing chunk rows, chunk_size rows per request.
+        
+        Unlike _upsert_rows this never inserts, so chunks deleted in the meantime stay deleted.
+        
+        Returns:
+            int: The number of rows updated
+        """
+        updated = 0
+        for i in range(0, len(rows), chunk_size):
+            response = await asyncio.to_thread(
+                self.supabase.rpc("set_document_embeddings", {"embeddings": rows[i:i + chunk_size]}).execute
+            )
+            updated += response.data or 0
+        return updated
+
+    async def _submit_embedding_job(self, documents: List[Document], document_id: str) -> str:
+        """
+        Store chunks without embeddings and submit an OpenAI batch job to embed them.
+        
+        Each batch request's custom_id is the id of the chunk row it embeds, so the
+        results can be written back by poll_embedding_jobs after a restart. Chunk ids
+        are derived from the document id and chunk index, so a retried upload
+        overwrites its earlier rows instead of leaving them without embeddings.
+        
+        Returns:
+            str: The OpenAI batch id
+        """
+        rows = [
+            {
+                "id": str(uuid.uuid5(uuid.UUID(document_id), str(i))),
+                "content": doc.page_content,
+                "embedding": None,
+                "metadata": doc.metadata
+            }
+            for i, doc in enumerate(documents)
+        ]
+        await self._upsert_rows(rows)
+        
+        requests = b"\n".join(
+            orjson.dumps({
+                "custom_id": row["id"],
+                "method": "POST",
+                "url": "/v1/embeddings",
+                "body": {"model": self.embeddings.model, "input": row["content"]}
+            })
+            for row in rows
+        )
+        client = _get_openai_client()
+        batch_file = await client.files.create(
+            file=("embeddings.jsonl", requests),
+            purpose="batch",
+            timeout=BATCH_FILE_TIMEOUT
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/embeddings",
+            completion_window="24h"
+        )
+        await asyncio.to_thread(
+            self.supabase.table("embedding_jobs").insert({
+                "id": batch.id,
+                "document_id": document_id,
+                "status": batch.status
+            }).execute
+        )
+        logger.info(f"Submitted embedding batch {batch.id} for {len(rows)} chunks of document {document_id}")
+        return batch.id
+
+    async def poll_embedding_jobs(self) -> None:
+        """Check pending embedding batches and store the embeddings of any that finished."""
+        response = await asyncio.to_thread(
+            self.supabase.table("embedding_jobs").select("id, document_id").is_("completed_at", "null").execute
+        )
+        for job in response.data or []:
+            # One job that can't be read mustn't hold back the others
+            try:
+                await self._poll_embedding_job(job)
+            except Exception as e:
+                logger.error(f"Error polling embedding batch {job['id']}: {str(e)}")
+
+    async def _poll_embedding_job(self, job: Dict) -> None:
+        """Update one embedding job, storing its embeddings if the batch has finished."""
+        client = _get_openai_client()
+        batch = await client.batches.retrieve(job["id"])
+        update: Dict = {"status": batch.status}
+        
+        if batch.status == "completed":
+            # A batch whose requests all failed completes with no output file, only an error file
+            rows = []
+            if batch.output_file_id:
+                content = await client.files.content(batch.output_file_id, timeout=BATCH_FILE_TIMEOUT)
+                for line in content.content.splitlines():
+                    result = orjson.loads(line)
+                    body = (result.get("response") or {}).get("body") or {}
+                    if body.get("data"):
+                        rows.append({"id": result["custom_id"], "embedding": body["data"][0]["embedding"]})
+            if batch.error_file_id:
+                errors = await client.files.content(batch.error_file_id, timeout=BATCH_FILE_TIMEOUT)
+                failed = errors.content.splitlines()
+                if failed:
+                    result = orjson.loads(failed[0])
+                    error = result.get("error") or ((result.get("response") or {}).get("body") or {}).get("error")
+                    logger.error(
+                        f"Embedding failed for {len(failed)} chunks of document {job['document_id']}, "
+                        f"leaving them out of search; first error: {error}"
+                    )
+            stored = await self._set_embeddings(rows)
+            if stored:
+                _notify_corpus_change()
+            update["completed_at"] = datetime.utcnow().isoformat()
+            logger.info(f"Stored {stored} of {len(rows)} embeddings for document {job['document_id']}")
+        elif batch.status in _EMBEDDING_JOB_FAILED:
+            update["completed_at"] = datetime.utcnow().isoformat()
+            logger.error(f"Embedding batch {job['id']} for document {job['document_id']} ended as {batch.status}")
+        
+        await asyncio.to_thread(
+            self.supabase.table("embedding_jobs").update(update).eq("id", job["id"]).execute
+        )
+
+    async def run_embedding_job_poller(self) -> None:
+        """Poll pending embedding batches every EMBEDDING_JOB_POLL_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(EMBEDDING_JOB_POLL_INTERVAL)
+            try:
+                await self.poll_embedding_jobs()
+            except Exception as e:
+                logger.error(f"Error polling embedding jobs: {str(e)}")
+
     async def similarity_search(
         self,
         query: str,
@@ -149,17 +507,7 @@ class VectorStoreManager:
         Returns:
             List[Document]: List of documents most similar to the query
         """
-        try:
-            results = self.vector_store.similarity_search(
-                query,
-                k=k,
-                filter=filter
-            )
-            logger.info(f"Similarity search returned {len(results)} documents")
-            return results
-        except Exception as e:
-            logger.error(f"Error in similarity search: {str(e)}")
-            raise
+        return await self.query(query, k, return_scores=False, filter=filter)
 
     async def similarity_search_with_score(
         self,
@@ -180,25 +528,47 @@ class VectorStoreManager:
         Returns:
             List[Tuple[Document, float]]: List of tuples of document and its similarity score
         """
+        return await self.query(query, k, threshold, return_scores=True, filter=filter)
+
+    @_retry_transient
+    async def batch_query(
+        self,
+        queries: List[str],
+        k: int = 5,
+        filter: Optional[Dict] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search for several queries at once: one embedding request and one database call.
+        
+        Args:
+            queries (List[str]): The query texts to search for
+            k (int): Number of results to return per query. Defaults to 5.
+            filter (Optional[Dict]): Metadata filter applied to every query. Defaults to None.
+            
+        Returns:
+            List[List[Tuple[Document, float]]]: Document/score pairs for each query, in query order
+        """
         try:
-            results = self.vector_store.similarity_search_with_relevance_scores(
-                query,
-                k=k,
-                filter=filter
+            embeddings = await self.embeddings.aembed_documents(queries)
+            response = await asyncio.to_thread(
+                self.supabase.rpc(
+                    "match_documents_batch",
+                    {"query_embeddings": embeddings, "match_count": k, "filter": filter or {}}
+                ).execute
             )
             
-            # Filter results by threshold
-            filtered_results = [
-                (doc, score) for doc, score in results
-                if score >= threshold
-            ]
+            results: List[List[Tuple[Document, float]]] = [[] for _ in queries]
+            for row in response.data or []:
+                doc = Document(page_content=row.get("content", ""), metadata=row.get("metadata", {}))
+                results[row["query_index"] - 1].append((doc, row["similarity"]))
             
-            logger.info(f"Similarity search returned {len(filtered_results)} documents above threshold")
-            return filtered_results
+            logger.info(f"Batch similarity search ran {len(queries)} queries")
+            return results
         except Exception as e:
-            logger.error(f"Error in similarity search with scores: {str(e)}")
+            logger.error(f"Error in batch similarity search: {str(e)}")
             raise
 
+    @_retry_transient
     async def query(
         self,
         query: str,
@@ -220,6 +590,39 @@ class VectorStoreManager:
         Returns:
             Union[List[Document], List[Tuple[Document, float]]]: List of documents or tuples of document and score
         """
-        if return_scores:
-            return await self.similarity_search_with_score(query, k, filter, threshold)
-        return await self.similarity_search(query, k, filter)
\ No newline at end of file
+        try:
+            # Both search modes share this one embedding of the query
+            embedding = await self.aembed_query(query)
+            
+            if not return_scores:
+                results = await asyncio.to_thread(
+                    self.vector_store.similarity_search_by_vector,
+                    embedding,
+                    k=k,
+                    filter=filter
+                )
+                logger.info(f"Similarity search returned {len(results)} documents")
+                return results
+            
+            # The threshold is applied in SQL, so only rows above it come back
+            response = await asyncio.to_thread(
+                self.supabase.rpc(
+                    "match_documents",
+                    {
+                        "query_embedding": embedding,
+                        "match_threshold": threshold,
+                        "match_count": k,
+                        "filter": filter or {}
+                    }
+                ).execute
+            )
+            filtered_results = [
+                (Document(page_content=row.get("content", ""), metadata=row.get("metadata", {})), row["similarity"])
+                for row in response.data or []
+            ]
+            
+            logger.info(f"Similarity search returned {len(filtered_results)} documents above threshold")
+            return filtered_results
+        except Exception as e:
+            logger.error(f"Error in similarity search: {str(e)}")
+            raise
\ No newline at end of file
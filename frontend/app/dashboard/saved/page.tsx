@@ -46,7 +46,7 @@ export default function SavedItemsPage() {
       }
 
       const response = await fetch(
-        `${BACKEND_URL}/api/dashboard/saved-items${typeFilter !== 'all' ? `?item_type=${typeFilter}` : ''}`,
+        `${BACKEND_URL}/api/dashboard/saved-items?include=content${typeFilter !== 'all' ? `&item_type=${typeFilter}` : ''}`,
         {
           headers: {
             'Authorization': `Bearer ${token}`